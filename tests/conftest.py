@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Die Module liegen wie im installierten Paket unter usr/share/x-live/editcsv
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "usr", "share", "x-live", "editcsv"))
@@ -0,0 +1,67 @@
+import os
+
+import pytest
+
+import csvcache
+import csvcore
+from test_csvcore import reference_rows, write_file
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    path = tmp_path / "cache"
+    monkeypatch.setattr(csvcache, "CACHE_DIR", str(path))
+    return path
+
+
+def snapshot(rows, has_ids):
+    """Spaltenabbild wie beim Laden in editcsv.CSVLoader."""
+    columns = [list(column) for column in zip(*rows)]
+    return columns if has_ids else columns[1:]
+
+
+def test_columns_round_trip(tmp_path, cache_dir):
+    path = str(write_file(tmp_path / "daten.xcsv"))
+    reader, rows = reference_rows(path)
+    csvcache.store(path, reader.header_data, reader.tab_size,
+                   columns=snapshot(rows, reader.has_ids), has_ids=reader.has_ids)
+    entry = csvcache.load(path)
+    assert entry['header_data'] == ["A", "B"]
+    assert entry['tab_size'] == [50, 50]
+    assert csvcache.rows_from_columns(entry['columns'], entry['has_ids']) == rows
+
+
+def test_offsets_round_trip(tmp_path, cache_dir):
+    path = str(write_file(tmp_path / "daten.xcsv"))
+    with open(path, 'rb') as f:
+        offsets = csvcore.build_row_index(f.read())
+    csvcache.store(path, ["A", "B"], [50, 50], offsets=offsets)
+    # ein späteres Spaltenabbild ergänzt den Eintrag, die Offsets bleiben erhalten
+    csvcache.store(path, ["A", "B"], [50, 50], columns=[["x"], ["y"]], has_ids=False)
+    entry = csvcache.load(path)
+    assert entry['offsets'] == offsets
+    assert entry['columns'] == [["x"], ["y"]]
+
+
+def test_changed_file_drops_entry(tmp_path, cache_dir):
+    path = str(write_file(tmp_path / "daten.xcsv"))
+    csvcache.store(path, ["A", "B"], [50, 50], columns=[["1"], ["a"], ["b"]], has_ids=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("\r\n13,neu,x\r\n")
+    assert csvcache.load(path) is None
+    assert not os.path.exists(csvcache.cache_path(path))
+
+
+def test_rows_from_columns_without_ids():
+    assert csvcache.rows_from_columns([["a", "b"], ["c", "d"]], False, start=5) == [["5", "a", "c"], ["6", "b", "d"]]
+    assert csvcache.rows_from_columns([], False) == []
+
+
+def test_evict_keeps_newest(cache_dir):
+    cache_dir.mkdir()
+    for number in range(3):
+        path = cache_dir / f"{number}.cache"
+        path.write_bytes(b"x" * 100)
+        os.utime(path, (number, number))
+    csvcache.evict(budget=250)
+    assert sorted(os.listdir(cache_dir)) == ["1.cache", "2.cache"]
@@ -0,0 +1,72 @@
+import csv
+import io
+import subprocess
+import sys
+
+import csvcli
+import csvsearch
+from test_csvcore import reference_rows, write_file
+
+
+def run_cli(*args, stdin=None):
+    """csvcli in einem eigenen Prozess, es schreibt direkt auf stdout.buffer."""
+    result = subprocess.run([sys.executable, csvcli.__file__, *args], input=stdin,
+                            capture_output=True, check=False)
+    return result.returncode, result.stdout.decode('utf-8'), result.stderr.decode('utf-8')
+
+
+def records(text):
+    return list(csv.reader(io.StringIO(text, newline='')))
+
+
+def test_convert_keeps_cells(tmp_path):
+    path = write_file(tmp_path / "daten.xcsv")
+    code, out, _ = run_cli("convert", "--to", "xcsv", str(path))
+    assert code == 0
+    output = tmp_path / "kopie.xcsv"
+    output.write_text(out, encoding='utf-8', newline='')
+    assert reference_rows(output)[1] == reference_rows(path)[1]
+
+
+def test_filter_and_select(tmp_path):
+    path = tmp_path / "preise.csv"
+    # genug Zahlen, damit "k.A." die Spalte nicht zu Text macht (wie in der Oberfläche)
+    stools = "".join(f"Hocker,{price}\r\n" for price in range(1, 101))
+    path.write_text("Name,Preis\r\nTisch,120\r\nStuhl,45\r\nLampe,k.A.\r\nRegal,300\r\n" + stools,
+                    encoding='utf-8')
+    code, out, _ = run_cli("filter", "Preis>100", "--exclude", "regal", "--to", "csv", str(path))
+    assert code == 0
+    assert records(out) == [["Name", "Preis"], ["Tisch", "120"]]
+    code, out, _ = run_cli("select", "#2,Name", "--from", "csv", "--to", "csv", stdin=path.read_bytes())
+    assert records(out)[:2] == [["Preis", "Name"], ["120", "Tisch"]]
+
+
+def test_filter_types_columns_like_the_editor(tmp_path):
+    rows = [["Hemd", "M", "12"], ["Hose", "L", "k.A."], ["Mütze", "10", "4"], ["Schal", "XL", "30"]]
+    rows += [[f"Socke {size}", str(size), str(size)] for size in range(100)] * 2
+    header = ["Name", "Größe", "Preis"]
+    path = tmp_path / "kleidung.csv"
+    path.write_text("\r\n".join(",".join(row) for row in [header] + rows) + "\r\n", encoding='utf-8')
+    index = csvsearch.SearchIndex()
+    index.ensure([[str(row + 1)] + cells for row, cells in enumerate(rows)], len(header))
+    # "Größe" hat zu viele Texte und wird auch mit einer Zahl als Text verglichen,
+    # "Preis" ist trotz "k.A." eine Zahlenspalte
+    for query in ("Größe>5", "Preis>10", "Größe=m Preis<20"):
+        code, out, _ = run_cli("filter", query, "--to", "csv", str(path))
+        assert code == 0
+        expected = [rows[row] for row in index.match(csvsearch.parse_query(query, header), [])]
+        assert records(out)[1:] == expected, query
+
+
+def test_unknown_column(tmp_path):
+    path = write_file(tmp_path / "daten.xcsv")
+    code, out, err = run_cli("select", "Farbe", str(path))
+    assert code == 1
+    assert "Unbekannte Spalte: Farbe" in err
+
+
+def test_input_format():
+    assert csvcli.input_format("a.CSV", None) == "csv"
+    assert csvcli.input_format("a.xcsv", None) == "xcsv"
+    assert csvcli.input_format(None, None) == "xcsv"
+    assert csvcli.input_format("a.csv", "xcsv") == "xcsv"
@@ -0,0 +1,67 @@
+import math
+
+import pytest
+
+import csvcolumns
+
+
+@pytest.mark.parametrize("text, value", [
+    ("12", 12.0), ("12.5", 12.5), ("12,50", 12.5), ("1.234,50 €", 1234.5), ("15 %", 15.0),
+    ("", None), ("abc", None), ("inf", None),
+])
+def test_parse_number(text, value):
+    assert csvcolumns.parse_number(text) == value
+
+
+def test_parse_date():
+    assert csvcolumns.parse_date("01.02.24") == csvcolumns.parse_date("1.2.2024")
+    assert csvcolumns.parse_date("31.12.99") < csvcolumns.parse_date("01.01.00")
+    assert csvcolumns.parse_date("31.02.24") is None
+    assert csvcolumns.parse_date("2024-02-01") is None
+
+
+def test_infer_kind():
+    assert csvcolumns.infer_kind(["1", "", "2,5", " "]) == csvcolumns.NUMBER
+    assert csvcolumns.infer_kind(["01.01.24", "", "3.4.2023"]) == csvcolumns.DATE
+    assert csvcolumns.infer_kind(["", " "]) == csvcolumns.TEXT
+    assert csvcolumns.infer_kind(["1", "zwei"]) == csvcolumns.TEXT
+    # einzelne unlesbare Zellen machen eine große Zahlenspalte nicht zur Textspalte
+    assert csvcolumns.infer_kind([str(value) for value in range(300)] + ["k.A."]) == csvcolumns.NUMBER
+    assert csvcolumns.infer_kind([str(value) for value in range(300)] + ["k.A."] * 4) == csvcolumns.TEXT
+
+
+def test_unparsed_cells_count_as_empty():
+    cells = [str(value) for value in range(200)] + ["k.A.", ""]
+    column = csvcolumns.TypedColumn(cells)
+    assert column.kind == csvcolumns.NUMBER
+    assert column.unparsed == 1
+    assert math.isnan(column.values[200])
+    assert 200 not in column.compare("!=", "5")
+    order = column.permutation(descending=True)
+    assert order[:2] == [199, 198]
+    assert set(order[-2:]) == {200, 201}
+    # ein weiterer unlesbarer Wert passt noch, danach muss neu erkannt werden
+    assert column.update(0, ["?"])
+    assert column.unparsed == 2
+    assert not column.update(1, ["?"])
+
+
+def test_text_column():
+    column = csvcolumns.TypedColumn(["Birne", "", "apfel", "Zitrone"])
+    assert column.kind == csvcolumns.TEXT
+    assert column.permutation() == [2, 0, 3, 1]
+    assert column.permutation(descending=True) == [3, 0, 2, 1]
+    assert column.compare("=", "apfel") == [2]
+    assert column.update(1, ["Kiwi"], insert=True)
+    assert column.values == ["birne", "kiwi", "", "apfel", "zitrone"]
+
+
+def test_cell_matcher():
+    greater = csvcolumns.cell_matcher(">", "10")
+    assert greater("12,5") and not greater("9") and not greater("") and not greater("viel")
+    before = csvcolumns.cell_matcher("<", "01.01.24")
+    assert before("31.12.23") and not before("02.01.24")
+    assert csvcolumns.cell_matcher("=", "offen")("Offen")
+    # mit Spaltentyp: Text bleibt Text, ein unpassender Vergleichswert trifft nichts
+    assert csvcolumns.column_matcher(csvcolumns.TEXT, ">", "5")("m")
+    assert not csvcolumns.column_matcher(csvcolumns.NUMBER, ">", "mittel")("12")
@@ -0,0 +1,154 @@
+import csv
+import io
+
+import pytest
+
+import csvcore
+
+# Anführungszeichen mitten im Feld, doppelte Anführungszeichen, mehrzeilige Felder,
+# Kommas, leere Zellen und ein Anführungszeichen hinter einem geschlossenen Feld
+ROWS = [
+    ["1", "a", 'v1'],
+    ["2", "a", '12" Monitor'],
+    ["3", 'x"y"z', "plain"],
+    ["4", "multi\nline\"", ""],
+    ["5", 'with, comma', 'bla "x", y\nzweite'],
+    ["6", "", ""],
+    ["7", '"', '""'],
+    ["8", "end", "v8"],
+]
+RAW_ROWS = [
+    '9,a,12" Monitor\r\n',
+    '10,"quoted"tail,x\r\n',
+    '11,b,"c\r\nd"\r\n',
+    '\r\n',
+    '12,last,row',
+]
+
+
+def write_file(path, raw_rows=RAW_ROWS):
+    buffer = io.StringIO(newline='')
+    writer = csv.writer(buffer)
+    writer.writerow(["A", "B"])
+    writer.writerow([50, 50])
+    writer.writerows(ROWS)
+    # unverändert wie von Hand geschrieben, csv.writer würde die Felder quotieren
+    buffer.write("".join(raw_rows))
+    path.write_bytes(buffer.getvalue().encode('utf-8'))
+    return path
+
+
+def reference_rows(path):
+    with open(path, 'rb') as f:
+        reader = csvcore.XCSVReader(f)
+        return reader, list(reader.rows())
+
+
+def csv_records(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return [row for row in csv.reader(f) if row]
+
+
+def test_reader_matches_csv_reader(tmp_path):
+    path = write_file(tmp_path / "daten.xcsv")
+    reader, rows = reference_rows(path)
+    assert reader.header_data == ["A", "B"]
+    assert reader.tab_size == [50, 50]
+    assert reader.has_ids
+    # auf ID + zwei Spalten gebracht
+    assert rows == [(row + [""] * 3)[:3] for row in csv_records(path)[2:]]
+    assert rows[1] == ["2", "a", '12" Monitor']
+    assert rows[8] == ["9", "a", '12" Monitor']
+
+
+def test_row_index_follows_csv_reader(tmp_path):
+    path = write_file(tmp_path / "daten.xcsv")
+    data = path.read_bytes()
+    offsets = csvcore.build_row_index(data)
+    offsets.append(len(data))
+    records = [csvcore.parse_record(data, start, end) for start, end in zip(offsets, offsets[1:])]
+    assert records == csv_records(path)
+
+
+def test_stray_quote_before_multiline_field(tmp_path):
+    path = tmp_path / "gross.xcsv"
+    lines = ["A,B\r\n", "50,50\r\n"]
+    for row in range(1, 2001):
+        if row == 701:
+            lines.append(f'{row},a,12" Monitor\r\n')
+        elif row == 1501:
+            lines.append(f'{row},a,"multi\nline"""\r\n')
+        else:
+            lines.append(f"{row},a,v{row}\r\n")
+    path.write_text("".join(lines), newline='')
+    _, expected = reference_rows(path)
+    assert len(expected) == 2000
+    rows = csvcore.LazyRows(str(path), use_cache=False)
+    try:
+        assert len(rows) == 2000
+        assert list(rows) == expected
+        assert rows[1500] == ["1501", "a", 'multi\nline"']
+    finally:
+        rows.close()
+
+
+@pytest.mark.parametrize("text", ['"open,field\nstill open', 'a,"b""\n', '"""",x\n"y'])
+def test_unclosed_quote_runs_to_end(text):
+    data = ("A\r\n1\r\n" + text).encode('utf-8')
+    offsets = csvcore.build_row_index(data)
+    offsets.append(len(data))
+    records = [csvcore.parse_record(data, start, end) for start, end in zip(offsets, offsets[1:])]
+    assert records == [row for row in csv.reader(io.StringIO(data.decode(), newline='')) if row]
+
+
+def test_lazy_rows_match_reader(tmp_path):
+    path = write_file(tmp_path / "daten.xcsv")
+    _, expected = reference_rows(path)
+    rows = csvcore.LazyRows(str(path), use_cache=False)
+    try:
+        assert len(rows) == len(expected)
+        assert list(rows) == expected
+        # wahlfreier Zugriff von hinten und über Bereiche
+        assert rows[-1] == expected[-1]
+        assert rows[3:6] == expected[3:6]
+    finally:
+        rows.close()
+
+
+def test_lazy_rows_bulk_changes(tmp_path):
+    path = write_file(tmp_path / "daten.xcsv")
+    _, expected = reference_rows(path)
+    rows = csvcore.LazyRows(str(path), use_cache=False)
+    try:
+        # Löschen verstreuter Zeilen und Rückgängig
+        blocks = [(0, expected[0:2]), (5, expected[5:6]), (len(expected) - 1, expected[-1:])]
+        rows.remove_ranges([(first, first + len(block) - 1) for first, block in blocks])
+        assert list(rows) == expected[2:5] + expected[6:-1]
+        rows.insert_blocks(blocks)
+        assert list(rows) == expected
+    finally:
+        rows.close()
+
+
+def test_lazy_rows_without_ids(tmp_path):
+    path = tmp_path / "ohne_ids.xcsv"
+    path.write_text('Name,Wert\r\n50,50\r\nx,"1\n2"\r\ny,3 " 4\r\n', newline='')
+    rows = csvcore.LazyRows(str(path), use_cache=False)
+    try:
+        assert list(rows) == [["1", "x", "1\n2"], ["2", "y", '3 " 4']]
+    finally:
+        rows.close()
+
+
+def test_write_and_read_back(tmp_path):
+    path = tmp_path / "neu.xcsv"
+    rows = [["a", 'b "c"'], ["multi\nline", ""], ["12\" x", "y,z"]]
+    csvcore.write_xcsv(str(path), ["A", "B"], [40, 60], rows)
+    reader, read = reference_rows(path)
+    assert reader.tab_size == [40, 60]
+    assert [row[1:] for row in read] == rows
+    lazy = csvcore.LazyRows(str(path), use_cache=False)
+    try:
+        assert list(lazy) == read
+    finally:
+        lazy.close()
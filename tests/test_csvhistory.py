@@ -0,0 +1,71 @@
+import csvhistory
+import csvstore
+
+
+def apply(store, change, undo):
+    """Schritt auf einen ColumnStore anwenden wie CSVEditor.apply_change."""
+    if change.kind == csvhistory.ADD:
+        if undo:
+            del store[change.first:change.first + len(change.rows)]
+        else:
+            store.extend(change.rows)
+    elif change.kind == csvhistory.EDIT:
+        store[change.row] = csvhistory.apply_cells(store[change.row], change.cells, 0 if undo else 1)
+    elif change.kind == csvhistory.DELETE:
+        if undo:
+            for first, rows in change.blocks:
+                store[first:first] = rows
+        else:
+            for first, rows in reversed(change.blocks):
+                del store[first:first + len(rows)]
+
+
+def make_store():
+    store = csvstore.ColumnStore(3)
+    store.extend([[str(row + 1), f"a{row}", "offen"] for row in range(10)])
+    return store
+
+
+def test_edited_keeps_only_changed_cells():
+    change = csvhistory.edited(2, ["3", "a", "b"], ["3", "a", "c", "neu"])
+    assert change.cells == {2: ("b", "c"), 3: ("", "neu")}
+    assert csvhistory.edited(2, ["3", "a"], ["3", "a"]) is None
+    assert csvhistory.apply_cells(["3", "a", "c", "neu"], change.cells, 0) == ["3", "a", "b", ""]
+
+
+def test_undo_redo_restores_store():
+    store = make_store()
+    original = list(store)
+    history = csvhistory.History()
+    steps = [
+        csvhistory.edited(4, store[4], ["5", "geändert", "erledigt"]),
+        csvhistory.added(10, [["11", "neu", "offen"], ["12", "neu", ""]]),
+        csvhistory.deleted([(1, [store[1], store[2]]), (7, [store[7]])]),
+    ]
+    states = []
+    for change in steps:
+        history.push(change)
+        apply(store, change, undo=False)
+        states.append(list(store))
+    assert len(store) == 9 and store[1][0] == "4" and store[5][0] == "9"
+    while history.can_undo():
+        apply(store, history.undo(), undo=True)
+    assert list(store) == original
+    for state in states:
+        apply(store, history.redo(), undo=False)
+        assert list(store) == state
+    assert not history.can_redo()
+
+
+def test_push_clears_redo_and_budget_drops_oldest():
+    history = csvhistory.History(budget=3 * (2 + 2 * csvhistory.CELL_OVERHEAD))
+    changes = [csvhistory.edited(row, ["1", "a"], ["1", "b"]) for row in range(5)]
+    for change in changes:
+        history.push(change)
+    assert list(history.undo_stack) == changes[2:]
+    assert history.undo() is changes[4]
+    history.push(changes[0])
+    assert not history.can_redo()
+    assert history.size == sum(change.size for change in history.undo_stack)
+    history.clear()
+    assert not history.can_undo() and history.size == 0
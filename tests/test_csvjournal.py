@@ -0,0 +1,62 @@
+import pytest
+
+import csvjournal
+from test_csvcore import write_file
+
+
+@pytest.fixture
+def source(tmp_path, monkeypatch):
+    monkeypatch.setattr(csvjournal, "JOURNAL_DIR", str(tmp_path / "state"))
+    return str(write_file(tmp_path / "daten.xcsv"))
+
+
+def test_record_and_pending(source):
+    journal = csvjournal.Journal(source)
+    assert journal.pending() is None
+    journal.record(csvjournal.EDIT, index=0, row=["1", "x", "b"])
+    journal.record(csvjournal.DELETE, rows=[1])
+    journal.close()
+    assert journal.count == 2
+    operations = csvjournal.Journal(source).pending()
+    assert operations == [{'op': 'edit', 'index': 0, 'row': ["1", "x", "b"]}, {'op': 'delete', 'rows': [1]}]
+
+
+def test_resume_appends(source):
+    journal = csvjournal.Journal(source)
+    journal.record(csvjournal.ADD, row=["3", "e", "f"])
+    journal.close()
+    journal = csvjournal.Journal(source)
+    journal.resume(len(journal.pending()))
+    journal.record(csvjournal.HEADER, header_data=["A", "B"], tab_size=[50, 50])
+    journal.close()
+    assert journal.count == 2
+    assert [operation['op'] for operation in csvjournal.Journal(source).pending()] == ["add", "header"]
+
+
+def test_changed_source_invalidates(source):
+    journal = csvjournal.Journal(source)
+    journal.record(csvjournal.ADD, row=["3", "e", "f"])
+    journal.close()
+    with open(source, "a", encoding="utf-8") as f:
+        f.write("3,g,h\r\n")
+    assert csvjournal.Journal(source).pending() is None
+
+
+def test_incomplete_last_line(source):
+    journal = csvjournal.Journal(source)
+    journal.record(csvjournal.ADD, row=["3", "e", "f"])
+    journal.close()
+    with open(journal.path, "a", encoding="utf-8") as f:
+        f.write('{"op":"add","ro')
+    assert len(csvjournal.Journal(source).pending()) == 1
+
+
+def test_discard_and_restart(source):
+    journal = csvjournal.Journal(source)
+    journal.record(csvjournal.EDIT, index=0, row=["1", "x", "b"])
+    journal.discard()
+    assert csvjournal.Journal(source).pending() is None
+    # die nächste Änderung beginnt ein neues Journal
+    journal.record(csvjournal.ADD, row=["3", "e", "f"])
+    journal.close()
+    assert [operation['op'] for operation in csvjournal.Journal(source).pending()] == ["add"]
@@ -0,0 +1,61 @@
+import sys
+
+import pytest
+
+import csvcore
+import csvparallel
+from test_csvcore import reference_rows, write_file
+
+
+def stray_quote_file(path, rows=2000):
+    lines = ["A,B\r\n", "50,50\r\n"]
+    for row in range(1, rows + 1):
+        if row == 701:
+            lines.append(f'{row},a,12" Monitor\r\n')
+        elif row == 1501:
+            lines.append(f'{row},a,"multi\nline"""\r\n')
+        elif row % 97 == 0:
+            lines.append(f'{row},"x, ""y""","z\nw"\r\n')
+        else:
+            lines.append(f"{row},a,v{row}\r\n")
+    path.write_text("".join(lines), newline='')
+    return path
+
+
+@pytest.mark.parametrize("rows, parts", [(2000, 2), (2000, 7), (2000, 500), (20000, 3), (20000, 64)])
+def test_ranges_start_at_records(tmp_path, rows, parts):
+    data = stray_quote_file(tmp_path / "daten.xcsv", rows).read_bytes()
+    starts = set(csvcore.build_row_index(data))
+    ranges = csvparallel.split_ranges(data, csvcore.build_row_index(data)[2], parts)
+    assert ranges[-1][1] == len(data)
+    assert all(start in starts for start, end in ranges)
+    assert all(end == start for (_, end), (start, _) in zip(ranges, ranges[1:]))
+
+
+def read_parallel(path, monkeypatch):
+    # kleine Bereiche, damit auch die Testdateien auf mehrere Prozesse verteilt werden
+    monkeypatch.setattr(csvparallel, "RANGE_MIN_BYTES", 256)
+    reader = csvparallel.ParallelReader(str(path), workers=2)
+    assert len(reader.ranges()) > 1 or path.stat().st_size < 1024
+    rows = [row for chunk in reader.chunks(size=300) for row in chunk]
+    return reader, rows
+
+
+@pytest.mark.parametrize("make_file", [stray_quote_file, write_file])
+def test_parallel_reader_matches_xcsv_reader(tmp_path, monkeypatch, make_file):
+    path = make_file(tmp_path / "daten.xcsv")
+    expected_reader, expected = reference_rows(path)
+    reader, rows = read_parallel(path, monkeypatch)
+    assert reader.header_data == expected_reader.header_data
+    assert reader.tab_size == expected_reader.tab_size
+    assert reader.has_ids == expected_reader.has_ids
+    assert rows == expected
+    assert reader.rows_read == len(expected)
+
+
+def test_submit_all_restores_main_file():
+    main = sys.modules['__main__']
+    before = getattr(main, '__file__', None)
+    futures = csvparallel.submit_all(1, csvparallel.worker_count, [()])
+    assert futures[0].result() >= 1
+    assert getattr(main, '__file__', None) == before
@@ -0,0 +1,167 @@
+import random
+import threading
+import time
+from array import array
+
+import csvsearch
+
+
+def test_parse_terms():
+    assert csvsearch.parse_terms("  Linux  Debian ") == ["linux", "debian"]
+    assert csvsearch.parse_terms('"Open Source" lizenz') == ["open source", "lizenz"]
+    assert csvsearch.parse_terms("") == []
+
+
+def test_parse_query():
+    header = ["Name", "Preis", "Ort"]
+    assert csvsearch.parse_query("preis>10 tisch", header) == ["tisch", (1, ">", "10")]
+    assert csvsearch.parse_query('"Ort" = "Bad Tölz"', header) == [(2, "=", "bad tölz")]
+    assert csvsearch.parse_query("#1!=x", header) == [(0, "!=", "x")]
+    # unbekannte Spalte: bleibt ein normaler Suchbegriff
+    assert csvsearch.parse_query("farbe=rot", header) == ["farbe=rot"]
+
+
+def test_narrows():
+    assert csvsearch.narrows((["lin"], []), (["linux"], []))
+    assert csvsearch.narrows((["lin"], []), (["lin"], ["mint"]))
+    assert not csvsearch.narrows((["linux"], []), (["lin"], []))
+    assert not csvsearch.narrows((["lin"], ["mint"]), (["lin"], []))
+
+
+def test_pack_postings():
+    rows = [0, 3, 60000, 60001, 120000]
+    packed = csvsearch.pack_postings(rows)
+    assert packed.typecode == 'H'
+    assert csvsearch.unpack_postings(packed) == rows
+    # Abstand über 65535: ungepackt
+    wide = array('I', [5, 100000])
+    assert csvsearch.unpack_postings(csvsearch.pack_postings(wide)) == [5, 100000]
+
+
+def test_worth_trigrams():
+    rows = csvsearch.TRIGRAM_MIN_ROWS
+    assert csvsearch.worth_trigrams(rows, ["linux"], [])
+    assert not csvsearch.worth_trigrams(rows - 1, ["linux"], [])
+    assert not csvsearch.worth_trigrams(rows, ["linux", "ab"], [])
+    assert not csvsearch.worth_trigrams(rows, [], [])
+    assert csvsearch.worth_trigrams(rows, [(0, "=", "x")], ["mint"])
+
+
+def test_trigrams_match_scan():
+    rng = random.Random(9)
+    words = ["linux", "debian", "mint", "Arch", "ubuntu", "fedora", "x-live"]
+    data = [[str(row + 1), rng.choice(words), f"{rng.choice(words)} {row}", rng.choice(["", "ok"])]
+            for row in range(3000)]
+    plain = csvsearch.SearchIndex()
+    plain.ensure(data, 3)
+    index = csvsearch.SearchIndex()
+    index.ensure(data, 3)
+    assert index.build_trigrams() is not None
+    index.set_row(5, ["6", "neu", "gentoo", ""])
+    plain.set_row(5, ["6", "neu", "gentoo", ""])
+    added = [["9001", "slackware", "linux 9001", "ok"]]
+    index.append_rows(added)
+    plain.append_rows(added)
+    for search, exclude in [(["deb"], []), (["gentoo"], []), (["linux", "mint"], ["arch"]),
+                            ([], ["ubuntu"]), (["ware"], []), (["zzz"], []), (["12"], [])]:
+        expected = plain.match(search, exclude)
+        assert index.match(search, exclude) == expected, (search, exclude)
+
+
+def test_sort_permutation_without_texts():
+    data = [["1", "10", "b"], ["2", "9", "a"], ["3", "100", "c"]]
+    index = csvsearch.SearchIndex()
+    assert index.sort_permutation(0, False, data) == [1, 0, 2]
+    assert index.sort_permutation(1, True, data) == [2, 0, 1]
+    # nur die Spalte wird aufbereitet, die Suchtexte nicht
+    assert index.texts is None
+    index.ensure(data, 2)
+    data[1] = ["2", "1000", "a"]
+    index.set_row(1, data[1])
+    assert index.sort_permutation(0) == [0, 2, 1]
+
+
+def test_bulk_changes_match_fresh_index():
+    data = [[str(row + 1), f"name {row}", str(row % 50), "01.02.24" if row % 7 else ""] for row in range(300)]
+    deleted = set(range(3, 300, 4)) | {0, 1, 299}
+    blocks = []
+    for row in sorted(deleted):
+        if blocks and row == blocks[-1][0] + len(blocks[-1][1]):
+            blocks[-1][1].append(data[row])
+        else:
+            blocks.append((row, [data[row]]))
+    remaining = [row for position, row in enumerate(data) if position not in deleted]
+    index = csvsearch.SearchIndex()
+    index.ensure(data, 3)
+    for column in (0, 1, 2):
+        index.typed_column(column)
+
+    def assert_fresh(rows):
+        fresh = csvsearch.SearchIndex()
+        fresh.ensure(rows, 3)
+        assert index.texts == fresh.texts
+        for column in (0, 1, 2):
+            assert str(index.typed[column].values) == str(fresh.typed_column(column).values)
+        assert index.match([], [(1, ">", "10")]) == fresh.match([], [(1, ">", "10")])
+
+    index.remove_ranges([(first, first + len(rows) - 1) for first, rows in blocks])
+    assert_fresh(remaining)
+    index.insert_blocks(blocks)
+    assert_fresh(data)
+
+
+def test_ensure_builds_once(monkeypatch):
+    data = [[str(row + 1), f"name {row}", "x"] for row in range(1000)]
+    calls = []
+    row_text = csvsearch.row_text
+
+    def slow_row_text(row, columns):
+        calls.append(row)
+        time.sleep(0.0001)
+        return row_text(row, columns)
+
+    monkeypatch.setattr(csvsearch, "row_text", slow_row_text)
+    index = csvsearch.SearchIndex()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(index.ensure(data, 2))) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == len(data)
+    assert results[0] is results[1] is index.texts
+    # wer auf einen laufenden Aufbau wartet, kann abgebrochen werden
+    index.invalidate()
+    with index.lock:
+        assert index.ensure(data, 2, cancelled=lambda: True) is None
+
+
+def test_shared_texts_follow_edits(monkeypatch):
+    import csvparallel
+    monkeypatch.setattr(csvparallel, "PARALLEL_MIN_ROWS", 100)
+    monkeypatch.setattr(csvparallel, "worker_count", lambda: 2)
+    data = [[str(row + 1), f"name {row}", "linux" if row % 3 else "bsd"] for row in range(400)]
+    index = csvsearch.SearchIndex()
+    index.ensure(data, 2)
+
+    def serial(search_terms, exclude_terms):
+        return csvsearch.matching_rows(index.texts, search_terms, exclude_terms)
+
+    assert index.match(["linux"], []) == serial(["linux"], [])
+    shared = index.shared
+    assert shared is not None
+    for row in (0, 7, 399):
+        changed = [str(row + 1), "geändert", "linux" if row % 2 else "hurd"]
+        index.set_row(row, changed)
+    index.append_rows([["401", "neu", "linux"]])
+    for terms in ((["linux"], []), (["hurd"], []), ([], ["name"])):
+        assert index.match(*terms) == serial(*terms), terms
+    # einzelne Änderungen legen den Block nicht neu an
+    assert index.shared is shared
+    # nach dem Entfernen von Zeilen wird bis zur Ruhepause in einem Prozess gefiltert
+    index.remove_range(0, 9)
+    assert index.match(["linux"], []) == serial(["linux"], [])
+    assert index.shared is None
+    monkeypatch.setattr(csvsearch, "SHARED_STABLE_SECONDS", 0)
+    assert index.match(["linux"], []) == serial(["linux"], [])
+    assert index.shared is not None
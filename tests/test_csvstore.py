@@ -0,0 +1,140 @@
+import random
+
+import pytest
+
+import csvstore
+
+
+def make_store(rows, width=3):
+    store = csvstore.ColumnStore(width)
+    store.extend(rows)
+    return store
+
+
+def columns_consistent(store):
+    return len({len(column) for column in store.columns}) == 1
+
+
+def test_behaves_like_list():
+    rng = random.Random(3)
+    rows = [[str(row + 1), rng.choice("abc"), f"t{row}"] for row in range(500)]
+    store = make_store([list(row) for row in rows])
+    for step in range(300):
+        position = rng.randrange(len(rows))
+        operation = step % 4
+        if operation == 0:
+            row = [str(rng.randint(1, 10 ** 6)), rng.choice("abcd"), f"n{step}"]
+            rows[position] = row
+            store[position] = list(row)
+        elif operation == 1:
+            end = min(len(rows), position + rng.randint(0, 5))
+            del rows[position:end]
+            del store[position:end]
+        elif operation == 2:
+            new = [[str(step), "x", "neu"], ["007", "y", ""]]
+            rows[position:position] = new
+            store[position:position] = [list(row) for row in new]
+        else:
+            rows.append([str(step), "z", "angehängt"])
+            store.append([str(step), "z", "angehängt"])
+        assert len(store) == len(rows)
+    assert list(store) == rows
+    assert store[-1] == rows[-1]
+    assert store[10:20] == rows[10:20]
+    assert columns_consistent(store)
+
+
+def test_ids_that_are_not_numbers_stay_text():
+    store = make_store([["1", "a", "b"], ["007", "c", "d"]])
+    assert [row[0] for row in store] == ["1", "007"]
+    store[0] = ["x", "a", "b"]
+    assert store[0][0] == "x"
+
+
+def test_dict_column_overflow_becomes_plain():
+    store = make_store([[str(row + 1), "gleich", "gleich"] for row in range(2000)])
+    assert isinstance(store.columns[1], csvstore.DictColumn)
+    # mehr neue verschiedene Werte, als in die 2-Byte-Codes passen
+    new = [[str(row + 1), f"wert {row}", f"anders {row}"] for row in range(2000, 72000)]
+    store.extend(new)
+    assert columns_consistent(store)
+    assert len(store) == 72000
+    assert isinstance(store.columns[1], csvstore.PlainColumn)
+    assert store[71999] == ["72000", "wert 71999", "anders 71999"]
+    assert store[0] == ["1", "gleich", "gleich"]
+    # Rückgängig eines großen Löschens: Bereich mitten hinein wieder einfügen
+    store[1000:1000] = [[str(row), f"zurück {row}", ""] for row in range(70000)]
+    assert columns_consistent(store)
+    assert store[1000] == ["0", "zurück 0", ""]
+
+
+def test_splice_is_all_or_nothing(monkeypatch):
+    rows = [[str(row + 1), "a", "b"] for row in range(100)]
+    store = make_store([list(row) for row in rows])
+    original = csvstore.DictColumn.splice
+    calls = []
+
+    def failing(column, start, stop, values):
+        calls.append(column)
+        if len(calls) == 2:
+            raise MemoryError("Test")
+        return original(column, start, stop, values)
+
+    monkeypatch.setattr(csvstore.DictColumn, "splice", failing)
+    with pytest.raises(MemoryError):
+        store[10:20] = [["999", "neu", "neu", "breiter"]] * 3
+    monkeypatch.undo()
+    assert len(store.columns) == 3
+    assert columns_consistent(store)
+    assert list(store) == rows
+
+
+def test_widen_adds_empty_cells():
+    store = make_store([["1", "a", "b"]])
+    store.append(["2", "c", "d", "e"])
+    assert list(store) == [["1", "a", "b", ""], ["2", "c", "d", "e"]]
+
+
+def delete_blocks(rows, rng, count):
+    """Verstreute Zeilen aus rows löschen; liefert die Blöcke zum Wiedereinfügen wie csvhistory.deleted."""
+    deleted = sorted(rng.sample(range(len(rows)), count))
+    blocks = []
+    for row in deleted:
+        if blocks and row == blocks[-1][0] + len(blocks[-1][1]):
+            blocks[-1][1].append(rows[row])
+        else:
+            blocks.append((row, [rows[row]]))
+    remaining = [row for position, row in enumerate(rows) if position not in set(deleted)]
+    return remaining, blocks
+
+
+def test_remove_ranges_matches_list():
+    rng = random.Random(4)
+    rows = [[str(row + 1), rng.choice("abc"), f"t{row}"] for row in range(1000)]
+    remaining, blocks = delete_blocks(rows, rng, 300)
+    store = make_store([list(row) for row in rows])
+    store.remove_ranges([(first, first + len(block) - 1) for first, block in blocks])
+    assert list(store) == remaining
+    assert columns_consistent(store)
+
+
+def test_insert_blocks_matches_list():
+    rng = random.Random(5)
+    rows = [[str(row + 1), rng.choice("abc"), f"t{row}"] for row in range(1000)]
+    remaining, blocks = delete_blocks(rows, rng, 300)
+    store = make_store([list(row) for row in remaining])
+    store.insert_blocks(blocks)
+    assert list(store) == rows
+    assert columns_consistent(store)
+    assert isinstance(store.columns[0], csvstore.IntColumn)
+    assert isinstance(store.columns[1], csvstore.DictColumn)
+    # nicht zurückschreibbare IDs und zu viele verschiedene Werte wechseln zur Textliste
+    store.insert_blocks([(0, [["007", "neu", "", "breiter"]]),
+                         (500, [[str(row), f"wert {row}", "", ""] for row in range(70000)])])
+    assert columns_consistent(store)
+    assert isinstance(store.columns[0], csvstore.PlainColumn)
+    assert isinstance(store.columns[1], csvstore.PlainColumn)
+    assert store[0] == ["007", "neu", "", "breiter"]
+    assert store[1] == rows[0] + [""]
+    assert store[500] == ["0", "wert 0", "", ""]
+    assert store[70500] == rows[499] + [""]
@@ -0,0 +1,74 @@
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+QtWidgets = pytest.importorskip("PyQt5.QtWidgets")
+
+import csvjournal
+import editcsv
+from test_csvcore import write_file
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+def wait_for(app, condition):
+    while not condition():
+        app.processEvents()
+
+
+@pytest.fixture
+def editor(app, tmp_path, monkeypatch):
+    monkeypatch.setattr(csvjournal, "JOURNAL_DIR", str(tmp_path / "state"))
+    editor = editcsv.CSVEditor(file_path=str(write_file(tmp_path / "daten.xcsv")))
+    wait_for(app, lambda: editor.loader is None)
+    yield editor
+    editor.close()
+
+
+def test_autosave_after_clear_keeps_file(app, editor):
+    path = editor.journal.file_path
+    with open(path, 'rb') as f:
+        content = f.read()
+    rows = len(editor.data)
+    editor.replace_row(0, ["1", "geändert", "v1"])
+    editor.clear_data()
+    assert editor.journal is None
+    assert editor.windowTitle() == "X-Live EditCSV"
+    editor.autosave()
+    wait_for(app, lambda: editor.saver is None)
+    with open(path, 'rb') as f:
+        assert f.read() == content
+    # Rückgängig gehört die Tabelle wieder zur Datei, die Änderung davor wird gespeichert
+    editor.undo()
+    assert len(editor.data) == rows
+    assert editor.journal is not None and editor.journal.count == 1
+    assert editor.windowTitle() == "X-Live EditCSV - daten.xcsv"
+    editor.autosave()
+    wait_for(app, lambda: editor.saver is None)
+    with open(path, encoding='utf-8') as f:
+        assert "geändert" in f.read()
+
+
+def test_added_column_starts_empty(app, editor):
+    old = (editor.header_data, editor.tab_size)
+    narrow = (["A"], [50])
+    editor.push_change(editcsv.csvhistory.header_changed(old, narrow))
+    editor.set_header(*narrow)
+    # Rückgängig nach dem Entfernen zeigt die alten Werte wieder
+    editor.undo()
+    assert editor.model.data(editor.model.index(0, 1)) == "v1"
+    editor.redo()
+    wide = (["A", "C"], [50, 50])
+    editor.push_change(editcsv.csvhistory.header_changed(narrow, wide))
+    editor.set_header(*wide)
+    assert editor.model.data(editor.model.index(0, 1)) == ""
+    assert editor.pad_row(editor.data[0]) == ["1", "a", ""]
+    wait_for(app, lambda: editor.index_worker is None)
+    assert editor.search_index.typed_column(1).values == [""] * len(editor.data)
+    # beim Wiedereinspielen werden die Zellen genauso verworfen oder behalten
+    operations = csvjournal.Journal(editor.journal.file_path).pending()
+    assert [operation['clear_cells'] for operation in operations] == [True, False, True, True]
@@ -0,0 +1,257 @@
+#!/usr/bin/python3
+
+# Messungen für X-Live EditCSV: Laden, Suchindex, Tabelle neu aufbauen,
+# Filtern, Löschen, Rückgängig und Speichern auf einer erzeugten (oder vorhandenen)
+# xcsv-Datei, ohne sichtbares Fenster (Qt-Plattform "offscreen").
+#
+#   python3 benchmark.py --rows 200000 --columns 8 --output neu.json
+#   python3 benchmark.py --file daten.xcsv --compare alt.json
+#
+# Je Schritt werden Laufzeit, aktueller und höchster Speicherbedarf (RSS)
+# gemessen. Die Ergebnisse gehen als JSON nach --output (oder stdout), eine
+# lesbare Übersicht nach stderr. Journal und Cache liegen in einem
+# temporären Verzeichnis, die Messung hängt also nicht vom Benutzerprofil ab.
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import string
+import sys
+import tempfile
+import time
+
+import csvcache
+import csvcore
+import csvhistory
+import csvjournal
+
+
+def synthetic_rows(rows, columns, cardinality, quoted, seed):
+    """
+    Zeilen ohne ID: je Spalte ein Vorrat aus cardinality Werten, ein Anteil
+    quoted der Werte enthält Komma, Anführungszeichen oder Zeilenumbruch.
+    """
+    rng = random.Random(seed)
+
+    def word(length):
+        return "".join(rng.choice(string.ascii_lowercase) for _ in range(length))
+
+    pools = []
+    for column in range(columns):
+        pool = []
+        for _ in range(cardinality):
+            value = f"{word(rng.randint(3, 8))} {word(rng.randint(3, 10))}"
+            if rng.random() < quoted:
+                value = rng.choice((f"{value}, {word(4)}", f'{value} "{word(5)}"', f"{value}\n{word(6)}"))
+            pool.append(value)
+        pools.append(pool)
+    for _ in range(rows):
+        yield [rng.choice(pool) for pool in pools]
+
+
+def generate(file_path, rows, columns, cardinality=1000, quoted=0.05, seed=1):
+    """Erzeugt eine xcsv-Datei mit Kopfzeile, Spaltenbreiten und rows Zeilen."""
+    header_data = [f"Spalte {column + 1}" for column in range(columns)]
+    tab_size = [100 // columns] * columns
+    csvcore.write_xcsv(file_path, header_data, tab_size,
+                       synthetic_rows(rows, columns, cardinality, quoted, seed))
+
+
+def rss():
+    """Aktueller Speicherbedarf des Prozesses in Bytes (nur Linux, sonst 0)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def peak_rss():
+    """Höchster Speicherbedarf seit Prozessstart in Bytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class Benchmark:
+    """Führt die Schritte nacheinander an einem CSVEditor aus und sammelt die Messwerte."""
+    def __init__(self, app, editcsv):
+        self.app = app
+        self.editcsv = editcsv
+        self.results = []
+
+    def wait(self, done, timeout=600):
+        end = time.perf_counter() + timeout
+        while not done():
+            if time.perf_counter() > end:
+                raise TimeoutError("Zeitüberschreitung")
+            self.app.processEvents()
+            time.sleep(0.001)
+
+    def measure(self, name, action, done=lambda: True, **details):
+        start = time.perf_counter()
+        action()
+        self.wait(done)
+        # Nacharbeiten im Eventloop (z.B. verzögerte Signale) mitzählen
+        self.app.processEvents()
+        seconds = time.perf_counter() - start
+        self.results.append(dict(operation=name, seconds=round(seconds, 4), rss=rss(),
+                                 peak_rss=peak_rss(), **details))
+
+    def run(self, file_path, query, delete, lazy):
+        editor = self.editcsv.CSVEditor()
+        editor.show()
+        self.app.processEvents()
+        self.measure("load", lambda: editor.load_csv(file_path, lazy=lazy), lambda: editor.loader is None)
+        self.results[-1]['rows'] = len(editor.data)
+        self.measure("search_index", lambda: None, lambda: editor.index_worker is None)
+        self.measure("update_table", editor.update_table, lambda: editor.filter_worker is None)
+
+        def search(text):
+            editor.search_field.blockSignals(True)
+            editor.search_field.setText(text)
+            editor.search_field.blockSignals(False)
+            editor.search_table()
+
+        self.measure("search_table", lambda: search(query), lambda: editor.filter_worker is None,
+                     query=query)
+        self.results[-1]['matches'] = editor.model.rowCount()
+
+        def edit_and_search():
+            # eine Zeile wie über "Bearbeiten" ändern, dann erneut filtern
+            row = editor.model.data_row(0)
+            row_data = editor.pad_row(editor.data[row])
+            new_row = row_data[:1] + [row_data[1] + "x"] + row_data[2:]
+            editor.push_change(csvhistory.edited(row, row_data, new_row))
+            editor.replace_row(row, new_row)
+            # wie eine neue Eingabe über alle Zeilen, nicht nur über die bisherigen Treffer
+            editor.visible_terms = None
+            search(query)
+
+        if editor.model.rowCount():
+            self.measure("search_after_edit", edit_and_search, lambda: editor.filter_worker is None,
+                         query=query)
+        else:
+            # ohne Treffer gibt es keine sichtbare Zeile zum Bearbeiten
+            print(f"search_after_edit übersprungen: 0 Treffer für {query!r}", file=sys.stderr)
+        self.measure("search_table_clear", lambda: search(""), lambda: editor.filter_worker is None)
+
+        rows = len(editor.data)
+        step = max(rows // max(delete, 1), 1)
+        selected = list(range(0, rows, step))[:delete]
+
+        def delete_rows():
+            from PyQt5.QtCore import QItemSelection, QItemSelectionModel
+            selection = QItemSelection()
+            last_column = editor.model.columnCount() - 1
+            for row in selected:
+                selection.select(editor.model.index(row, 0), editor.model.index(row, last_column))
+            editor.table.selectionModel().select(selection, QItemSelectionModel.Select)
+            editor.delete_entry()
+
+        self.measure("delete_entry", delete_rows, lambda: editor.filter_worker is None,
+                     rows=len(selected))
+        # die verstreuten Zeilen an ihren alten Positionen wieder einfügen
+        self.measure("undo_delete", editor.undo, lambda: editor.filter_worker is None,
+                     rows=len(selected))
+        # Speichern ohne Dateidialog und Erfolgsmeldung wie beim automatischen Speichern
+        save_path = os.path.join(os.path.dirname(file_path), "gespeichert.xcsv")
+        self.measure("save_csv", lambda: editor.start_save(save_path, autosave=True),
+                     lambda: editor.saver is None)
+        editor.close()
+
+
+def report(result, compare=None, out=sys.stderr):
+    baseline = {}
+    if compare:
+        baseline = {entry['operation']: entry for entry in compare['results']}
+    print(f"{'Schritt':<20} {'Sekunden':>10} {'RSS MB':>9} {'Spitze MB':>10}", file=out)
+    for entry in result['results']:
+        line = (f"{entry['operation']:<20} {entry['seconds']:>10.3f} {entry['rss'] / 1048576:>9.1f}"
+                f" {entry['peak_rss'] / 1048576:>10.1f}")
+        old = baseline.get(entry['operation'])
+        if old and old['seconds']:
+            line += f"   {entry['seconds'] / old['seconds']:.2f}x gegenüber {compare.get('version', '?')}"
+        print(line, file=out)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Laufzeit und Speicherbedarf von X-Live EditCSV messen.")
+    parser.add_argument("--file", help="vorhandene xcsv-Datei statt einer erzeugten messen")
+    parser.add_argument("--rows", type=int, default=100000, help="Zeilen der erzeugten Datei")
+    parser.add_argument("--columns", type=int, default=8, help="Spalten der erzeugten Datei")
+    parser.add_argument("--cardinality", type=int, default=1000, help="verschiedene Werte je Spalte")
+    parser.add_argument("--quoted", type=float, default=0.05,
+                        help="Anteil der Werte mit Komma, Anführungszeichen oder Zeilenumbruch")
+    parser.add_argument("--seed", type=int, default=1, help="Startwert des Zufallsgenerators")
+    parser.add_argument("--query", default="ab", help="Filterbegriff für search_table")
+    parser.add_argument("--delete", type=int, default=1000, help="so viele verteilte Zeilen löschen")
+    parser.add_argument("--lazy", action="store_true", help="Datei speichergemappt öffnen")
+    parser.add_argument("--output", help="Ergebnisse als JSON in diese Datei (sonst stdout)")
+    parser.add_argument("--compare", help="früheres JSON-Ergebnis zum Vergleich")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    work_dir = tempfile.mkdtemp(prefix="x-live-editcsv-benchmark.")
+    try:
+        # Journal und Cache nicht im Benutzerprofil. csvcache ist über csvcore schon
+        # geladen und hat sein Verzeichnis beim Import festgelegt, daher direkt umstellen
+        os.environ["XDG_STATE_HOME"] = os.path.join(work_dir, "state")
+        os.environ["XDG_CACHE_HOME"] = os.path.join(work_dir, "cache")
+        csvcache.CACHE_DIR = os.path.join(work_dir, "cache", "x-live-editcsv")
+        csvjournal.JOURNAL_DIR = os.path.join(work_dir, "state", "x-live-editcsv")
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        parameters = {'lazy': args.lazy, 'query': args.query, 'delete': args.delete}
+        if args.file:
+            file_path = os.path.join(work_dir, os.path.basename(args.file))
+            shutil.copyfile(args.file, file_path)
+            parameters['file'] = os.path.abspath(args.file)
+        else:
+            file_path = os.path.join(work_dir, "benchmark.xcsv")
+            start = time.perf_counter()
+            generate(file_path, args.rows, args.columns, args.cardinality, args.quoted, args.seed)
+            parameters.update(rows=args.rows, columns=args.columns, cardinality=args.cardinality,
+                              quoted=args.quoted, seed=args.seed)
+            print(f"Datei erzeugt in {time.perf_counter() - start:.1f} s", file=sys.stderr)
+        parameters['bytes'] = os.path.getsize(file_path)
+
+        from PyQt5.QtCore import QT_VERSION_STR
+        from PyQt5.QtWidgets import QApplication
+        app = QApplication.instance() or QApplication([sys.argv[0]])
+        import editcsv
+
+        benchmark = Benchmark(app, editcsv)
+        benchmark.run(file_path, args.query, args.delete, args.lazy)
+        result = {
+            'version': editcsv.VERSION,
+            'python': platform.python_version(),
+            'qt': QT_VERSION_STR,
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'parameters': parameters,
+            'results': benchmark.results,
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    compare = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare = json.load(f)
+    report(result, compare)
+    text = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
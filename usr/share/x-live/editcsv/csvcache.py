@@ -0,0 +1,143 @@
+#!/usr/bin/python3
+
+# Zwischenspeicher (Sidecar-Cache) für bereits eingelesene xcsv-Dateien.
+#
+# Je Datei wird unter ~/.cache/x-live-editcsv/ eine Cachedatei abgelegt mit
+# Kopfzeile, Spaltenbreiten, den Zeilen-Offsets (für LazyRows) und optional
+# einem spaltenweisen Abbild der Daten. Ein Eintrag gilt nur, solange Pfad,
+# Änderungszeit, Größe und Prüfsumme der Datei übereinstimmen.
+
+import hashlib
+import os
+import pickle
+from array import array
+
+CACHE_VERSION = 1
+CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'x-live-editcsv')
+# Gesamtgröße aller Cachedateien, ältere Einträge werden darüber hinaus gelöscht
+CACHE_BUDGET = 512 * 1024 * 1024
+# Spaltenabbilder nur für Dateien bis zu dieser Größe ablegen
+SNAPSHOT_LIMIT = 128 * 1024 * 1024
+# Für die Prüfsumme werden Anfang und Ende der Datei gelesen
+HASH_BLOCK = 1024 * 1024
+
+
+def cache_path(file_path):
+    key = hashlib.sha1(os.path.realpath(file_path).encode('utf-8', 'surrogateescape')).hexdigest()
+    return os.path.join(CACHE_DIR, key + ".cache")
+
+
+def fingerprint(file_path):
+    """Pfad, Änderungszeit, Größe und Prüfsumme (Anfang + Ende) der Datei."""
+    stat = os.stat(file_path)
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        digest.update(f.read(HASH_BLOCK))
+        if stat.st_size > HASH_BLOCK:
+            f.seek(max(HASH_BLOCK, stat.st_size - HASH_BLOCK))
+            digest.update(f.read(HASH_BLOCK))
+    return {
+        'path': os.path.realpath(file_path),
+        'mtime': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'hash': digest.hexdigest(),
+    }
+
+
+def load(file_path):
+    """
+    Liefert den Cacheeintrag zu file_path oder None, wenn keiner existiert oder
+    sich die Datei inzwischen geändert hat (der veraltete Eintrag wird dann gelöscht).
+    """
+    path = cache_path(file_path)
+    try:
+        with open(path, 'rb') as f:
+            entry = pickle.load(f)
+        stat = os.stat(file_path)
+        stored = entry['fingerprint']
+        # Erst die günstigen Merkmale vergleichen, die Prüfsumme nur bei Übereinstimmung
+        if entry.get('version') != CACHE_VERSION or stored['mtime'] != stat.st_mtime_ns \
+                or stored['size'] != stat.st_size or stored != fingerprint(file_path):
+            os.remove(path)
+            return None
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Cache für {file_path} unbrauchbar: {e}")
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return None
+    os.utime(path)  # zuletzt benutzt, für die Verdrängung
+    if entry.get('offsets') is not None:
+        offsets = array('q')
+        offsets.frombytes(entry['offsets'])
+        entry['offsets'] = offsets
+    return entry
+
+
+def store(file_path, header_data, tab_size, offsets=None, columns=None, has_ids=None):
+    """
+    Legt einen Cacheeintrag an bzw. ergänzt einen vorhandenen, z.B. um die
+    Offsets nach einem Öffnen mit LazyRows oder das Spaltenabbild nach einem
+    normalen Laden.
+    """
+    try:
+        entry = load(file_path) or {}
+        entry.update({
+            'version': CACHE_VERSION,
+            'fingerprint': fingerprint(file_path),
+            'header_data': list(header_data),
+            'tab_size': list(tab_size),
+        })
+        if offsets is not None:
+            entry['offsets'] = offsets.tobytes()
+        elif entry.get('offsets') is not None:
+            entry['offsets'] = entry['offsets'].tobytes()
+        if columns is not None and entry['fingerprint']['size'] <= SNAPSHOT_LIMIT:
+            entry['columns'] = columns
+            entry['has_ids'] = has_ids
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        path = cache_path(file_path)
+        with open(path + ".tmp", 'wb') as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + ".tmp", path)
+        evict()
+    except Exception as e:
+        print(f"Cache für {file_path} konnte nicht geschrieben werden: {e}")
+
+
+def evict(budget=None):
+    """Löscht die am längsten nicht benutzten Einträge, bis der Cache ins Budget passt."""
+    budget = CACHE_BUDGET if budget is None else budget
+    try:
+        names = os.listdir(CACHE_DIR)
+    except FileNotFoundError:
+        return
+    entries = []
+    total = 0
+    for name in names:
+        path = os.path.join(CACHE_DIR, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+        total += stat.st_size
+    for _, size, path in sorted(entries):
+        if total <= budget:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+
+def rows_from_columns(columns, has_ids, start=1):
+    """Zeilen (mit ID) aus einem Spaltenabbild erzeugen; erzeugte IDs beginnen bei start."""
+    if not has_ids:
+        count = len(columns[0]) if columns else 0
+        columns = [[str(i) for i in range(start, start + count)]] + list(columns)
+    return list(map(list, zip(*columns)))
@@ -0,0 +1,161 @@
+#!/usr/bin/python3
+
+# Kommandozeile für X-Live EditCSV, ohne Qt (z.B. für cron-Jobs auf Servern).
+#
+#   x-live-editcsv filter  "linux Preis>100" [--exclude "..."] [DATEI]
+#   x-live-editcsv convert --to csv|xcsv [DATEI]
+#   x-live-editcsv select  "Name,Preis" [DATEI]
+#
+# Ohne DATEI (oder mit "-") wird von stdin gelesen, ausgegeben wird immer auf
+# stdout. Die Zeilen werden einzeln durchgereicht, der Speicherbedarf bleibt
+# unabhängig von der Dateigröße. Filter und Spaltenangaben folgen derselben
+# Syntax wie die Filterfelder der Oberfläche (siehe csvsearch). Den Typ einer
+# Spalte (Zahl, Datum, Text) erkennt die Oberfläche aus allen Zeilen, hier
+# wird er aus den ersten INFER_SAMPLE_ROWS Zeilen bestimmt.
+
+import argparse
+import csv
+import io
+import os
+import sys
+from itertools import chain, islice
+
+import csvcore
+import csvsearch
+
+FORMATS = ("xcsv", "csv")
+# Zeilen, aus denen der Typ der gefilterten Spalten erkannt wird
+INFER_SAMPLE_ROWS = 10000
+
+
+class CSVInput:
+    """Einfache csv-Datei (Kopfzeile ohne Spaltenbreiten) mit derselben Schnittstelle wie XCSVReader."""
+    def __init__(self, binary_file):
+        self.reader = csv.reader(io.TextIOWrapper(binary_file, encoding='utf-8', newline=''))
+        self.header_data = next((row for row in self.reader if row), None)
+        if self.header_data is None:
+            raise ValueError("Datei enthält keine Kopfzeile")
+        # gleich breite Spalten, falls als xcsv ausgegeben wird
+        self.tab_size = [100 // max(len(self.header_data), 1)] * len(self.header_data)
+        self.columns = len(self.header_data) + 1
+
+    def rows(self):
+        for row in self.reader:
+            if row:
+                row = [""] + row[:self.columns - 1]  # leere ID wie bei XCSVReader
+                if len(row) < self.columns:
+                    row.extend([""] * (self.columns - len(row)))
+                yield row
+
+
+def input_format(path, requested):
+    if requested:
+        return requested
+    return "csv" if path and path.lower().endswith(".csv") else "xcsv"
+
+
+def open_input(path, file_format):
+    binary_file = sys.stdin.buffer if path in (None, "-") else open(path, 'rb')
+    if file_format == "csv":
+        return CSVInput(binary_file)
+    return csvcore.XCSVReader(binary_file)
+
+
+def select_columns(spec, header_data):
+    """Spaltenindizes zu "Name,#3,..." (siehe csvsearch.resolve_column)."""
+    columns = []
+    for name in next(csv.reader([spec])):
+        column = csvsearch.resolve_column(name.strip(), header_data)
+        if column is None:
+            raise ValueError(f"Unbekannte Spalte: {name.strip()}")
+        columns.append(column)
+    return columns
+
+
+def run(args):
+    reader = open_input(args.file, input_format(args.file, args.source))
+    header_data = reader.header_data
+    tab_size = reader.tab_size
+    rows = reader.rows()
+
+    if args.command == "filter":
+        search_terms = csvsearch.parse_query(args.query, header_data)
+        exclude_terms = csvsearch.parse_query(args.exclude or "", header_data)
+        # Spaltentypen wie in der Oberfläche erkennen, dafür die ersten Zeilen vorab lesen
+        sample = list(islice(rows, INFER_SAMPLE_ROWS))
+        matches = csvsearch.row_filter(search_terms, exclude_terms, len(header_data), sample)
+        rows = (row for row in chain(sample, rows) if matches(row))
+
+    if args.columns:
+        columns = select_columns(args.columns, header_data)
+        header_data = [header_data[column] for column in columns]
+        tab_size = [tab_size[column] if column < len(tab_size) else 0 for column in columns]
+        rows = ([row[column + 1] for column in columns] for row in rows)
+    else:
+        rows = (row[1:] for row in rows)  # ID entfernen
+
+    out = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', newline='', write_through=False)
+    writer = csv.writer(out)
+    writer.writerow(header_data)
+    if args.to == "xcsv":
+        writer.writerow(tab_size)
+    writer.writerows(rows)
+    out.flush()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="x-live-editcsv",
+        description="xcsv-/csv-Dateien ohne Oberfläche filtern, umwandeln und Spalten auswählen.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def common(command):
+        command.add_argument("file", nargs="?", help="Eingabedatei (ohne oder '-': stdin)")
+        command.add_argument("--from", dest="source", choices=FORMATS,
+                             help="Eingabeformat (Standard: nach Dateiendung, stdin: xcsv)")
+        command.add_argument("--to", choices=FORMATS, default="xcsv", help="Ausgabeformat (Standard: xcsv)")
+
+    filter_command = commands.add_parser(
+        "filter", help="Zeilen filtern (Syntax wie im Filterfeld)",
+        description="Zeilen filtern, Syntax wie im Filterfeld. Ob eine Spalte Zahlen, Datumswerte oder "
+                    "Text enthält, wird wie in der Oberfläche je Spalte erkannt, aus den ersten "
+                    f"{INFER_SAMPLE_ROWS} Zeilen. Zellen, die nicht zum Typ passen, erfüllen keinen Vergleich.")
+    filter_command.add_argument("query", help="Suchbegriffe und Spaltenfilter, z.B. 'linux Preis>100'")
+    filter_command.add_argument("--exclude", help="Ausschlussbegriffe und -Spaltenfilter")
+    filter_command.add_argument("--columns", help="nur diese Spalten ausgeben, z.B. 'Name,#3'")
+    common(filter_command)
+
+    convert_command = commands.add_parser("convert", help="zwischen xcsv und csv umwandeln")
+    convert_command.add_argument("--columns", help="nur diese Spalten ausgeben, z.B. 'Name,#3'")
+    common(convert_command)
+
+    select_command = commands.add_parser("select", help="nur bestimmte Spalten ausgeben")
+    select_command.add_argument("columns", help="Spalten, z.B. 'Name,Preis' oder '#1,#3'")
+    common(select_command)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    # Positionsargumente hinter Optionen ("filter linux --exclude mint DATEI") ordnet
+    # argparse bei Unterbefehlen nicht mehr zu; übrig bleiben darf nur die Datei
+    if extra:
+        if args.file is not None or len(extra) > 1 or (extra[0].startswith('-') and extra[0] != '-'):
+            parser.error("unbekannte Argumente: " + " ".join(extra))
+        args.file = extra[0]
+    try:
+        run(args)
+    except BrokenPipeError:
+        # Ausgabe wurde vorzeitig geschlossen (z.B. "| head"), kein Fehler; stdout
+        # umleiten, damit das abschließende Leeren des Puffers nicht erneut scheitert
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    except (OSError, ValueError, csv.Error) as e:
+        print(f"x-live-editcsv: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+#!/usr/bin/python3
+
+# Typisierte Spalten für X-Live EditCSV (ohne Qt).
+#
+# Für Vergleiche wie "Preis > 100" oder "Datum >= 01.01.24" wird je Spalte
+# einmal erkannt, ob sie Zahlen, Datumswerte (dd.mm.yy wie von
+# EditDialog.set_date geschrieben, oder dd.mm.yyyy) oder Text enthält. Die
+# Werte werden dann als kompaktes Array abgelegt und die Vergleiche über das
+# ganze Array ausgewertet - mit numpy, falls installiert.
+
+import math
+import operator
+import re
+from array import array
+from datetime import date
+
+import csvstore
+
+# numpy wird erst beim ersten Vergleich geladen, der Import kostet spürbar Startzeit
+_numpy = None
+
+NUMBER = "number"
+DATE = "date"
+TEXT = "text"
+
+# so ein Anteil der nicht leeren Zellen darf unlesbar sein ("k.A.", Tippfehler),
+# ohne dass eine Zahlen- oder Datumsspalte zur Textspalte wird
+UNPARSABLE_SHARE = 0.01
+
+DATE_PATTERN = re.compile(r'^(\d{1,2})\.(\d{1,2})\.(\d{2}|\d{4})$')
+NAN = float('nan')
+
+OPERATORS = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '=': operator.eq,
+    '!=': operator.ne,
+}
+
+
+def parse_number(text):
+    """Zahl aus einer Zelle lesen ("12", "12.5", "12,50", "1.234,50 €"), sonst None."""
+    text = text.strip().rstrip('€%').strip().replace(' ', '')
+    if not text:
+        return None
+    if ',' in text:
+        # deutsche Schreibweise: Punkt als Tausendertrennzeichen, Komma als Dezimalzeichen
+        text = text.replace('.', '').replace(',', '.')
+    try:
+        value = float(text)
+    except ValueError:
+        return None
+    return value if math.isfinite(value) else None
+
+
+def parse_date(text):
+    """Datum dd.mm.yy oder dd.mm.yyyy als Tageszahl (date.toordinal), sonst None."""
+    match = DATE_PATTERN.match(text.strip())
+    if not match:
+        return None
+    day, month, year = (int(part) for part in match.groups())
+    if len(match.group(3)) == 2:
+        # wie strptime("%y"): 69-99 -> 1900er, 00-68 -> 2000er
+        year += 1900 if year >= 69 else 2000
+    try:
+        return float(date(year, month, day).toordinal())
+    except ValueError:
+        return None
+
+
+PARSERS = {NUMBER: parse_number, DATE: parse_date}
+
+
+def load_numpy():
+    """numpy-Modul oder None, falls nicht installiert."""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy = numpy
+    return _numpy or None
+
+
+def value_kind(value):
+    """Typ, den ein Vergleichswert nahelegt - für Vergleiche ohne ganze Spalte."""
+    for kind in (NUMBER, DATE):
+        if PARSERS[kind](value) is not None:
+            return kind
+    return TEXT
+
+
+def cell_matcher(op, value):
+    """
+    Prüffunktion für "Zelle op value" auf einzelnen Zellen, wenn keine Spalte
+    zur Verfügung steht. Der Typ ergibt sich aus dem Vergleichswert; leere oder
+    unlesbare Zellen erfüllen keinen Vergleich.
+    """
+    return column_matcher(value_kind(value), op, value)
+
+
+def column_matcher(kind, op, value):
+    """
+    Prüffunktion für "Zelle op value" in einer Spalte vom Typ kind, mit
+    denselben Ergebnissen wie TypedColumn.compare: passt der Vergleichswert
+    nicht zum Spaltentyp, erfüllt keine Zelle den Vergleich.
+    """
+    compare = OPERATORS[op]
+    if kind == TEXT:
+        return lambda cell: compare(cell.lower(), value)
+    parse = PARSERS[kind]
+    value = parse(value)
+    if value is None:
+        return lambda cell: False
+
+    def matches(cell):
+        cell = parse(cell)
+        return cell is not None and compare(cell, value)
+    return matches
+
+
+def infer_kind(cells):
+    """
+    Spaltentyp aus allen nicht leeren Zellen bestimmen. Höchstens
+    UNPARSABLE_SHARE davon dürfen nicht zum Typ passen, sie gelten dann wie
+    leere Zellen (siehe TypedColumn.unparsed).
+    """
+    cells = [cell for cell in cells if cell.strip()]
+    allowed = int(len(cells) * UNPARSABLE_SHARE)
+    failures = {NUMBER: 0, DATE: 0}
+    for cell in cells:
+        for kind in list(failures):
+            if PARSERS[kind](cell) is None:
+                failures[kind] += 1
+                if failures[kind] > allowed:
+                    del failures[kind]
+        if not failures:
+            return TEXT
+    # bei gleich vielen Fehlern gewinnt wie bisher die Zahl
+    return min(failures, key=failures.get) if cells else TEXT
+
+
+class TypedColumn:
+    """
+    Werte einer Spalte in typisierter Form: array('d') für Zahlen/Datum, sonst
+    Kleintext. Nicht lesbare Zellen einer Zahlen- oder Datumsspalte stehen wie
+    leere als NaN darin, unparsed zählt sie (nach Änderungen eine Obergrenze).
+    """
+    def __init__(self, cells):
+        cells = list(cells)
+        self.kind = infer_kind(cells)
+        self.unparsed = 0
+        if self.kind == TEXT:
+            self.values = [cell.lower() for cell in cells]
+        else:
+            values = [self.convert(cell) for cell in cells]
+            self.unparsed = values.count(None)
+            self.values = array('d', (NAN if value is None else value for value in values))
+
+    def convert(self, cell):
+        """Zellwert in den Spaltentyp umwandeln; liefert None, wenn er nicht passt."""
+        if self.kind == TEXT:
+            return cell.lower()
+        if not cell.strip():
+            return NAN
+        return PARSERS[self.kind](cell)
+
+    def update(self, row, cells, insert=False):
+        """
+        Werte ab row ersetzen bzw. anhängen (insert: vor row einfügen); False,
+        wenn danach zu viele Zellen nicht zum Typ passen.
+        """
+        values = [self.convert(cell) for cell in cells]
+        unparsed = values.count(None)
+        if unparsed:
+            if self.unparsed + unparsed > int(len(self.values) * UNPARSABLE_SHARE):
+                return False
+            self.unparsed += unparsed
+            values = [NAN if value is None else value for value in values]
+        stop = row if insert else row + len(values)
+        self.values[row:stop] = values if self.kind == TEXT else array('d', values)
+        return True
+
+    def insert_blocks(self, blocks):
+        """
+        Blöcke (Position, Zellen) in einem Durchlauf einfügen (siehe csvstore.merge);
+        False wie bei update.
+        """
+        blocks = [(first, [self.convert(cell) for cell in cells]) for first, cells in blocks]
+        unparsed = sum(values.count(None) for first, values in blocks)
+        if unparsed:
+            if self.unparsed + unparsed > int(len(self.values) * UNPARSABLE_SHARE):
+                return False
+            self.unparsed += unparsed
+            blocks = [(first, [NAN if value is None else value for value in values]) for first, values in blocks]
+        self.values = csvstore.merge(self.values, blocks)
+        return True
+
+    def remove(self, first, last):
+        del self.values[first:last + 1]
+
+    def remove_ranges(self, ranges):
+        """Bereiche (erste, letzte) in einem Durchlauf entfernen (siehe csvstore.compact)."""
+        self.values = csvstore.compact(self.values, ranges)
+
+    def permutation(self, descending=False):
+        """
+        Zeilenindizes nach dieser Spalte sortiert (stabil); leere Zellen stehen
+        in beiden Richtungen am Ende.
+        """
+        values = self.values
+        if self.kind == TEXT:
+            if descending:
+                return sorted(range(len(values)), key=lambda row: (values[row] != "", values[row]), reverse=True)
+            return sorted(range(len(values)), key=lambda row: (values[row] == "", values[row]))
+        numpy = load_numpy()
+        if numpy is not None:
+            keys = numpy.frombuffer(values, dtype=numpy.float64)
+            # NaN (leere Zellen) sortiert numpy immer ans Ende, auch bei negierten Werten
+            return numpy.argsort(-keys if descending else keys, kind='stable').tolist()
+        if descending:
+            return sorted(range(len(values)), key=lambda row: (values[row] == values[row], values[row] if values[row] == values[row] else 0.0), reverse=True)
+        return sorted(range(len(values)), key=lambda row: (values[row] != values[row], values[row] if values[row] == values[row] else 0.0))
+
+    def compare(self, op, value, candidates=None):
+        """
+        Zeilenindizes, deren Wert den Vergleich "Wert op value" erfüllt. Leere
+        oder unlesbare Zellen erfüllen keinen Vergleich.
+        """
+        if self.kind != TEXT:
+            value = PARSERS[self.kind](value)
+            if value is None:
+                return []  # Vergleichswert passt nicht zum Spaltentyp
+            numpy = load_numpy()
+            if numpy is not None and candidates is None:
+                values = numpy.frombuffer(self.values, dtype=numpy.float64)
+                mask = OPERATORS[op](values, value) & ~numpy.isnan(values)
+                return numpy.flatnonzero(mask).tolist()
+        compare = OPERATORS[op]
+        values = self.values
+        rows = range(len(values)) if candidates is None else candidates
+        if self.kind == TEXT:
+            return [row for row in rows if compare(values[row], value)]
+        # NaN == NaN ist falsch, damit fallen leere Zellen auch bei "!=" heraus
+        return [row for row in rows if values[row] == values[row] and compare(values[row], value)]
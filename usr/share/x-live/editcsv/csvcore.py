@@ -0,0 +1,398 @@
+#!/usr/bin/python3
+
+# Reine Dateilogik für X-Live EditCSV (ohne Qt).
+#
+# Aufbau einer xcsv-Datei:
+#   1. Zeile: Kopfzeile (Spaltennamen)
+#   2. Zeile: Spaltenbreiten in Prozent (tab_size)
+#   ab 3. Zeile: Datenzeilen
+#
+# Im Speicher wird jeder Datenzeile eine ID vorangestellt, falls die Datei
+# keine eigene (numerische) erste Spalte hat.
+
+import csv
+import io
+import mmap
+import os
+import tempfile
+from array import array
+from itertools import islice
+
+import csvcache
+import csvstore
+
+# Zeilen je Block beim Speichern: so viele werden gesammelt und auf einmal geschrieben
+WRITE_BLOCK = 10000
+
+
+def decode_lines(binary_file, counter):
+    """Liest eine Binärdatei zeilenweise, zählt die gelesenen Bytes und liefert Text."""
+    for line in binary_file:
+        counter[0] += len(line)
+        yield line.decode('utf-8')
+
+
+class XCSVReader:
+    """
+    Liest eine xcsv-Datei als Strom: Kopfzeile und Spaltenbreiten sofort,
+    die Datenzeilen blockweise. Jede Zeile wird genau einmal beim Einlesen
+    mit ID versehen und auf die Spaltenanzahl gebracht.
+    """
+    def __init__(self, binary_file):
+        self._counter = [0]
+        self.reader = csv.reader(decode_lines(binary_file, self._counter))
+        self.header_data = self._next_row()
+        tab_size_str = self._next_row()
+        if self.header_data is None or tab_size_str is None:
+            raise ValueError("Datei enthält keine Kopfzeile")
+        self.tab_size = [int(data) for data in tab_size_str]
+        self.columns = len(self.header_data) + 1
+        self.has_ids = None
+        self.rows_read = 0
+
+    @property
+    def bytes_read(self):
+        return self._counter[0]
+
+    def _next_row(self):
+        for row in self.reader:
+            if row:
+                return row
+        return None
+
+    def normalize(self, row):
+        """ID voranstellen (falls nötig) und Zeile auf die Spaltenanzahl bringen."""
+        # IDs hinzufügen, falls keine vorhanden sind - entschieden wird an der ersten Datenzeile
+        if self.has_ids is None:
+            self.has_ids = row[0].isdigit()
+        self.rows_read += 1
+        if not self.has_ids:
+            row.insert(0, str(self.rows_read))
+        if len(row) < self.columns:
+            row.extend([""] * (self.columns - len(row)))
+        elif len(row) > self.columns:
+            del row[self.columns:]
+        return row
+
+    def rows(self):
+        for row in self.reader:
+            if row:
+                yield self.normalize(row)
+
+    def chunks(self, size=20000):
+        """Liefert die Datenzeilen in Blöcken von höchstens size Zeilen."""
+        chunk = []
+        for row in self.rows():
+            chunk.append(row)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def file_mode(file_path):
+    """Rechte der vorhandenen Zieldatei bzw. die Voreinstellung (umask) für eine neue."""
+    try:
+        return os.stat(file_path).st_mode & 0o7777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def write_rows(f, rows, progress=None, first_lines=()):
+    """
+    Schreibt first_lines und rows blockweise in die Textdatei f: csv.writer
+    schreibt in einen Puffer, die Datei erhält ganze Blöcke. progress(zeilen)
+    wird nach jedem Block aufgerufen; liefert es False, wird abgebrochen
+    (InterruptedError).
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows(first_lines)
+    rows = iter(rows)
+    written = 0
+    while True:
+        block = list(islice(rows, WRITE_BLOCK))
+        if not block:
+            break
+        writer.writerows(block)
+        f.write(buffer.getvalue())
+        buffer.seek(0)
+        buffer.truncate()
+        written += len(block)
+        if progress is not None and progress(written) is False:
+            raise InterruptedError("Speichern abgebrochen")
+    f.write(buffer.getvalue())
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def write_xcsv(file_path, header_data, tab_size, rows, progress=None):
+    """
+    Schreibt eine xcsv-Datei atomar: zuerst in eine Hilfsdatei im selben
+    Verzeichnis, die nach flush/fsync über die Zieldatei umbenannt wird. Ein
+    Absturz während des Schreibens lässt die alte Datei unverändert.
+    rows liefert die Zeilen ohne ID.
+    """
+    file_path = os.path.abspath(file_path)
+    directory = os.path.dirname(file_path)
+    mode = file_mode(file_path)
+    fd, temp_path = tempfile.mkstemp(prefix="." + os.path.basename(file_path) + ".",
+                                     suffix=".tmp", dir=directory)
+    try:
+        with open(fd, 'w', newline='', encoding='utf-8') as f:
+            write_rows(f, rows, progress, first_lines=(header_data, tab_size))
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    # Umbenennung selbst dauerhaft machen
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+    except OSError:
+        pass
+
+
+def append_xcsv(file_path, rows, progress=None):
+    """
+    Hängt Zeilen (ohne ID) an eine vorhandene xcsv-Datei an. Bei einem Fehler
+    oder Abbruch wird die Datei wieder auf ihre alte Länge gekürzt.
+    """
+    with open(file_path, 'rb') as f:
+        size = f.seek(0, os.SEEK_END)
+        if size:
+            f.seek(size - 1)
+        complete = not size or f.read(1) == b"\n"
+    try:
+        with open(file_path, 'a', newline='', encoding='utf-8') as f:
+            if not complete:
+                f.write("\r\n")  # letzte Zeile der Datei abschließen
+            write_rows(f, rows, progress)
+    except BaseException:
+        os.truncate(file_path, size)
+        raise
+
+
+def _field_start(buf, pos, first):
+    """Beginnt an pos ein Feld? Nur dort öffnet ein Anführungszeichen ein Feld in Anführungszeichen."""
+    return pos == first or buf[pos - 1:pos] in (b',', b'\n')
+
+
+def next_record(buf, pos, target, end):
+    """
+    Anfang des ersten Datensatzes hinter target (oder end). pos muss selbst ein
+    Datensatzanfang sein. Wie bei csv.reader öffnet ein Anführungszeichen nur
+    am Feldanfang ein Feld, in dem Kommas und Zeilenumbrüche zum Inhalt
+    gehören; doppelte Anführungszeichen ("") darin schließen es nicht. Andere
+    Anführungszeichen (z.B. 12" Monitor) sind gewöhnliche Zeichen. Dazwischen
+    wird nur von Anführungszeichen zu Anführungszeichen gesprungen.
+    """
+    find = buf.find
+    first = pos
+    while True:
+        quote = find(b'"', pos, end)
+        limit = end if quote == -1 else quote
+        if limit > target:
+            newline = find(b'\n', max(pos, target), limit)
+            if newline != -1:
+                return newline + 1
+        if quote == -1:
+            return end
+        if not _field_start(buf, quote, first):
+            pos = quote + 1
+            continue
+        closing = find(b'"', quote + 1, end)
+        while closing != -1 and buf[closing + 1:closing + 2] == b'"':
+            closing = find(b'"', closing + 2, end)
+        if closing == -1:
+            return end  # nicht geschlossen: der Rest gehört zum Feld
+        pos = closing + 1
+
+
+def build_row_index(buf, start=0, end=None, progress=None):
+    """
+    Ermittelt die Byte-Offsets aller Datensatzanfänge in buf (bytes oder mmap).
+    Zeilenumbrüche innerhalb von Anführungszeichen beenden keinen Datensatz
+    (siehe next_record), leere Zeilen werden übersprungen. progress(pos) wird
+    regelmäßig aufgerufen und bricht ab, wenn es False liefert.
+    """
+    offsets = array('q')
+    size = len(buf) if end is None else end
+    find = buf.find
+    pos = start
+    count = 0
+    while pos < size:
+        record_start = pos
+        newline = find(b'\n', pos, size)
+        if newline == -1:
+            newline = size
+        if find(b'"', pos, newline) == -1:
+            pos = newline + 1  # häufigster Fall: Zeile ohne Anführungszeichen
+        else:
+            pos = next_record(buf, pos, pos, size)
+        if buf[record_start:record_start + 1] not in (b'\n', b'\r'):
+            offsets.append(record_start)
+        count += 1
+        if progress is not None and count % 65536 == 0 and progress(pos) is False:
+            return None
+    return offsets
+
+
+def parse_record(buf, start, end):
+    """Einen einzelnen Datensatz aus buf[start:end] parsen."""
+    text = buf[start:end].decode('utf-8')
+    for row in csv.reader(io.StringIO(text, newline='')):
+        if row:
+            return row
+    return []
+
+
+class LazyRows:
+    """
+    Zeilenliste über einer speichergemappten xcsv-Datei. Gespeichert wird nur
+    ein Offset je Zeile, geparst wird erst beim Zugriff. Sie verhält sich wie
+    die Liste CSVEditor.data: Änderungen und neue Zeilen landen in einer
+    Überlagerung, die Datei selbst wird nie verändert.
+    """
+    CACHE_SIZE = 4096
+
+    def __init__(self, file_path, progress=None, use_cache=True):
+        self.file_path = file_path
+        self.file = open(file_path, 'rb')
+        if os.fstat(self.file.fileno()).st_size:
+            self.buf = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self.buf = b""
+        # Offsets aus dem Sidecar-Cache übernehmen, wenn die Datei unverändert ist
+        entry = csvcache.load(file_path) if use_cache else None
+        offsets = entry.get('offsets') if entry else None
+        self.from_cache = offsets is not None
+        if offsets is None:
+            offsets = build_row_index(self.buf, progress=progress)
+            if offsets is None:
+                self.close()
+                raise InterruptedError("Indizierung abgebrochen")
+        if len(offsets) < 2:
+            self.close()
+            raise ValueError("Datei enthält keine Kopfzeile")
+        self.header_data = parse_record(self.buf, offsets[0], offsets[1])
+        self.tab_size = [int(data) for data in parse_record(self.buf, offsets[1], offsets[2] if len(offsets) > 2 else len(self.buf))]
+        self.columns = len(self.header_data) + 1
+        if use_cache and not self.from_cache:
+            csvcache.store(file_path, self.header_data, self.tab_size, offsets=offsets)
+        # Datensätze ab der 3. Zeile; offsets[i + 1] bzw. das Dateiende begrenzt Zeile i
+        self.offsets = offsets[2:]
+        self.offsets.append(len(self.buf))
+        self.has_ids = bool(len(self.offsets) > 1) and self._parse(0)[0].isdigit()
+        # Schlüssel je sichtbarer Zeile: Index in self.offsets oder neue Zeile
+        self.keys = array('q', range(len(self.offsets) - 1))
+        self.next_key = len(self.offsets)
+        self.overlay = {}
+        self.cache = {}
+
+    def _parse(self, key):
+        return parse_record(self.buf, self.offsets[key], self.offsets[key + 1])
+
+    def _row(self, key):
+        row = self.overlay.get(key)
+        if row is not None:
+            return row
+        row = self.cache.get(key)
+        if row is not None:
+            return row
+        row = self._parse(key)
+        if not self.has_ids:
+            row.insert(0, str(key + 1))
+        if len(row) < self.columns:
+            row.extend([""] * (self.columns - len(row)))
+        elif len(row) > self.columns:
+            del row[self.columns:]
+        if len(self.cache) >= self.CACHE_SIZE:
+            self.cache.clear()
+        self.cache[key] = row
+        return row
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._row(key) for key in self.keys[index]]
+        return self._row(self.keys[index])
+
+    def __setitem__(self, index, row):
+        if isinstance(index, slice):
+            # rows[i:j] = zeilen: ersetzte Zeilen entfernen, die neuen landen in der Überlagerung
+            start, stop, step = index.indices(len(self.keys))
+            if step != 1:
+                raise ValueError("LazyRows unterstützt nur zusammenhängende Bereiche")
+            del self[start:max(start, stop)]
+            keys = array('q', range(self.next_key, self.next_key + len(row)))
+            self.next_key += len(row)
+            self.overlay.update(zip(keys, row))
+            self.keys[start:start] = keys
+            return
+        self.overlay[self.keys[index]] = row
+
+    def __delitem__(self, index):
+        keys = self.keys[index] if isinstance(index, slice) else [self.keys[index]]
+        for key in keys:
+            self.overlay.pop(key, None)
+            self.cache.pop(key, None)
+        del self.keys[index]
+
+    def truncate(self, width):
+        """Zellen ab Spalte width verwerfen, wie ColumnStore.truncate."""
+        width = max(width, 1)
+        self.columns = min(self.columns, width)
+        self.cache.clear()
+        # die Zeilen selbst nicht verkürzen, die Historie kann sie noch referenzieren
+        for key, row in self.overlay.items():
+            if len(row) > width:
+                self.overlay[key] = row[:width]
+
+    def remove_ranges(self, ranges):
+        """Bereiche (erste, letzte) in einem Durchlauf entfernen, wie ColumnStore.remove_ranges."""
+        for first, last in ranges:
+            for key in self.keys[first:last + 1]:
+                self.overlay.pop(key, None)
+                self.cache.pop(key, None)
+        self.keys = csvstore.compact(self.keys, ranges)
+
+    def insert_blocks(self, blocks):
+        """Blöcke (Position, Zeilen) in einem Durchlauf einfügen, wie ColumnStore.insert_blocks."""
+        key_blocks = []
+        for first, rows in blocks:
+            keys = array('q', range(self.next_key, self.next_key + len(rows)))
+            self.next_key += len(rows)
+            self.overlay.update(zip(keys, rows))
+            key_blocks.append((first, keys))
+        self.keys = csvstore.merge(self.keys, key_blocks)
+
+    def __iter__(self):
+        for key in self.keys:
+            yield self._row(key)
+
+    def append(self, row):
+        self.keys.append(self.next_key)
+        self.overlay[self.next_key] = row
+        self.next_key += 1
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    def close(self):
+        if isinstance(self.buf, mmap.mmap):
+            self.buf.close()
+        self.file.close()
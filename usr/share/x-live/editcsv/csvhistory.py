@@ -0,0 +1,136 @@
+#!/usr/bin/python3
+
+# Rückgängig/Wiederholen für X-Live EditCSV (ohne Qt).
+#
+# Gespeichert wird je Änderung nur, was zum Umkehren nötig ist: bei einer
+# bearbeiteten Zeile die geänderten Zellen (alt/neu), bei gelöschten Zeilen
+# deren Inhalt und Position, bei angehängten Zeilen die neuen Zeilen. Die
+# Tabelle selbst wird nie kopiert. Übersteigt der geschätzte Speicherbedarf
+# HISTORY_BUDGET, werden die ältesten Schritte verworfen.
+
+from collections import deque
+
+# geschätzter Speicher für alle Schritte zusammen
+HISTORY_BUDGET = 64 * 1024 * 1024
+# grobe Schätzung je gespeicherter Zelle (Listeneintrag + str-Objekt)
+CELL_OVERHEAD = 56
+
+ADD = "add"
+EDIT = "edit"
+DELETE = "delete"
+HEADER = "header"
+CLEAR = "clear"
+
+
+def rows_size(rows):
+    return sum(len(str(cell)) + CELL_OVERHEAD for row in rows for cell in row)
+
+
+class Change:
+    """
+    Ein Schritt der Historie.
+      ADD:    first, rows          - rows wurden ab first angehängt
+      EDIT:   row, cells           - {Spalte: (alt, neu)} der Zeile row
+      DELETE: blocks               - [(first, rows)] aufsteigend, alte Positionen
+      HEADER: old, new             - (header_data, tab_size) vorher/nachher
+      CLEAR:  data, header, journal - geleerte Zeilenliste, (header_data, tab_size) und
+                                     das Journal der Datei, zu der die Tabelle gehörte
+    """
+    def __init__(self, kind, size, **values):
+        self.kind = kind
+        self.size = size
+        self.__dict__.update(values)
+
+
+def added(first, rows):
+    return Change(ADD, rows_size(rows), first=first, rows=rows)
+
+
+def edited(row, old_row, new_row):
+    """Nur die Zellen merken, die sich tatsächlich geändert haben; None, wenn keine."""
+    width = max(len(old_row), len(new_row))
+    old_row = old_row + [""] * (width - len(old_row))
+    new_row = new_row + [""] * (width - len(new_row))
+    cells = {column: (old, new) for column, (old, new) in enumerate(zip(old_row, new_row)) if old != new}
+    if not cells:
+        return None
+    size = sum(len(old) + len(new) + 2 * CELL_OVERHEAD for old, new in cells.values())
+    return Change(EDIT, size, row=row, cells=cells)
+
+
+def deleted(blocks):
+    return Change(DELETE, sum(rows_size(rows) for first, rows in blocks), blocks=blocks)
+
+
+def header_changed(old, new):
+    return Change(HEADER, rows_size(old) + rows_size(new), old=old, new=new)
+
+
+def cleared(data, header, journal=None):
+    # die Zeilenliste wird nur referenziert, sie bleibt aber so lange im Speicher
+    if hasattr(data, 'nbytes'):
+        size = data.nbytes()
+    else:
+        size = len(data) * (len(header[0]) + 1) * CELL_OVERHEAD
+    return Change(CLEAR, size, data=data, header=header, journal=journal)
+
+
+def apply_cells(row_data, cells, index):
+    """Zeile mit den alten (index 0) oder neuen (index 1) Werten aus cells."""
+    width = max(len(row_data), max(cells) + 1)
+    row_data = row_data + [""] * (width - len(row_data))
+    for column, values in cells.items():
+        row_data[column] = values[index]
+    return row_data
+
+
+class History:
+    """Rückgängig- und Wiederholen-Stapel mit Speicherobergrenze."""
+    def __init__(self, budget=HISTORY_BUDGET):
+        self.budget = budget
+        self.undo_stack = deque()
+        self.redo_stack = []
+        self.size = 0
+
+    def push(self, change):
+        """Neuen Schritt merken; Wiederholen ist danach nicht mehr möglich."""
+        if change is None:
+            return
+        for old in self.redo_stack:
+            self.size -= old.size
+        self.redo_stack = []
+        self.undo_stack.append(change)
+        self.size += change.size
+        self._evict()
+
+    def _evict(self):
+        # älteste Schritte zuerst verwerfen
+        while self.undo_stack and self.size > self.budget:
+            self.size -= self.undo_stack.popleft().size
+
+    def undo(self):
+        """Letzten Schritt zum Rückgängigmachen liefern (oder None)."""
+        if not self.undo_stack:
+            return None
+        change = self.undo_stack.pop()
+        self.redo_stack.append(change)
+        return change
+
+    def redo(self):
+        """Zuletzt rückgängig gemachten Schritt zum Wiederholen liefern (oder None)."""
+        if not self.redo_stack:
+            return None
+        change = self.redo_stack.pop()
+        self.undo_stack.append(change)
+        return change
+
+    def can_undo(self):
+        return bool(self.undo_stack)
+
+    def can_redo(self):
+        return bool(self.redo_stack)
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack = []
+        self.size = 0
@@ -0,0 +1,101 @@
+#!/usr/bin/python3
+
+# Änderungsjournal für X-Live EditCSV (ohne Qt).
+#
+# Jede Änderung an einer geöffneten Datei (Zeile anhängen, bearbeiten,
+# löschen, Kopfzeile ändern) wird sofort als eine JSON-Zeile an ein Journal
+# unter ~/.local/state/x-live-editcsv/ angehängt. Stürzt das Programm ab oder
+# wird es ohne Speichern beendet, können die Änderungen beim nächsten Öffnen
+# der Datei wieder eingespielt werden. Die erste Zeile des Journals hält den
+# Stand der Quelldatei fest; passt er nicht mehr, ist das Journal verworfen.
+# Beim Leeren löst sich die Tabelle von ihrer Datei, das Journal wird nur
+# geschlossen und beim Rückgängigmachen weitergeführt.
+
+import hashlib
+import json
+import os
+
+import csvcache
+
+JOURNAL_DIR = os.path.join(os.environ.get('XDG_STATE_HOME') or os.path.expanduser('~/.local/state'),
+                           'x-live-editcsv')
+
+ADD = "add"
+EDIT = "edit"
+DELETE = "delete"
+INSERT = "insert"
+HEADER = "header"
+
+
+def journal_path(file_path):
+    key = hashlib.sha1(os.path.realpath(file_path).encode('utf-8', 'surrogateescape')).hexdigest()
+    return os.path.join(JOURNAL_DIR, key + ".journal")
+
+
+class Journal:
+    """
+    Journal zu einer Quelldatei. Der Stand der Datei wird beim Anlegen
+    festgehalten, die Journaldatei selbst erst mit der ersten Änderung erzeugt.
+    """
+    def __init__(self, file_path):
+        self.file_path = os.path.realpath(file_path)
+        self.path = journal_path(file_path)
+        self.fingerprint = csvcache.fingerprint(file_path)
+        self.file = None
+        self.count = 0  # Änderungen seit dem letzten Speichern
+
+    def pending(self):
+        """
+        Liefert die Änderungen eines vorhandenen Journals, wenn es zum aktuellen
+        Stand der Quelldatei passt, sonst None.
+        """
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                lines = f.readlines()
+        except OSError:
+            return None
+        operations = []
+        for line in lines:
+            try:
+                operations.append(json.loads(line))
+            except ValueError:
+                break  # unvollständig geschriebene letzte Zeile
+        if not operations or operations[0].get('op') != 'base' \
+                or operations[0].get('fingerprint') != self.fingerprint:
+            return None
+        return operations[1:]
+
+    def resume(self, count):
+        """Vorhandenes Journal weiterführen (nach dem Wiedereinspielen)."""
+        self.file = open(self.path, 'a', encoding='utf-8')
+        self.count = count
+
+    def record(self, op, **values):
+        """Eine Änderung anhängen und sofort auf die Platte schreiben."""
+        values['op'] = op
+        if self.file is None:
+            os.makedirs(JOURNAL_DIR, exist_ok=True)
+            self.file = open(self.path, 'w', encoding='utf-8')
+            self._write({'op': 'base', 'path': self.file_path, 'fingerprint': self.fingerprint})
+        self._write(values)
+        self.count += 1
+
+    def _write(self, values):
+        self.file.write(json.dumps(values, ensure_ascii=False, separators=(',', ':')) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        """Journal schließen; die Datei bleibt für ein späteres Wiedereinspielen liegen."""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def discard(self):
+        """Journal schließen und löschen, z.B. nachdem die Änderungen gespeichert wurden."""
+        self.close()
+        self.count = 0
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,329 @@
+#!/usr/bin/python3
+
+# Paralleles Einlesen und Filtern großer xcsv-Dateien (ohne Qt).
+#
+# Die Datenzeilen werden in Byte-Bereiche zerlegt, die jeweils an einem
+# Datensatzanfang beginnen; die Grenzen findet csvcore.next_record nach
+# denselben Regeln wie csv.reader (ein Anführungszeichen öffnet nur am
+# Feldanfang ein Feld). Jeder Bereich wird in einem eigenen Prozess mit csv.reader
+# geparst. Zurück kommt je Spalte ein einziger UTF-8-Block, die Zellen durch
+# SEPARATOR getrennt - das ist viel billiger zu übertragen als Listen
+# einzelner Texte. Die Bereiche werden in Dateireihenfolge übernommen, IDs
+# vergibt wie bei XCSVReader erst der Hauptprozess.
+#
+# Beim Filtern ohne Trigramm-Index (z.B. die erste Suche direkt nach dem
+# Laden oder Begriffe unter drei Zeichen) liegen die Suchtexte aller Zeilen
+# als ein UTF-8-Block im gemeinsamen Speicher (SharedTexts). Jeder Prozess
+# prüft einen Bereich davon mit derselben Logik wie SearchIndex.match und
+# liefert die passenden Zeilennummern als array('I'), die der Hauptprozess
+# in Reihenfolge aneinanderhängt.
+
+import atexit
+import csv
+import io
+import mmap
+import os
+import re
+import sys
+import threading
+import weakref
+from array import array
+
+import csvcache
+import csvcore
+
+# erst ab dieser Dateigröße lohnt sich das Starten der Prozesse
+PARALLEL_MIN_BYTES = 32 * 1024 * 1024
+# kleinster Bereich je Auftrag; je Prozess gibt es einige Bereiche, damit keiner lange leer läuft
+RANGE_MIN_BYTES = 8 * 1024 * 1024
+RANGES_PER_WORKER = 4
+# ab so vielen Zeilen wird eine Suche ohne Trigramm-Index auf mehrere Prozesse verteilt
+PARALLEL_MIN_ROWS = 200000
+# trennt die Zellen einer Spalte bzw. die Suchtexte im übertragenen Block
+SEPARATOR = "\x00"
+# Datensätze nach denselben Regeln wie csvcore.next_record: ein Feld in
+# Anführungszeichen beginnt nur am Feldanfang und läuft danach bis zum Komma
+# weiter, andere Anführungszeichen sind gewöhnliche Zeichen. Ein Treffer
+# überspringt bis zu 4096 Datensätze ohne Python-Schleife.
+_FIELD = rb'(?:"[^"]*(?:""[^"]*)*"[^,\n]*|[^,\n"][^,\n]*|)'
+_RECORDS = re.compile(rb'(?:' + _FIELD + rb'(?:,' + _FIELD + rb')*\n){1,4096}')
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def worker_count():
+    return os.cpu_count() or 1
+
+
+def worth_it(total_bytes, workers=None):
+    """Paralleles Einlesen nur bei großen Dateien und mehreren Kernen."""
+    return total_bytes >= PARALLEL_MIN_BYTES and (workers or worker_count()) > 1
+
+
+def worth_matching(rows, workers=None):
+    """Paralleles Filtern nur bei großen Tabellen und mehreren Kernen."""
+    return rows >= PARALLEL_MIN_ROWS and (workers or worker_count()) > 1
+
+
+def executor(workers):
+    """
+    Gemeinsamer Prozesspool für alle Ladevorgänge, er bleibt bis zum Programmende
+    bestehen. Die Prozesse entstehen über einen Forkserver, der vorab dieses
+    Modul lädt - ein fork() des Qt-Programms mit seinen Threads wäre unsicher.
+    Aufträge nur über submit_all() vergeben.
+    """
+    global _executor
+    # erst hier importiert, das kostet beim Programmstart sonst spürbar Zeit
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    with _executor_lock:
+        if _executor is None:
+            context = multiprocessing.get_context('forkserver')
+            context.set_forkserver_preload(['csvparallel'])
+            _executor = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+            atexit.register(_executor.shutdown, cancel_futures=True)
+        return _executor
+
+
+def _reset_executor():
+    global _executor
+    with _executor_lock:
+        _executor = None
+
+
+def submit_all(workers, function, calls):
+    """
+    Aufträge function(*args) für alle args aus calls an den Prozesspool geben.
+    Dabei entstehen bei Bedarf neue Arbeitsprozesse, und multiprocessing lädt
+    in jedem das Hauptskript nach (editcsv.py samt PyQt5). Die Aufträge
+    brauchen nur dieses Modul, deshalb ist __main__.__file__ solange ausgeblendet.
+    """
+    pool = executor(workers)
+    main = sys.modules['__main__']
+    with _executor_lock:
+        main_path = main.__dict__.pop('__file__', None)
+        try:
+            return [pool.submit(function, *args) for args in calls]
+        finally:
+            if main_path is not None:
+                main.__file__ = main_path
+
+
+def split_ranges(buf, start, parts):
+    """
+    Teilt buf[start:] in höchstens parts Bereiche (start, end), die jeweils an
+    einem Datensatzanfang beginnen.
+    """
+    size = len(buf)
+    step = max((size - start) // max(parts, 1), 1)
+    bounds = [start]
+    for part in range(1, parts):
+        target = start + part * step
+        if target <= bounds[-1]:
+            continue
+        # vom letzten sicheren Datensatzanfang aus weiter, nie aus der Mitte der Datei geraten
+        pos = bounds[-1]
+        while True:
+            match = _RECORDS.match(buf, pos, size)
+            if match is None or match.end() > target:
+                break
+            pos = match.end()
+        # die letzten Datensätze bis hinter target einzeln (auch ein nicht geschlossenes Feld)
+        pos = csvcore.next_record(buf, pos, target, size)
+        if pos >= size:
+            break
+        bounds.append(pos)
+    bounds.append(size)
+    return [(first, last) for first, last in zip(bounds, bounds[1:]) if last > first]
+
+
+def parse_range(file_path, start, end, width):
+    """
+    Im Arbeitsprozess: Datensätze von start bis end parsen, auf width Zellen
+    bringen und spaltenweise gepackt liefern: (Zeilenanzahl, [Block je Spalte]).
+    Enthält eine Spalte SEPARATOR selbst, wird sie als Liste übertragen.
+    """
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        text = f.read(end - start).decode('utf-8')
+    rows = []
+    for row in csv.reader(io.StringIO(text, newline='')):
+        if not row:
+            continue
+        if len(row) < width:
+            row.extend([""] * (width - len(row)))
+        elif len(row) > width:
+            del row[width:]
+        rows.append(row)
+    packed = []
+    for column in zip(*rows):
+        block = SEPARATOR.join(column)
+        if block.count(SEPARATOR) != len(column) - 1:
+            packed.append(list(column))
+        else:
+            packed.append(block.encode('utf-8'))
+    return len(rows), packed
+
+
+def unpack(count, packed, width):
+    """Spaltenlisten aus dem Ergebnis von parse_range."""
+    if not count:
+        return [[] for _ in range(width)]
+    return [column if isinstance(column, list) else column.decode('utf-8').split(SEPARATOR)
+            for column in packed]
+
+
+class ParallelReader:
+    """
+    Liest eine xcsv-Datei mit mehreren Prozessen, nach außen wie
+    csvcore.XCSVReader: header_data, tab_size, columns, has_ids, chunks(),
+    bytes_read und rows_read.
+    """
+    def __init__(self, file_path, workers=None):
+        self.file_path = file_path
+        self.workers = workers or worker_count()
+        with open(file_path, 'rb') as f:
+            reader = csvcore.XCSVReader(f)
+            # csv.reader holt die Zeilen einzeln, gelesen ist also genau bis zum Ende der 2. Zeile
+            self.data_start = reader.bytes_read
+            # IDs ja/nein entscheidet XCSVReader an der ersten Datenzeile
+            next(reader.rows(), None)
+        self.header_data = reader.header_data
+        self.tab_size = reader.tab_size
+        self.columns = reader.columns
+        self.has_ids = reader.has_ids
+        self.bytes_read = self.data_start
+        self.rows_read = 0
+
+    def ranges(self):
+        with open(self.file_path, 'rb') as f:
+            if not os.fstat(f.fileno()).st_size:
+                return []
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                parts = max(1, min(self.workers * RANGES_PER_WORKER,
+                                   (len(buf) - self.data_start) // RANGE_MIN_BYTES))
+                return split_ranges(buf, self.data_start, parts)
+
+    def chunks(self, size=20000):
+        """Liefert die Datenzeilen (mit ID) in Dateireihenfolge in Blöcken von höchstens size Zeilen."""
+        if self.has_ids is None:
+            return
+        width = self.columns if self.has_ids else self.columns - 1
+        ranges = self.ranges()
+        futures = []
+        try:
+            futures = submit_all(self.workers, parse_range,
+                                 [(self.file_path, start, end, width) for start, end in ranges])
+        except (OSError, RuntimeError) as e:
+            print(f"Paralleles Einlesen nicht möglich, lese mit einem Prozess: {e}")
+        try:
+            for position, (start, end) in enumerate(ranges):
+                result = None
+                if position < len(futures):
+                    try:
+                        result = futures[position].result()
+                    except (OSError, RuntimeError) as e:  # auch BrokenProcessPool
+                        print(f"Paralleles Einlesen abgebrochen, lese mit einem Prozess weiter: {e}")
+                        _reset_executor()
+                        futures = []
+                if result is None:
+                    result = parse_range(self.file_path, start, end, width)
+                count, packed = result
+                columns = unpack(count, packed, width)
+                rows = csvcache.rows_from_columns(columns, self.has_ids, start=self.rows_read + 1)
+                self.rows_read += count
+                self.bytes_read = end
+                for first in range(0, len(rows), size):
+                    yield rows[first:first + size]
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+def match_partition(name, start, end, first_row, search_terms, exclude_terms):
+    """
+    Im Arbeitsprozess: Suchtexte im Bereich start bis end des gemeinsamen
+    Speichers name prüfen; liefert die passenden Zeilen als Bytes eines array('I').
+    """
+    from multiprocessing import shared_memory
+    import csvsearch
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        with shm.buf[start:end] as view:
+            texts = bytes(view).decode('utf-8').split(SEPARATOR)
+    finally:
+        shm.close()
+    return array('I', csvsearch.matching_rows(texts, search_terms, exclude_terms, first_row)).tobytes()
+
+
+def _release(shm):
+    shm.close()
+    try:
+        shm.unlink()
+    except FileNotFoundError:
+        pass
+
+
+class SharedTexts:
+    """
+    Suchtexte (SearchIndex.texts) als ein UTF-8-Block im gemeinsamen Speicher,
+    zerlegt in Bereiche (Byte-Anfang, Byte-Ende, erste Zeile, Zeilenanzahl).
+    Der Speicher wird freigegeben, sobald das Objekt nicht mehr benutzt wird.
+    """
+    def __init__(self, texts, parts):
+        from multiprocessing import shared_memory
+        separator = SEPARATOR.encode('utf-8')
+        blob = SEPARATOR.join(texts).encode('utf-8')
+        if blob.count(separator) != len(texts) - 1:
+            raise ValueError("Suchtext enthält das Trennzeichen")
+        self.texts = texts
+        self.rows = len(texts)
+        self.nbytes = len(blob)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(len(blob), 1))
+        weakref.finalize(self, _release, self.shm)
+        self.shm.buf[:len(blob)] = blob
+        self.partitions = []
+        step = max(len(blob) // max(parts, 1), 1)
+        start = row = 0
+        while row < len(texts):
+            end = blob.find(separator, start + step)
+            if end == -1:
+                end = len(blob)
+            count = blob.count(separator, start, end) + 1
+            self.partitions.append((start, end, row, count))
+            start = end + 1
+            row += count
+
+    def match(self, search_terms, exclude_terms, workers=None, cancelled=None):
+        """
+        Wie SearchIndex.match über alle Zeilen, auf die Prozesse verteilt; None,
+        wenn cancelled() zwischendurch True meldet.
+        """
+        import csvsearch
+        futures = []
+        try:
+            futures = submit_all(workers or worker_count(), match_partition,
+                                 [(self.shm.name, start, end, first_row, search_terms, exclude_terms)
+                                  for start, end, first_row, count in self.partitions])
+        except (OSError, RuntimeError) as e:
+            print(f"Paralleles Filtern nicht möglich, filtere mit einem Prozess: {e}")
+        rows = array('I')
+        try:
+            for position, (start, end, first_row, count) in enumerate(self.partitions):
+                if cancelled is not None and cancelled():
+                    return None
+                if position < len(futures):
+                    try:
+                        rows.frombytes(futures[position].result())
+                        continue
+                    except (OSError, RuntimeError) as e:  # auch BrokenProcessPool
+                        print(f"Paralleles Filtern abgebrochen, filtere mit einem Prozess weiter: {e}")
+                        _reset_executor()
+                        futures = []
+                rows.extend(csvsearch.matching_rows(self.texts[first_row:first_row + count],
+                                                    search_terms, exclude_terms, first_row))
+        finally:
+            for future in futures:
+                future.cancel()
+        return rows.tolist()
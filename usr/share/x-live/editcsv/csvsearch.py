@@ -0,0 +1,639 @@
+#!/usr/bin/python3
+
+# Filterlogik für X-Live EditCSV (ohne Qt).
+#
+# Filter-Syntax: Begriffe werden durch Leerzeichen getrennt, Begriffe in
+# Anführungszeichen ("linux mint") zählen zusammen. Eine Zeile wird angezeigt,
+# wenn irgendein Suchbegriff in irgendeiner Zelle vorkommt (oder es keine
+# Suchbegriffe gibt) und kein Ausschlussbegriff vorkommt. Groß- und
+# Kleinschreibung wird nicht unterschieden.
+#
+# Spaltenfilter: "Spalte Vergleich Wert", z.B. Preis>100, Datum >= 01.01.24,
+# "Letzter Kontakt" < 1.2.24 oder #3 != offen (#3 = dritte Spalte). Sie werden
+# als Tupel (Spalte, Vergleich, Wert) zwischen den Begriffen geführt. Im
+# Suchfeld müssen alle Spaltenfilter zutreffen, im Ausschlussfeld schließt
+# jeder zutreffende Spaltenfilter die Zeile aus.
+
+import re
+import threading
+import time
+from array import array
+from itertools import accumulate, chain
+from operator import sub
+
+import csvcolumns
+import csvparallel
+import csvstore
+
+# Trennzeichen zwischen den Zellen im Suchtext; kann in einem Filterbegriff
+# nicht vorkommen, daher findet kein Begriff Treffer über Zellgrenzen hinweg
+CELL_SEPARATOR = "\n"
+# Zeilen je Block, nach jedem Block kann eine laufende Suche abgebrochen werden
+BLOCK_SIZE = 50000
+# so oft prüft ein auf den laufenden Aufbau wartender Thread, ob er abgebrochen wurde
+LOCK_POLL_SECONDS = 0.05
+# Länge der N-Gramme im invertierten Index; kürzere Begriffe werden direkt gesucht
+GRAM = 3
+# erst ab so vielen Zeilen lohnt sich der Trigramm-Index; darunter ist das
+# Durchsuchen der Suchtexte schnell genug und spart Aufbauzeit und Speicher
+TRIGRAM_MIN_ROWS = 200000
+# Suchtexte im gemeinsamen Speicher erst neu anlegen, wenn die Zeilen so lange
+# nicht eingefügt oder entfernt wurden; bis dahin wird in einem Prozess gefiltert
+SHARED_STABLE_SECONDS = 5
+# geänderte Zeilen werden neben dem gemeinsamen Block geprüft, bis es mehr als
+# dieser Anteil aller Zeilen sind
+SHARED_MAX_STALE = 0.05
+# grobe Schätzung für nbytes: str-Objekt ohne Inhalt bzw. leeres array('I')
+TEXT_OVERHEAD = 49
+ARRAY_OVERHEAD = 64 + 80  # plus Eintrag im Wörterbuch
+
+
+def parse_terms(text):
+    """Zerlegt die Eingabe eines Filterfelds in einzelne (kleingeschriebene) Begriffe."""
+    text = text.lower().strip()
+    # Wenn die Eingabe Anführungszeichen enthält, behandle diese als zusammenhängende Begriffe
+    if '"' in text:
+        # Finde Wörter in Anführungszeichen und normale Wörter
+        terms = re.findall(r'"(.*?)"|(\S+)', text)
+        return [term[0] or term[1] for term in terms]  # Kombiniere Treffer
+    return text.split() if text else []  # Normale Trennung bei Leerzeichen
+
+
+EXPRESSION = re.compile(r'(?:"([^"]+)"|(#\d+|[^\s"<>=!]+))\s*(<=|>=|!=|<|>|=)\s*(?:"([^"]*)"|([^\s"]+))')
+
+
+def resolve_column(name, header_data):
+    """Spaltenindex zu einem Spaltennamen oder "#n", sonst None."""
+    if name.startswith('#') and name[1:].isdigit():
+        column = int(name[1:]) - 1
+        return column if 0 <= column < len(header_data) else None
+    name = name.lower()
+    for column, header in enumerate(header_data):
+        if header.lower() == name:
+            return column
+    return None
+
+
+def parse_query(text, header_data):
+    """
+    Wie parse_terms, erkennt zusätzlich Spaltenfilter und liefert sie als
+    Tupel (Spalte, Vergleich, Wert) hinter den Begriffen.
+    """
+    expressions = []
+
+    def extract(match):
+        column = resolve_column(match.group(1) or match.group(2), header_data)
+        if column is None:
+            return match.group(0)  # keine Spalte dieses Namens: normaler Suchbegriff
+        value = match.group(4) if match.group(4) is not None else match.group(5)
+        expressions.append((column, match.group(3), value.lower()))
+        return " "
+
+    rest = EXPRESSION.sub(extract, text)
+    return parse_terms(rest) + expressions
+
+
+def split_terms(terms):
+    """Trennt Begriffe (str) und Spaltenfilter (Tupel)."""
+    return ([term for term in terms if isinstance(term, str)],
+            [term for term in terms if isinstance(term, tuple)])
+
+
+def row_text(row, columns):
+    """Kleingeschriebener Suchtext einer Zeile (ohne ID) über die ersten columns Spalten."""
+    return CELL_SEPARATOR.join(row[1:columns + 1]).lower()
+
+
+def row_cell(row, column):
+    """Zelle der Spalte column (ohne ID); Zeilen können kürzer als die Kopfzeile sein."""
+    return row[column + 1] if column + 1 < len(row) else ""
+
+
+def text_matches(text, search_terms, exclude_terms):
+    """Prüft den Suchtext einer Zeile gegen Such- und Ausschlussbegriffe."""
+    if search_terms and not any(term in text for term in search_terms):
+        return False
+    if exclude_terms and any(term in text for term in exclude_terms):
+        return False
+    return True
+
+
+def matching_rows(texts, search_terms, exclude_terms, first=0):
+    """Zeilennummern (ab first gezählt) der Suchtexte, die zu den Begriffen passen."""
+    if len(search_terms) == 1 and not exclude_terms:
+        term = search_terms[0]
+        return [row for row, text in enumerate(texts, first) if term in text]
+    return [row for row, text in enumerate(texts, first) if text_matches(text, search_terms, exclude_terms)]
+
+
+def row_filter(search_terms, exclude_terms, columns, sample=None):
+    """
+    Prüffunktion für einzelne Zeilen (mit ID) ohne Suchindex, z.B. zum
+    Filtern eines Datenstroms; sonst gilt dieselbe Logik wie bei
+    SearchIndex.match. Den Typ jeder gefilterten Spalte bestimmt wie dort
+    csvcolumns.infer_kind, hier aus den Zeilen in sample (etwa den ersten
+    eines Datenstroms). Ohne sample ergibt er sich aus dem Vergleichswert
+    (siehe csvcolumns.cell_matcher).
+    """
+    search_terms, search_expressions = split_terms(search_terms)
+    exclude_terms, exclude_expressions = split_terms(exclude_terms)
+    kinds = {}
+    if sample is not None:
+        for column, op, value in search_expressions + exclude_expressions:
+            if column not in kinds:
+                kinds[column] = csvcolumns.infer_kind(row_cell(row, column) for row in sample)
+
+    def compile_expressions(expressions):
+        if sample is None:
+            return [(column + 1, csvcolumns.cell_matcher(op, value)) for column, op, value in expressions]
+        return [(column + 1, csvcolumns.column_matcher(kinds[column], op, value)) for column, op, value in expressions]
+
+    search_expressions = compile_expressions(search_expressions)
+    exclude_expressions = compile_expressions(exclude_expressions)
+
+    def matches(row):
+        if not all(column < len(row) and matcher(row[column]) for column, matcher in search_expressions):
+            return False
+        if any(column < len(row) and matcher(row[column]) for column, matcher in exclude_expressions):
+            return False
+        return text_matches(row_text(row, columns), search_terms, exclude_terms)
+    return matches
+
+
+def grams(text):
+    """Menge aller Trigramme eines Textes."""
+    return {text[i:i + GRAM] for i in range(len(text) - GRAM + 1)}
+
+
+def row_grams(text, cache):
+    """
+    Trigramme eines Suchtexts, zellenweise: Begriffe enthalten keinen
+    Zeilenumbruch, Trigramme über Zellgrenzen werden also nie gesucht. Die
+    Trigramme wiederkehrender Zellen (Status, Kategorie, ...) kommen aus cache.
+    """
+    result = set()
+    for cell in text.split(CELL_SEPARATOR):
+        cell_grams = cache.get(cell)
+        if cell_grams is None:
+            cell_grams = grams(cell)
+            if len(cache) >= 65536:
+                cache.clear()
+            cache[cell] = cell_grams
+        result |= cell_grams
+    return result
+
+
+def worth_trigrams(rows, search_terms, exclude_terms):
+    """
+    Lohnt sich der Trigramm-Index für diese Suche? Nur bei großen Tabellen und
+    wenn alle Begriffe, über die er sucht, mindestens GRAM Zeichen lang sind.
+    """
+    terms = split_terms(search_terms)[0] or split_terms(exclude_terms)[0]
+    return rows >= TRIGRAM_MIN_ROWS and bool(terms) and all(len(term) >= GRAM for term in terms)
+
+
+def pack_postings(rows):
+    """
+    Aufsteigende Zeilenliste kompakt ablegen: als Abstände in array('H'), wenn
+    alle unter 65536 liegen (2 statt 4 Bytes je Eintrag), sonst als array('I').
+    """
+    try:
+        return array('H', map(sub, rows, chain((0,), rows)))
+    except OverflowError:
+        return array('I', rows)
+
+
+def unpack_postings(postings):
+    """Zeilenliste zu pack_postings."""
+    return list(accumulate(postings)) if postings.typecode == 'H' else list(postings)
+
+
+def narrows(old_terms, new_terms):
+    """
+    Prüft, ob das Ergebnis für new_terms eine Teilmenge des Ergebnisses für
+    old_terms ist (jeweils Tupel aus Such- und Ausschlussbegriffen). Dann
+    genügt es, nur die bisherigen Treffer erneut zu prüfen, z.B. bei
+    "lin" -> "linux" oder einem zusätzlichen Ausschlussbegriff.
+    """
+    old_search, old_search_expressions = split_terms(old_terms[0])
+    old_exclude, old_exclude_expressions = split_terms(old_terms[1])
+    new_search, new_search_expressions = split_terms(new_terms[0])
+    new_exclude, new_exclude_expressions = split_terms(new_terms[1])
+    # Spaltenfilter dürfen nur hinzukommen
+    if not set(old_search_expressions) <= set(new_search_expressions) \
+            or not set(old_exclude_expressions) <= set(new_exclude_expressions):
+        return False
+    # Jeder neue Suchbegriff muss einen alten enthalten: wer ihn enthält, enthielt auch den alten
+    if old_search and not all(any(old in new for old in old_search) for new in new_search):
+        return False
+    if old_search and not new_search:
+        return False
+    # Jeder alte Ausschlussbegriff muss weiterhin (durch einen Teilbegriff) ausschließen
+    return all(any(new in old for new in new_exclude) for old in old_exclude)
+
+
+class SearchIndex:
+    """
+    Hält zu jeder Zeile in CSVEditor.data den fertigen Suchtext, damit beim
+    Filtern keine Zellen mehr gelesen und kleingeschrieben werden müssen.
+    Der Index wird erst bei der ersten Suche aufgebaut und danach bei jeder
+    Änderung zeilenweise nachgeführt.
+
+    Optional kommt ein invertierter Index hinzu (build_trigrams): je Trigramm
+    die Zeilen, in denen es vorkommt (gepackt, siehe pack_postings). Ein
+    Begriff kann nur in Zeilen stehen, die alle seine Trigramme enthalten;
+    geprüft werden daher nur die Zeilen des seltensten Trigramms, der
+    eigentliche Vergleich bleibt die Teilstring-Suche im Suchtext. Zeilen,
+    die nach dem Aufbau geändert oder angehängt werden, stehen ungepackt in
+    trigram_extra.
+    """
+    def __init__(self):
+        self.texts = None
+        self.columns = 0
+        self.trigrams = None
+        self.trigram_extra = {}
+        # typisierte Spalten für Spaltenfilter und Sortierung, erst bei Bedarf erzeugt
+        self.data = None
+        self.typed = {}
+        # Sortierreihenfolgen je (Spalte, absteigend), gültig für self.generation
+        self.sort_cache = {}
+        self.sort_generation = None
+        # zählt Änderungen, damit ein Aufbau im Hintergrund veraltete Ergebnisse verwirft
+        self.generation = 0
+        # Suchtexte im gemeinsamen Speicher für das parallele Filtern; darin veraltete
+        # Zeilen (seither geändert) und Zeitpunkt der letzten Verschiebung der Zeilen
+        self.shared = None
+        self.shared_stale = set()
+        self.shifted_at = None
+        # FilterWorker und IndexWorker bauen die Suchtexte nicht gleichzeitig auf
+        self.lock = threading.Lock()
+
+    def invalidate(self):
+        self.generation += 1
+        self.texts = None
+        self.trigrams = None
+        self.typed = {}
+        self.shared = None
+        self.shifted_at = None
+
+    def nbytes(self):
+        """Geschätzter Speicherbedarf von Suchtexten, Trigrammen und typisierten Spalten."""
+        size = 0
+        if self.texts is not None:
+            size += sum(len(text) + TEXT_OVERHEAD for text in self.texts) + 8 * len(self.texts)
+        trigrams = self.trigrams
+        if trigrams is not None:
+            for postings in chain(trigrams.values(), self.trigram_extra.values()):
+                size += postings.itemsize * len(postings) + ARRAY_OVERHEAD
+        if self.shared is not None:
+            size += self.shared.nbytes
+        for typed in self.typed.values():
+            if isinstance(typed.values, array):
+                size += typed.values.itemsize * len(typed.values)
+            else:
+                size += sum(len(value) + TEXT_OVERHEAD for value in typed.values) + 8 * len(typed.values)
+        return size
+
+    def is_current(self, data, columns):
+        return self.texts is not None and self.columns == columns and len(self.texts) == len(data)
+
+    def ensure(self, data, columns, cancelled=None):
+        """
+        Index aufbauen, falls er fehlt oder die Spaltenanzahl sich geändert hat.
+        Liefert None, wenn cancelled() während des Aufbaus True meldet. Baut ein
+        anderer Thread gerade auf, wird auf ihn gewartet und sein Ergebnis genutzt.
+        """
+        self.data = data
+        while not self.lock.acquire(timeout=LOCK_POLL_SECONDS):
+            if cancelled is not None and cancelled():
+                return None
+        try:
+            return self._build(data, columns, cancelled)
+        finally:
+            self.lock.release()
+
+    def _build(self, data, columns, cancelled):
+        """Suchtexte aufbauen (nur mit self.lock, siehe ensure)."""
+        while not self.is_current(data, columns):
+            generation = self.generation
+            texts = []
+            for first in range(0, len(data), BLOCK_SIZE):
+                if cancelled is not None and cancelled():
+                    return None
+                texts.extend(row_text(row, columns) for row in data[first:first + BLOCK_SIZE])
+            # Wurden die Daten währenddessen geändert, wird neu aufgebaut
+            if generation == self.generation and len(texts) == len(data):
+                self.columns = columns
+                self.texts = texts
+                self.trigrams = None
+                self.typed = {}
+        return self.texts
+
+    def typed_column(self, column):
+        """Typisierte Werte einer Spalte, beim ersten Zugriff erkannt und danach gehalten."""
+        typed = self.typed.get(column)
+        if typed is None:
+            generation = self.generation
+            typed = csvcolumns.TypedColumn(row_cell(row, column) for row in self.data)
+            # in einem Hintergrund-Thread können sich die Daten währenddessen ändern
+            if generation == self.generation:
+                self.typed[column] = typed
+        return typed
+
+    def unparsed_cells(self, terms):
+        """
+        Zu den Spaltenfiltern in terms: {Spalte: Anzahl} der Zellen, die nicht zum
+        erkannten Typ passen und daher keinen Vergleich erfüllen.
+        """
+        result = {}
+        for column, op, value in split_terms(terms)[1]:
+            typed = self.typed.get(column)
+            if typed is not None and typed.unparsed:
+                result[column] = typed.unparsed
+        return result
+
+    def sort_permutation(self, column, descending=False, data=None):
+        """
+        Reihenfolge der Zeilen nach einer Spalte. Sie wird je Spalte und Richtung
+        zwischengespeichert, bis sich die Daten ändern. Braucht nur die typisierte
+        Spalte, nicht die Suchtexte; data ersetzt dafür ein vorheriges ensure.
+        """
+        if data is not None:
+            self.data = data
+        generation = self.generation
+        if self.sort_generation != generation:
+            self.sort_cache = {}
+            self.sort_generation = generation
+        key = (column, descending)
+        order = self.sort_cache.get(key)
+        if order is None:
+            order = self.typed_column(column).permutation(descending)
+            if generation == self.generation:
+                self.sort_cache[key] = order
+        return list(order)
+
+    def _update_typed(self, row, rows, insert=False):
+        """Typisierte Spalten ab Zeile row mit rows überschreiben bzw. verlängern (oder einfügen)."""
+        for column, typed in list(self.typed.items()):
+            if not typed.update(row, [row_cell(row_data, column) for row_data in rows], insert):
+                del self.typed[column]  # Wert passt nicht mehr zum Typ: neu erkennen
+
+    def build_trigrams(self, cancelled=None):
+        """
+        Invertierten Trigramm-Index über die Suchtexte aufbauen (gedacht für einen
+        Hintergrund-Thread). Wurden die Daten währenddessen geändert, wird das
+        Ergebnis verworfen.
+        """
+        generation = self.generation
+        texts = self.texts
+        if texts is None:
+            return None
+        # erst die Zeilen je Zellinhalt sammeln, dann jedes Trigramm eines Inhalts
+        # einmal mit allen seinen Zeilen verlängern: bei wiederkehrenden Werten
+        # (Status, Kategorie, ...) viel weniger Python-Schritte als je Zeile
+        groups = {}
+        for row, text in enumerate(texts):
+            if row % BLOCK_SIZE == 0 and cancelled is not None and cancelled():
+                return None
+            for cell in text.split(CELL_SEPARATOR):
+                rows = groups.get(cell)
+                if rows is None:
+                    groups[cell] = rows = array('I')
+                rows.append(row)
+        trigrams = {}
+        for position, (cell, rows) in enumerate(groups.items()):
+            if position % BLOCK_SIZE == 0 and cancelled is not None and cancelled():
+                return None
+            for gram in grams(cell):
+                postings = trigrams.get(gram)
+                if postings is None:
+                    trigrams[gram] = postings = array('I')
+                postings.extend(rows)
+        del groups
+        for position, (gram, postings) in enumerate(trigrams.items()):
+            if position % 4096 == 0 and cancelled is not None and cancelled():
+                return None
+            trigrams[gram] = pack_postings(sorted(set(postings)))
+        if generation != self.generation or texts is not self.texts:
+            return None
+        self.trigram_extra = {}
+        self.trigrams = trigrams
+        return trigrams
+
+    def _add_trigrams(self, first, texts):
+        extra = self.trigram_extra
+        cache = {}
+        for row, text in enumerate(texts, start=first):
+            for gram in row_grams(text, cache):
+                postings = extra.get(gram)
+                if postings is None:
+                    extra[gram] = postings = array('I')
+                postings.append(row)
+
+    def term_candidates(self, term):
+        """
+        Zeilen, in denen term vorkommen kann (Obermenge), oder None, wenn der
+        Trigramm-Index dafür nicht verwendbar ist.
+        """
+        trigrams = self.trigrams
+        if trigrams is None or len(term) < GRAM:
+            return None
+        empty = array('I')
+        rarest = None
+        for gram in grams(term):
+            postings = trigrams.get(gram, empty)
+            extra = self.trigram_extra.get(gram, empty)
+            count = len(postings) + len(extra)
+            if not count:
+                return ()
+            if rarest is None or count < rarest[0]:
+                rarest = (count, postings, extra)
+        return unpack_postings(rarest[1]) + list(rarest[2])
+
+    def set_row(self, row, row_data):
+        self.generation += 1
+        if self.texts is not None:
+            self.texts[row] = row_text(row_data, self.columns)
+            self._update_typed(row, [row_data])
+            if self.shared is not None:
+                self.shared_stale.add(row)
+            # Veraltete Einträge des alten Textes stören nicht, sie fallen bei der Prüfung heraus
+            if self.trigrams is not None:
+                self._add_trigrams(row, [self.texts[row]])
+
+    def append_rows(self, rows):
+        self.generation += 1
+        if self.texts is not None:
+            first = len(self.texts)
+            self.texts.extend(row_text(row, self.columns) for row in rows)
+            self._update_typed(first, rows)
+            if self.trigrams is not None:
+                self._add_trigrams(first, self.texts[first:])
+
+    def insert_rows(self, first, rows):
+        """Fügt rows vor der Zeile first ein."""
+        self.generation += 1
+        if self.texts is not None:
+            self.texts[first:first] = [row_text(row, self.columns) for row in rows]
+            self._update_typed(first, rows, insert=True)
+        # Zeilennummern verschieben sich, Trigramm-Index und gemeinsamer Block passen nicht mehr
+        self.trigrams = None
+        self._shift()
+
+    def insert_blocks(self, blocks):
+        """
+        Fügt die Blöcke (Position, Zeilen), aufsteigend, in einem Durchlauf ein;
+        die Positionen gelten wie nach dem Einfügen (siehe csvstore.merge).
+        """
+        self.generation += 1
+        if self.texts is not None:
+            self.texts = csvstore.merge(self.texts, [(first, [row_text(row, self.columns) for row in rows])
+                                                     for first, rows in blocks])
+            for column, typed in list(self.typed.items()):
+                if not typed.insert_blocks([(first, [row_cell(row_data, column) for row_data in rows])
+                                            for first, rows in blocks]):
+                    del self.typed[column]
+        self.trigrams = None
+        self._shift()
+
+    def remove_range(self, first, last):
+        """Entfernt die Zeilen first bis last (einschließlich)."""
+        self.generation += 1
+        if self.texts is not None:
+            del self.texts[first:last + 1]
+            for typed in self.typed.values():
+                typed.remove(first, last)
+        # Zeilennummern verschieben sich, Trigramm-Index und gemeinsamer Block passen nicht mehr
+        self.trigrams = None
+        self._shift()
+
+    def remove_ranges(self, ranges):
+        """Entfernt die Bereiche (erste, letzte), aufsteigend, in einem Durchlauf."""
+        self.generation += 1
+        if self.texts is not None:
+            self.texts = csvstore.compact(self.texts, ranges)
+            for typed in self.typed.values():
+                typed.remove_ranges(ranges)
+        self.trigrams = None
+        self._shift()
+
+    def _shift(self):
+        self.shared = None
+        self.shifted_at = time.monotonic()
+
+    def match(self, search_terms, exclude_terms, first=0, last=None, cancelled=None, candidates=None):
+        """
+        Liefert die Indizes der passenden Zeilen im Bereich first bis last (ausschließlich),
+        oder None, wenn cancelled() zwischen zwei Blöcken True meldet. Mit candidates
+        (aufsteigende Zeilenindizes) werden nur diese Zeilen geprüft.
+        """
+        texts = self.texts
+        search_terms, search_expressions = split_terms(search_terms)
+        exclude_terms, exclude_expressions = split_terms(exclude_terms)
+        if search_expressions or exclude_expressions:
+            # Spaltenfilter zuerst über die typisierten Spalten, die Begriffe dann nur noch auf deren Treffer
+            if candidates is None:
+                last = len(texts) if last is None else last
+                candidates = range(first, last)
+            candidates = self.match_expressions(search_expressions, exclude_expressions, candidates)
+        if candidates is None:
+            last = len(texts) if last is None else last
+            if not search_terms and not exclude_terms:
+                return list(range(first, last))
+            if first == 0 and last == len(texts):
+                rows = self._match_trigrams(search_terms, exclude_terms)
+                if rows is not None:
+                    return rows
+                if csvparallel.worth_matching(len(texts)):
+                    try:
+                        shared = self._shared_texts()
+                        if shared is not None:
+                            return self._match_parallel(shared, search_terms, exclude_terms, cancelled)
+                    except (OSError, ValueError) as e:
+                        print(f"Paralleles Filtern nicht möglich: {e}")
+            candidates = range(first, last)
+        rows = []
+        for start in range(0, len(candidates), BLOCK_SIZE):
+            if cancelled is not None and cancelled():
+                return None
+            block = candidates[start:start + BLOCK_SIZE]
+            if len(search_terms) == 1 and not exclude_terms:
+                term = search_terms[0]
+                rows.extend(row for row in block if term in texts[row])
+            else:
+                rows.extend(row for row in block if text_matches(texts[row], search_terms, exclude_terms))
+        return rows
+
+    def match_expressions(self, search_expressions, exclude_expressions, candidates):
+        """Zeilen aus candidates, auf die alle Such- und keiner der Ausschluss-Spaltenfilter zutrifft."""
+        # ganzer Bereich: Vergleich über die komplette Spalte (vektorisiert), sonst nur die Kandidaten
+        whole = isinstance(candidates, range) and len(candidates) == len(self.texts)
+        rows = None
+        for column, op, value in search_expressions:
+            if column >= self.columns:
+                return []
+            matched = self.typed_column(column).compare(op, value, None if whole else candidates)
+            rows = set(matched) if rows is None else rows.intersection(matched)
+        excluded = set()
+        for column, op, value in exclude_expressions:
+            if column < self.columns:
+                excluded.update(self.typed_column(column).compare(op, value, None if whole else candidates))
+        if rows is None:
+            return [row for row in candidates if row not in excluded]
+        return sorted(rows - excluded)
+
+    def _shared_texts(self):
+        """
+        Gemeinsamer Block für das parallele Filtern. Einzelne geänderte Zeilen
+        machen ihn nicht ungültig (siehe _match_parallel); neu angelegt wird er
+        erst, wenn sich die Zeilen eine Weile nicht verschoben haben. None: in
+        einem Prozess filtern.
+        """
+        shared = self.shared
+        if shared is not None and shared.texts is self.texts \
+                and len(self.shared_stale) <= len(self.texts) * SHARED_MAX_STALE:
+            return shared
+        self.shared = None  # alten Block freigeben, bevor ein neuer angelegt wird
+        if self.shifted_at is not None and time.monotonic() - self.shifted_at < SHARED_STABLE_SECONDS:
+            return None
+        self.shared_stale = set()
+        self.shared = csvparallel.SharedTexts(self.texts, csvparallel.worker_count() * csvparallel.RANGES_PER_WORKER)
+        return self.shared
+
+    def _match_parallel(self, shared, search_terms, exclude_terms, cancelled):
+        """
+        Alle Zeilen auf mehrere Prozesse verteilt prüfen (siehe csvparallel.SharedTexts).
+        Seit dem Anlegen des Blocks geänderte oder angehängte Zeilen prüft dieser Prozess.
+        """
+        stale = set(self.shared_stale)
+        rows = shared.match(search_terms, exclude_terms, cancelled=cancelled)
+        if rows is None:
+            return None
+        texts = self.texts
+        rows.extend(matching_rows(texts[shared.rows:], search_terms, exclude_terms, shared.rows))
+        if stale:
+            rows = [row for row in rows if row not in stale]
+            rows.extend(row for row in stale
+                        if row < shared.rows and text_matches(texts[row], search_terms, exclude_terms))
+            rows.sort()
+        return rows
+
+    def _match_trigrams(self, search_terms, exclude_terms):
+        """Suche über den Trigramm-Index, None wenn ein Begriff dafür zu kurz ist."""
+        texts = self.texts
+        if search_terms:
+            postings = [self.term_candidates(term) for term in search_terms]
+            if any(candidates is None for candidates in postings):
+                return None
+            candidates = set()
+            for rows in postings:
+                candidates.update(rows)
+            return [row for row in sorted(candidates) if text_matches(texts[row], search_terms, exclude_terms)]
+        # Nur Ausschlussbegriffe: alle Zeilen außer denen, die einen davon enthalten
+        postings = [self.term_candidates(term) for term in exclude_terms]
+        if any(candidates is None for candidates in postings):
+            return None
+        excluded = set()
+        for term, rows in zip(exclude_terms, postings):
+            excluded.update(row for row in rows if term in texts[row])
+        return [row for row in range(len(texts)) if row not in excluded]
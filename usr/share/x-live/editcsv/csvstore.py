@@ -0,0 +1,321 @@
+#!/usr/bin/python3
+
+# Spaltenweiser Speicher für die Tabellendaten (ohne Qt).
+#
+# Statt einer Python-Liste je Zeile wird jede Spalte kompakt abgelegt:
+#   - die ID-Spalte als array('q') mit Ganzzahlen,
+#   - Spalten mit wenigen verschiedenen Werten (Status, Kategorie, ...)
+#     als Wörterbuch: je Zelle ein 2-Byte-Code, jeder Text nur einmal,
+#   - alle übrigen Spalten als einfache Liste von Texten.
+# Ein ColumnStore verhält sich nach außen wie die Liste CSVEditor.data:
+# store[i] liefert die Zeile als Liste [ID, Spalte 1, ...].
+
+from array import array
+
+# ab so vielen verschiedenen Werten lohnt sich das Wörterbuch nicht mehr
+DICT_MIN_VALUES = 1024
+DICT_MAX_VALUES = 65535
+# ungefährer Speicher eines str-Objekts ohne seinen Inhalt (für nbytes)
+TEXT_OVERHEAD = 49
+
+
+def compact(values, ranges):
+    """
+    Kopie von values (Liste oder array) ohne die Bereiche (erste, letzte),
+    aufsteigend und ohne Überschneidung. Ein Durchlauf, statt jeden Bereich
+    einzeln zu löschen und den Rest jedes Mal zu verschieben.
+    """
+    result = values[:0]
+    start = 0
+    for first, last in ranges:
+        result.extend(values[start:first])
+        start = last + 1
+    result.extend(values[start:])
+    return result
+
+
+def merge(values, blocks):
+    """
+    Kopie von values (Liste oder array) mit den eingefügten Blöcken (Position,
+    Werte), aufsteigend nach Position; die Positionen gelten wie nach dem
+    Einfügen. Ein Durchlauf, statt jeden Block einzeln einzufügen und den
+    Rest jedes Mal zu verschieben.
+    """
+    result = values[:0]
+    start = 0
+    for first, block in blocks:
+        stop = start + first - len(result)
+        result.extend(values[start:stop])
+        result.extend(block)
+        start = stop
+    result.extend(values[start:])
+    return result
+
+
+class PlainColumn:
+    """Spalte als Liste von Texten."""
+    def __init__(self, values=()):
+        self.values = list(values)
+
+    def __len__(self):
+        return len(self.values)
+
+    def get(self, row):
+        return self.values[row]
+
+    def values_list(self):
+        return self.values
+
+    def splice(self, start, stop, values):
+        """Zeilen start bis stop (ausschließlich) durch values ersetzen."""
+        self.values[start:stop] = values
+        return self
+
+    def with_blocks(self, blocks):
+        """Neue Spalte mit den eingefügten Blöcken (siehe merge), self bleibt unverändert."""
+        column = PlainColumn()
+        column.values = merge(self.values, blocks)
+        return column
+
+    def without_ranges(self, ranges):
+        """Neue Spalte ohne die Bereiche (siehe compact), self bleibt unverändert."""
+        column = PlainColumn()
+        column.values = compact(self.values, ranges)
+        return column
+
+    def delete(self, index):
+        del self.values[index]
+
+    def nbytes(self):
+        return sum(len(value) + TEXT_OVERHEAD for value in self.values) + 8 * len(self.values)
+
+
+class DictColumn:
+    """Spalte mit wenigen verschiedenen Werten: Codes in array('H') plus Werteliste."""
+    def __init__(self):
+        self.codes = array('H')
+        self.values = []
+        self.lookup = {}
+
+    def __len__(self):
+        return len(self.codes)
+
+    def get(self, row):
+        return self.values[self.codes[row]]
+
+    def values_list(self):
+        values = self.values
+        return [values[code] for code in self.codes]
+
+    def _code(self, value):
+        code = self.lookup.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self.lookup[value] = code
+        return code
+
+    @staticmethod
+    def _too_many(count, rows):
+        return count > DICT_MAX_VALUES or (count > DICT_MIN_VALUES and count > rows // 2)
+
+    def splice(self, start, stop, values):
+        values = list(values)
+        lookup = self.lookup
+        # vorher zählen: mehr als DICT_MAX_VALUES Werte passen nicht in die 2-Byte-Codes
+        count = len(self.values) + len({value for value in values if value not in lookup})
+        rows = len(self.codes) - len(range(len(self.codes))[start:stop]) + len(values)
+        if self._too_many(count, rows):
+            # Wörterbuch würde zu groß: in eine einfache Liste umwandeln
+            return PlainColumn(self.values_list()).splice(start, stop, values)
+        code = self._code
+        self.codes[start:stop] = array('H', [code(value) for value in values])
+        return self
+
+    def with_blocks(self, blocks):
+        lookup = self.lookup
+        count = len(self.values) + len({value for first, values in blocks for value in values if value not in lookup})
+        rows = len(self.codes) + sum(len(values) for first, values in blocks)
+        if self._too_many(count, rows):
+            return PlainColumn(self.values_list()).with_blocks(blocks)
+        # neue Werte kommen nur hinzu, die Codes dieser Spalte bleiben gültig
+        code = self._code
+        column = DictColumn()
+        column.values, column.lookup = self.values, self.lookup
+        column.codes = merge(self.codes, [(first, [code(value) for value in values]) for first, values in blocks])
+        return column
+
+    def without_ranges(self, ranges):
+        column = DictColumn()
+        column.values, column.lookup = self.values, self.lookup
+        column.codes = compact(self.codes, ranges)
+        return column
+
+    def delete(self, index):
+        del self.codes[index]
+
+    def nbytes(self):
+        return self.codes.itemsize * len(self.codes) + sum(len(value) + TEXT_OVERHEAD for value in self.values)
+
+
+class IntColumn:
+    """ID-Spalte als array('q'); fällt auf eine Textliste zurück, wenn eine ID keine Zahl ist."""
+    def __init__(self):
+        self.values = array('q')
+
+    def __len__(self):
+        return len(self.values)
+
+    def get(self, row):
+        return str(self.values[row])
+
+    def values_list(self):
+        return [str(value) for value in self.values]
+
+    @staticmethod
+    def _number(value):
+        try:
+            number = int(value)
+        except (TypeError, ValueError):
+            return None
+        # nur IDs, die unverändert zurückgeschrieben werden ("007" bleibt Text)
+        return number if str(number) == value else None
+
+    def splice(self, start, stop, values):
+        values = list(values)
+        numbers = [self._number(value) for value in values]
+        if None in numbers:
+            return PlainColumn(self.values_list()).splice(start, stop, values)
+        self.values[start:stop] = array('q', numbers)
+        return self
+
+    def with_blocks(self, blocks):
+        numbers = [(first, [self._number(value) for value in values]) for first, values in blocks]
+        if any(None in block for first, block in numbers):
+            return PlainColumn(self.values_list()).with_blocks(blocks)
+        column = IntColumn()
+        column.values = merge(self.values, numbers)
+        return column
+
+    def without_ranges(self, ranges):
+        column = IntColumn()
+        column.values = compact(self.values, ranges)
+        return column
+
+    def delete(self, index):
+        del self.values[index]
+
+    def nbytes(self):
+        return self.values.itemsize * len(self.values)
+
+
+class ColumnStore:
+    """
+    Zeilenliste im Spaltenformat. Zeilen werden beim Zugriff als Liste
+    zusammengesetzt; Änderungen müssen daher wie bei LazyRows über
+    store[i] = zeile zurückgeschrieben werden.
+    """
+    def __init__(self, width):
+        self.columns = [IntColumn()] + [DictColumn() for _ in range(width - 1)]
+
+    def _widen(self, width):
+        """Weitere (leere) Spalten ergänzen, z.B. nach dem Erweitern der Kopfzeile."""
+        rows = len(self)
+        while len(self.columns) < width:
+            self.columns.append(DictColumn().splice(0, 0, [""] * rows))
+
+    def __len__(self):
+        return len(self.columns[0])
+
+    def _row(self, row):
+        return [column.get(row) for column in self.columns]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._row(row) for row in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ColumnStore index out of range")
+        return self._row(index)
+
+    def __setitem__(self, index, row_data):
+        if isinstance(index, slice):
+            # store[i:j] = zeilen, z.B. store[i:i] = zeilen zum Einfügen
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                raise ValueError("ColumnStore unterstützt nur zusammenhängende Bereiche")
+            self._splice(start, max(start, stop), list(row_data))
+            return
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ColumnStore assignment index out of range")
+        self._splice(index, index + 1, [row_data])
+
+    def _splice(self, start, stop, rows):
+        """Zeilen start bis stop durch rows ersetzen: in allen Spalten oder bei einem Fehler in keiner."""
+        width = len(self.columns)
+        stop = min(stop, len(self))
+        removed = []
+        try:
+            if rows:
+                self._widen(max(len(row) for row in rows))
+            for position, column in enumerate(self.columns):
+                replaced = [column.get(row) for row in range(start, stop)]
+                self.columns[position] = column.splice(
+                    start, stop, [row[position] if position < len(row) else "" for row in rows])
+                removed.append(replaced)
+        except BaseException:
+            # bereits geänderte Spalten zurücksetzen, sonst wären die Spalten verschieden lang
+            for position, replaced in enumerate(removed):
+                self.columns[position] = self.columns[position].splice(start, start + len(rows), replaced)
+            del self.columns[width:]
+            raise
+
+    def insert_blocks(self, blocks):
+        """
+        Blöcke (Position, Zeilen), aufsteigend nach Position, in einem Durchlauf
+        je Spalte einfügen (Rückgängig nach dem Löschen verstreuter Zeilen); die
+        Positionen gelten wie nach dem Einfügen. In allen Spalten oder in keiner.
+        """
+        blocks = [(first, list(rows)) for first, rows in blocks]
+        width = max([len(self.columns)] + [len(row) for first, rows in blocks for row in rows])
+        columns = list(self.columns)
+        while len(columns) < width:
+            columns.append(DictColumn().splice(0, 0, [""] * len(self)))
+        # je Block einmal in Spalten zerlegen, zu kurze Zeilen mit "" auffüllen
+        cells = [list(zip(*[row if len(row) == width else (list(row) + [""] * width)[:width] for row in rows]))
+                 for first, rows in blocks]
+        self.columns = [column.with_blocks([(first, block[position]) for (first, rows), block in zip(blocks, cells)])
+                        for position, column in enumerate(columns)]
+
+    def truncate(self, width):
+        """Zellen ab Spalte width (mit ID gezählt) verwerfen; die ID-Spalte bleibt."""
+        del self.columns[max(width, 1):]
+
+    def remove_ranges(self, ranges):
+        """
+        Bereiche (erste, letzte), aufsteigend, in einem Durchlauf je Spalte
+        entfernen (Löschen verstreuter Zeilen).
+        """
+        self.columns = [column.without_ranges(ranges) for column in self.columns]
+
+    def __delitem__(self, index):
+        for column in self.columns:
+            column.delete(index)
+
+    def __iter__(self):
+        return map(list, zip(*(column.values_list() for column in self.columns)))
+
+    def nbytes(self):
+        """Geschätzter Speicherbedarf aller Spalten in Bytes."""
+        return sum(column.nbytes() for column in self.columns)
+
+    def append(self, row_data):
+        self.extend([row_data])
+
+    def extend(self, rows):
+        rows = list(rows)
+        if rows:
+            self._splice(len(self), len(self), rows)
@@ -0,0 +1,111 @@
+#!/usr/bin/python3
+
+# Farben des GTK-Themes für X-Live EditCSV (ohne Qt).
+#
+# Der Name des Themes kommt aus xfconf-query bzw. gsettings, die Farben aus
+# der gtk.css des Themes. Beides kostet beim Start spürbar Zeit, daher merkt
+# sich ein kleiner Cache die Farben je Theme-Name und Änderungszeit der
+# gtk.css. Beim Start werden die zuletzt benutzten Farben sofort übernommen,
+# das aktuelle Theme wird im Hintergrund geprüft.
+
+import json
+import os
+import re
+import subprocess
+
+import csvcache
+
+THEME_CACHE = os.path.join(csvcache.CACHE_DIR, "theme.json")
+
+
+def css_path(theme_name):
+    """Pfad zur GTK-CSS-Datei eines Themes."""
+    return f'/usr/share/themes/{theme_name}/gtk-3.0/gtk.css'
+
+
+def current_theme():
+    try:
+        # Versuche, das Theme mit xfconf-query abzurufen
+        result = subprocess.run(['xfconf-query', '-c', 'xsettings', '-p', '/Net/ThemeName'], capture_output=True, text=True)
+        theme_name = result.stdout.strip()
+        if theme_name:
+            return theme_name
+    except FileNotFoundError:
+        print("xfconf-query nicht gefunden. Versuche gsettings.")
+    except Exception as e:
+        print(f"Error getting theme with xfconf-query: {e}")
+    try:
+        # Fallback auf gsettings, falls xfconf-query nicht vorhanden ist
+        result = subprocess.run(['gsettings', 'get', 'org.gnome.desktop.interface', 'gtk-theme'], capture_output=True, text=True)
+        theme_name = result.stdout.strip().strip("'")
+        if theme_name:
+            print("gsettings",theme_name)
+            return theme_name
+    except Exception as e:
+        print(f"Error getting theme with gsettings: {e}")
+    return None
+
+
+def extract_color_from_css(content, color_name):
+    # Muster zum Finden der Farbe
+    pattern = r'{}[\s:]+([#\w]+)'.format(re.escape(color_name))
+    match = re.search(pattern, content)
+    if match:
+        return match.group(1)
+    return None
+
+
+def _css_mtime(theme_name):
+    try:
+        return os.stat(css_path(theme_name)).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _load_cache():
+    try:
+        with open(THEME_CACHE, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def cached_colors():
+    """
+    Zuletzt benutzte Farben (Hintergrund, Schrift) ohne Aufruf externer
+    Programme, sofern sich die gtk.css seither nicht geändert hat; sonst (None, None).
+    """
+    entry = _load_cache()
+    if entry.get('theme') and entry.get('mtime') == _css_mtime(entry['theme']):
+        return entry.get('background'), entry.get('color')
+    return None, None
+
+
+def theme_colors(theme_name):
+    """Farben (Hintergrund, Schrift) eines Themes, aus dem Cache oder aus dessen gtk.css."""
+    if not theme_name:
+        print("Unable to determine the current theme.")
+        return None, None
+    mtime = _css_mtime(theme_name)
+    entry = _load_cache()
+    if entry.get('theme') == theme_name and entry.get('mtime') == mtime:
+        return entry.get('background'), entry.get('color')
+    background = color = None
+    if mtime is None:
+        print(f"CSS file not found: {css_path(theme_name)}")
+    else:
+        try:
+            with open(css_path(theme_name), 'r', encoding='utf-8') as file:
+                content = file.read()
+            background = extract_color_from_css(content, ' background-color')
+            color = extract_color_from_css(content, ' color')
+        except IOError as e:
+            print(f"Error reading file: {e}")
+    try:
+        os.makedirs(csvcache.CACHE_DIR, exist_ok=True)
+        with open(THEME_CACHE + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump({'theme': theme_name, 'mtime': mtime, 'background': background, 'color': color}, f)
+        os.replace(THEME_CACHE + ".tmp", THEME_CACHE)
+    except OSError as e:
+        print(f"Theme-Cache konnte nicht geschrieben werden: {e}")
+    return background, color
@@ -0,0 +1,130 @@
+#!/usr/bin/python3
+
+# Zeitmessung der wichtigsten Abläufe von X-Live EditCSV (ohne Qt).
+#
+# Ausgeschaltet kostet jede Messstelle nur die Abfrage von ENABLED. Mit
+# enable() werden Abschnitte (Laden, Filtern, Spaltenbreiten, Speichern, ...)
+# mit Dauer, Thread und Zusatzangaben (z.B. Zeilenanzahl) gesammelt, dazu
+# Zähler wie gelesene Zeilen oder angezeigte Zellen. write() schreibt alles
+# im Chrome-Trace-Format (chrome://tracing, Perfetto), latest hält je
+# Abschnitt die letzte Dauer für die Anzeige in der Statusleiste.
+#
+# Eingeschaltet wird über die Umgebungsvariable X_LIVE_EDITCSV_TRACE=DATEI
+# oder den Aufrufparameter --trace DATEI.
+
+import json
+import os
+import threading
+import time
+from collections import deque
+
+ENV_VARIABLE = "X_LIVE_EDITCSV_TRACE"
+# ältere Ereignisse werden verworfen, damit lange Sitzungen nicht wachsen
+MAX_EVENTS = 200000
+
+ENABLED = False
+events = deque(maxlen=MAX_EVENTS)
+counters = {}
+latest = {}
+_lock = threading.Lock()
+_origin = time.perf_counter()
+
+
+def enable():
+    global ENABLED
+    ENABLED = True
+
+
+def now():
+    return time.perf_counter()
+
+
+def _micros(moment):
+    return round((moment - _origin) * 1000000, 1)
+
+
+def complete(name, start, end=None, **args):
+    """Abgeschlossenen Abschnitt von start bis end (Zeitpunkte von now()) festhalten."""
+    if not ENABLED:
+        return
+    if end is None:
+        end = now()
+    with _lock:
+        events.append({'name': name, 'ph': 'X', 'ts': _micros(start), 'dur': _micros(end) - _micros(start),
+                       'pid': os.getpid(), 'tid': threading.get_ident(), 'args': args})
+        # Zählerstände am Ende jedes Abschnitts, als Verlauf im Trace
+        if counters:
+            events.append({'name': 'Zähler', 'ph': 'C', 'ts': _micros(end), 'pid': os.getpid(),
+                           'tid': 0, 'args': dict(counters)})
+    latest[name] = (end - start, args)
+
+
+def count(name, value=1):
+    """Zähler erhöhen, z.B. gelesene Zeilen oder angezeigte Zellen."""
+    if not ENABLED:
+        return
+    with _lock:
+        counters[name] = counters.get(name, 0) + value
+
+
+class _Span:
+    __slots__ = ('name', 'args', 'start')
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = now()
+        return self
+
+    def __exit__(self, *exc):
+        complete(self.name, self.start, **self.args)
+        return False
+
+
+class _NoSpan:
+    """Platzhalter, solange nicht gemessen wird."""
+    args = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name, **args):
+    """
+    Abschnitt als with-Block messen; Angaben, die erst im Block bekannt sind,
+    können in span.args ergänzt werden.
+    """
+    if not ENABLED:
+        return _NO_SPAN
+    return _Span(name, args)
+
+
+def summary(names):
+    """Kurztext der letzten Dauern, z.B. "Laden 1.20 s | Filter 35 ms"."""
+    parts = []
+    for name, label in names:
+        entry = latest.get(name)
+        if entry is None:
+            continue
+        seconds = entry[0]
+        parts.append(f"{label} {seconds:.2f} s" if seconds >= 1 else f"{label} {seconds * 1000:.0f} ms")
+    return " | ".join(parts)
+
+
+def write(file_path):
+    """Gesammelte Ereignisse als Chrome-Trace (JSON) schreiben."""
+    with _lock:
+        trace_events = list(events)
+    trace_events.append({'name': 'process_name', 'ph': 'M', 'pid': os.getpid(), 'tid': 0,
+                         'args': {'name': 'x-live-editcsv'}})
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': trace_events, 'displayTimeUnit': 'ms',
+                   'otherData': {'counters': dict(counters)}}, f)
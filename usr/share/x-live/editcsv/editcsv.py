@@ -1,21 +1,654 @@
 #!/usr/bin/python3
 
 import sys
-import csv
+import time
+
+# Startzeitpunkt für --profile-startup, vor den (teuren) Qt-Importen
+STARTUP = time.perf_counter()
+
+from bisect import bisect_left, bisect_right
+from collections import deque
+from itertools import accumulate
 import re
 import os
-import subprocess
+import stat
+import tempfile
 from datetime import datetime
 from PyQt5.QtWidgets import (
-    QApplication, QMainWindow, QTableWidget, QTableWidgetItem, QDialog,
+    QApplication, QMainWindow, QTableView, QAbstractItemView, QDialog,
     QVBoxLayout, QWidget, QPushButton, QHBoxLayout, QLineEdit, QFileDialog, QMessageBox, QLabel,
-    QHeaderView, QDialog, QTextEdit, QAction, QMenu, QCheckBox
+    QHeaderView, QDialog, QTextEdit, QAction, QMenu, QCheckBox, QTabWidget
 )
+from PyQt5 import sip
+
+from PyQt5.QtCore import Qt, QTimer, QPoint, QAbstractTableModel, QModelIndex, QThread, pyqtSignal, QObject, QEvent
+from PyQt5.QtGui import QResizeEvent, QIntValidator, QClipboard, QIcon, QKeySequence
+from PyQt5.QtNetwork import QLocalServer, QLocalSocket
+
+import csvcache
+import csvcore
+import csvhistory
+import csvjournal
+import csvparallel
+import csvsearch
+import csvstore
+import csvtheme
+import csvtrace
+
+# Paketversion, wie in DEBIAN/control
+VERSION = "0.0.4"
+# Änderungen aus dem Journal spätestens nach so vielen Millisekunden speichern
+AUTOSAVE_INTERVAL = 60 * 1000
+# Abschnitte für die Messanzeige in der Statusleiste (siehe csvtrace)
+TRACE_LABELS = (("load_csv", "Laden"), ("update_table", "Tabelle"), ("Filter", "Filter"),
+                ("set_column_widths", "Spalten"), ("save_csv", "Speichern"))
+# geschätzter Speicher für die Tabellen aller Tabs; darüber werden inaktive Tabs ausgelagert
+DOCUMENT_BUDGET = 512 * 1024 * 1024
+# ab so vielen getrennten Bereichen wird beim Löschen (und beim Wiedereinfügen)
+# die Ansicht einmal neu aufgebaut, statt für jeden Bereich einzeln Zeilen zu
+# entfernen; die Daten werden dann in einem Durchlauf je Spalte geändert
+REMOVE_RESET_RANGES = 100
+# Spaltenbreiten höchstens einmal je Bild (etwa 60 Hz) neu setzen
+COLUMN_LAYOUT_DELAY = 16
+
+
+class WorkerPool(QObject):
+    """
+    Gemeinsame Obergrenze für die Hintergrund-Threads (Laden, Suchindex, Filter,
+    Speichern) aller Tabs: es laufen höchstens limit Threads gleichzeitig,
+    weitere warten in der Reihenfolge ihres Starts. Wartende Threads, die
+    inzwischen abgebrochen wurden, werden nicht mehr gestartet.
+    """
+    def __init__(self, limit):
+        super().__init__()
+        self.limit = limit
+        self.running = set()
+        self.waiting = deque()
+
+    def start(self, worker):
+        worker.finished.connect(self.on_finished)
+        worker.queued_at = csvtrace.now()
+        self.waiting.append(worker)
+        self.start_waiting()
+
+    def start_now(self, worker):
+        """Wartenden Thread sofort starten, z.B. ein Speichern beim Schließen des Fensters."""
+        if worker in self.waiting:
+            self.waiting.remove(worker)
+            self.running.add(worker)
+            worker.start()
+
+    def on_finished(self):
+        self.start_waiting()
+
+    def start_waiting(self):
+        # nicht über sender(): der Thread kann per deleteLater schon gelöscht sein
+        self.running = {worker for worker in self.running
+                        if not sip.isdeleted(worker) and not worker.isFinished()}
+        while self.waiting and len(self.running) < self.limit:
+            worker = self.waiting.popleft()
+            if sip.isdeleted(worker):
+                continue  # Fenster wurde inzwischen geschlossen
+            if worker.isInterruptionRequested():
+                worker.deleteLater()  # QThread.start() würde die Unterbrechung zurücksetzen
+                continue
+            self.running.add(worker)
+            csvtrace.complete("Warten auf Thread", worker.queued_at, worker=type(worker).__name__)
+            worker.start()
+
+
+WORKERS = WorkerPool(max(2, os.cpu_count() or 2))
+
+
+class ThemeLoader(QThread):
+    """Ermittelt Theme und Farben im Hintergrund (siehe csvtheme)."""
+    resolved = pyqtSignal(object, object)
+
+    def run(self):
+        self.resolved.emit(*csvtheme.theme_colors(csvtheme.current_theme()))
+
+
+class CSVLoader(QThread):
+    """
+    Lädt eine xcsv-Datei im Hintergrund und meldet die Zeilen blockweise,
+    damit die Tabelle schon während des Ladens gefüllt werden kann.
+    """
+    header_loaded = pyqtSignal(object, object)
+    chunk_loaded = pyqtSignal(object)
+    progress = pyqtSignal(object, object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, file_path, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        self.total_bytes = os.path.getsize(file_path)
+
+    def run(self):
+        try:
+            # Unveränderte Dateien direkt aus dem Spaltenabbild im Cache laden
+            entry = csvcache.load(self.file_path)
+            if entry and entry.get('columns') is not None:
+                self.header_loaded.emit(entry['header_data'], entry['tab_size'])
+                rows = csvcache.rows_from_columns(entry['columns'], entry['has_ids'])
+                for first in range(0, len(rows), 20000):
+                    if self.isInterruptionRequested():
+                        return
+                    self.chunk_loaded.emit(rows[first:first + 20000])
+                self.progress.emit(self.total_bytes, len(rows))
+                return
+            with open(self.file_path, 'rb') as csv_file:
+                # große Dateien auf mehrere Kerne verteilt parsen (siehe csvparallel)
+                if csvparallel.worth_it(self.total_bytes):
+                    reader = csvparallel.ParallelReader(self.file_path)
+                else:
+                    reader = csvcore.XCSVReader(csv_file)
+                self.header_loaded.emit(reader.header_data, reader.tab_size)
+                # Spaltenabbild für den Cache gleich beim Einlesen mitschreiben
+                snapshot = self.total_bytes <= csvcache.SNAPSHOT_LIMIT
+                columns = [[] for _ in range(reader.columns)]
+                for chunk in reader.chunks():
+                    if self.isInterruptionRequested():
+                        return
+                    if snapshot:
+                        for row in chunk:
+                            for column, cell in zip(columns, row):
+                                column.append(cell)
+                    self.chunk_loaded.emit(chunk)
+                    self.progress.emit(reader.bytes_read, reader.rows_read)
+            if snapshot:
+                if not reader.has_ids:
+                    columns = columns[1:]  # erzeugte IDs nicht speichern
+                csvcache.store(self.file_path, reader.header_data, reader.tab_size,
+                               columns=columns, has_ids=bool(reader.has_ids))
+        except Exception as e:
+            self.failed.emit(str(e))
+
+
+class CSVIndexer(QThread):
+    """
+    Öffnet eine große xcsv-Datei speichergemappt und erstellt im Hintergrund
+    nur den Offset-Index der Zeilen (siehe csvcore.LazyRows).
+    """
+    header_loaded = pyqtSignal(object, object)
+    rows_indexed = pyqtSignal(object)
+    progress = pyqtSignal(object, object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, file_path, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        self.total_bytes = os.path.getsize(file_path)
+
+    def report_progress(self, pos):
+        if self.isInterruptionRequested():
+            return False
+        self.progress.emit(pos, 0)
+        return True
+
+    def run(self):
+        try:
+            rows = csvcore.LazyRows(self.file_path, progress=self.report_progress)
+        except InterruptedError:
+            return
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.header_loaded.emit(rows.header_data, rows.tab_size)
+        self.rows_indexed.emit(rows)
+
+class FilterWorker(QThread):
+    """
+    Wertet den Filter im Hintergrund über den Suchindex aus und liefert die
+    Indizes der passenden Zeilen. Eine neuere Suche bricht den Lauf ab.
+    """
+    filtered = pyqtSignal(object, object)
+
+    def __init__(self, editor, search_terms, exclude_terms, candidates=None):
+        super().__init__(editor)
+        self.candidates = candidates
+        self.search_index = editor.search_index
+        self.data = editor.data
+        self.columns = len(editor.header_data)
+        self.search_terms = search_terms
+        self.exclude_terms = exclude_terms
+        self.version = editor.model.version
+        self.created = csvtrace.now()
+
+    def run(self):
+        rows = None
+        try:
+            cancelled = self.isInterruptionRequested
+            if self.search_index.ensure(self.data, self.columns, cancelled) is None:
+                return
+            rows = self.search_index.match(self.search_terms, self.exclude_terms,
+                                           cancelled=cancelled, candidates=self.candidates)
+            if rows is None:
+                return
+        except IndexError:
+            # Daten wurden während der Suche verändert, das Ergebnis ist ohnehin veraltet
+            rows = None
+        self.filtered.emit(rows, self.version)
+
+
+class SortWorker(QThread):
+    """
+    Berechnet die Sortierreihenfolge einer Spalte im Hintergrund. sorted liefert
+    die Reihenfolge und die Generation des Suchindex, für die sie gilt (None,
+    wenn die Daten währenddessen verändert wurden).
+    """
+    sorted = pyqtSignal(object, object)
+
+    def __init__(self, editor, column, descending):
+        super().__init__(editor)
+        self.search_index = editor.search_index
+        self.data = editor.data
+        self.column = column
+        self.descending = descending
+
+    def run(self):
+        generation = self.search_index.generation
+        try:
+            order = self.search_index.sort_permutation(self.column, self.descending, self.data)
+        except IndexError:
+            order = None  # Daten wurden während des Sortierens verändert
+        if not self.isInterruptionRequested():
+            self.sorted.emit(order, generation)
+
+
+class IndexWorker(QThread):
+    """Baut Suchtexte und auf Wunsch den Trigramm-Index im Hintergrund auf."""
+    def __init__(self, editor, trigrams=False):
+        super().__init__(editor)
+        self.search_index = editor.search_index
+        self.data = editor.data
+        self.columns = len(editor.header_data)
+        self.trigrams = trigrams
+
+    def run(self):
+        cancelled = self.isInterruptionRequested
+        try:
+            if self.search_index.ensure(self.data, self.columns, cancelled) is not None and self.trigrams:
+                self.search_index.build_trigrams(cancelled)
+        except IndexError:
+            pass  # Daten wurden währenddessen verändert, der nächste Aufbau holt es nach
+
+
+class CSVSaver(QThread):
+    """
+    Schreibt die Tabelle im Hintergrund atomar in eine xcsv-Datei (siehe
+    csvcore.write_xcsv). Mit first_row werden nur die Zeilen ab first_row an
+    die vorhandene Datei angehängt.
+    """
+    progress = pyqtSignal(object, object)
+    saved = pyqtSignal(str)
+    failed = pyqtSignal(str)
+
+    def __init__(self, editor, file_path, first_row=None, autosave=False):
+        super().__init__(editor)
+        self.file_path = file_path
+        self.first_row = first_row
+        self.autosave = autosave
+        self.data = editor.data
+        self.header_data = list(editor.header_data)
+        self.tab_size = list(editor.tab_size)
+        self.pad_row = editor.pad_row
+
+    def report_progress(self, rows_written):
+        self.progress.emit(rows_written, len(self.data) - (self.first_row or 0))
+        return not self.isInterruptionRequested()
+
+    def run(self):
+        try:
+            if self.first_row is None:
+                rows = (self.pad_row(row)[1:] for row in self.data)  # ID entfernen
+                csvcore.write_xcsv(self.file_path, self.header_data, self.tab_size, rows,
+                                   progress=self.report_progress)
+            else:
+                rows = (self.pad_row(self.data[row])[1:] for row in range(self.first_row, len(self.data)))
+                csvcore.append_xcsv(self.file_path, rows, progress=self.report_progress)
+        except InterruptedError:
+            return
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.saved.emit(self.file_path)
+
+
+class CSVTableModel(QAbstractTableModel):
+    """
+    Tabellenmodell, das die Zellen bei Bedarf direkt aus CSVEditor.data liefert.
+    Es werden keine Widget-Items erzeugt, die Ansicht fragt nur die sichtbaren Zellen ab.
+
+    Filter und Sortierung ändern nie self.data, sondern nur die Zuordnung der
+    Ansicht: self.matches enthält bei aktivem Filter die passenden Zeilen
+    (aufsteigend), self.order bei aktiver Sortierung alle Zeilen in
+    Sortierreihenfolge. self.rows ist daraus die Liste der angezeigten Zeilen
+    (ohne Sortierung dasselbe Objekt wie self.matches), oder None, wenn alle
+    Zeilen in Dateireihenfolge angezeigt werden.
+    """
+    def __init__(self, editor):
+        super().__init__(editor)
+        self.editor = editor
+        self.columns = len(editor.header_data)
+        self.rows = None
+        self.matches = None
+        self.order = None
+        # wird bei jeder Datenänderung erhöht, damit veraltete Filterergebnisse erkannt werden
+        self.version = 0
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        if self.rows is not None:
+            return len(self.rows)
+        return len(self.editor.data)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self.columns
+
+    def data_row(self, view_row):
+        """Index in CSVEditor.data zu einer Zeile der Ansicht."""
+        return view_row if self.rows is None else self.rows[view_row]
+
+    def view_row(self, row):
+        """Zeile der Ansicht zu einem Index in CSVEditor.data oder None, wenn ausgeblendet."""
+        if self.rows is None:
+            return row
+        if self.order is not None:
+            try:
+                return self.rows.index(row)
+            except ValueError:
+                return None
+        position = bisect_left(self.rows, row)
+        if position < len(self.rows) and self.rows[position] == row:
+            return position
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        if csvtrace.ENABLED:
+            csvtrace.count("Zellen angezeigt")
+        row = self.editor.data[self.data_row(index.row())]
+        column = index.column() + 1  # ID ignorieren
+        return row[column] if column < len(row) else ""
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            if section < len(self.editor.header_data):
+                return self.editor.header_data[section]
+            return None
+        return str(self.data_row(section) + 1)
+
+    def reload(self):
+        """Ansicht komplett neu aufbauen, z.B. nach dem Laden einer Datei."""
+        self.beginResetModel()
+        self.columns = len(self.editor.header_data)
+        self.rows = self.matches = self.order = None
+        self.version += 1
+        self.editor.search_index.invalidate()
+        self.endResetModel()
+
+    def _update_rows(self):
+        if self.order is None:
+            self.rows = self.matches
+        elif self.matches is None:
+            self.rows = list(self.order)
+        else:
+            matches = set(self.matches)
+            self.rows = [row for row in self.order if row in matches]
+
+    def set_visible_rows(self, rows):
+        """Filterergebnis in einem Schritt übernehmen (None = alle Zeilen sichtbar)."""
+        self.beginResetModel()
+        self.matches = rows
+        self._update_rows()
+        self.endResetModel()
+
+    def set_order(self, order):
+        """Sortierung in einem Schritt übernehmen (None = Dateireihenfolge)."""
+        self.beginResetModel()
+        self.order = order
+        self._update_rows()
+        self.endResetModel()
+
+    def _remove_view_positions(self, positions):
+        """Zeilen der Ansicht an den (aufsteigenden) Positionen entfernen, Bereiche gemeinsam."""
+        while positions:
+            last = first = positions.pop()
+            while positions and positions[-1] == first - 1:
+                first = positions.pop()
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self.rows[first:last + 1]
+            self.endRemoveRows()
+
+    def update_visible_rows(self, first, last, matched):
+        """
+        Sichtbarkeit der Zeilen first bis last (ausschließlich) nach einer Änderung
+        anpassen; matched sind die dort passenden Zeilen. Nur dieser Bereich der
+        Ansicht wird verändert.
+        """
+        if self.matches is None:
+            return
+        if self.order is None:
+            # self.rows ist self.matches: aufsteigend, der Bereich liegt zusammenhängend
+            low = bisect_left(self.rows, first)
+            high = bisect_left(self.rows, last)
+            if self.rows[low:high] == matched:
+                return
+            if high > low:
+                self.beginRemoveRows(QModelIndex(), low, high - 1)
+                del self.rows[low:high]
+                self.endRemoveRows()
+            if matched:
+                self.beginInsertRows(QModelIndex(), low, low + len(matched) - 1)
+                self.rows[low:low] = matched
+                self.endInsertRows()
+            return
+        low = bisect_left(self.matches, first)
+        high = bisect_left(self.matches, last)
+        self.matches[low:high] = matched
+        # Sortiert: nicht mehr passende Zeilen entfernen, neue Treffer hinten anhängen;
+        # neu sortiert wird erst beim nächsten Klick auf die Spalte
+        matched_set = set(matched)
+        self._remove_view_positions([position for position, row in enumerate(self.rows)
+                                     if first <= row < last and row not in matched_set])
+        shown = set(row for row in self.rows if first <= row < last)
+        new_rows = [row for row in matched if row not in shown]
+        if new_rows:
+            self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(new_rows) - 1)
+            self.rows.extend(new_rows)
+            self.endInsertRows()
+
+    def row_changed(self, row):
+        """Nur die Zellen einer geänderten Zeile neu zeichnen."""
+        self.version += 1
+        self.editor.search_index.set_row(row, self.editor.data[row])
+        view_row = self.view_row(row)
+        if view_row is not None:
+            self.dataChanged.emit(self.index(view_row, 0), self.index(view_row, max(self.columns - 1, 0)))
+
+    def append_row(self, row_data):
+        """Zeile an self.data anhängen und nur diese Zeile in der Ansicht einfügen."""
+        self.append_rows([row_data])
+        return len(self.editor.data) - 1
+
+    def append_rows(self, rows):
+        """
+        Mehrere Zeilen auf einmal anhängen, z.B. einen Block beim Laden. Bei aktivem
+        Filter erscheinen sie erst, wenn CSVEditor.filter_rows sie geprüft hat, bei
+        aktiver Sortierung am Ende der Ansicht.
+        """
+        if not rows:
+            return
+        self.version += 1
+        first = len(self.editor.data)
+        new_rows = range(first, first + len(rows))
+        if self.order is not None:
+            self.order.extend(new_rows)
+        show = self.matches is None
+        if show:
+            view_first = self.rowCount()
+            self.beginInsertRows(QModelIndex(), view_first, view_first + len(rows) - 1)
+        self.editor.data.extend(rows)
+        self.editor.search_index.append_rows(rows)
+        if show:
+            if self.rows is not None:
+                self.rows.extend(new_rows)
+            self.endInsertRows()
+
+    def remove_rows(self, rows):
+        """Zeilen aus self.data entfernen, zusammenhängende Bereiche werden gemeinsam entfernt."""
+        self.version += 1
+        ranges = []  # [erste, letzte], von groß nach klein sortiert
+        for row in sorted(set(rows), reverse=True):
+            if ranges and row == ranges[-1][0] - 1:
+                ranges[-1][0] = row
+            else:
+                ranges.append([row, row])
+        if len(ranges) > REMOVE_RESET_RANGES:
+            self.beginResetModel()
+            self._remove_ranges(ranges, notify=False)
+            self.endResetModel()
+        else:
+            self._remove_ranges(ranges, notify=True)
+
+    def _remove_ranges(self, ranges, notify):
+        """ranges absteigend entfernen; notify: Ansicht je Bereich benachrichtigen statt Neuaufbau."""
+        if self.rows is None and notify:
+            for first, last in ranges:
+                self.beginRemoveRows(QModelIndex(), first, last)
+                del self.editor.data[first:last + 1]
+                self.editor.search_index.remove_range(first, last)
+                self.endRemoveRows()
+            return
+        if self.rows is None:
+            self._remove_data(ranges)
+            return
+        # Bei Filter oder Sortierung: erst die betroffenen Zeilen aus der Ansicht nehmen,
+        # dann die Daten löschen und die übrigen Indizes verschieben
+        starts = [first for first, last in reversed(ranges)]
+        ends = [last for first, last in reversed(ranges)]
+        counts = list(accumulate(last - first + 1 for first, last in reversed(ranges)))
+
+        def removed(row):
+            position = bisect_right(starts, row)
+            return position > 0 and row <= ends[position - 1]
+
+        def shift(rows):
+            # übrige Zeilen um die Anzahl der davor gelöschten Zeilen verschieben
+            shifted = []
+            for row in rows:
+                position = bisect_right(starts, row)
+                if position and row <= ends[position - 1]:
+                    continue
+                shifted.append(row - counts[position - 1] if position else row)
+            return shifted
+
+        if notify and self.order is None:
+            for first, last in ranges:
+                low = bisect_left(self.rows, first)
+                high = bisect_right(self.rows, last)
+                if high > low:
+                    self.beginRemoveRows(QModelIndex(), low, high - 1)
+                    del self.rows[low:high]
+                    self.endRemoveRows()
+        elif notify:
+            self._remove_view_positions([position for position, row in enumerate(self.rows) if removed(row)])
+        self._remove_data(ranges)
+        if self.order is not None:
+            self.order = shift(self.order)
+            if self.matches is not None:
+                self.matches = shift(self.matches)
+            self.rows = shift(self.rows)
+        else:
+            self.rows = self.matches = shift(self.rows)
+        if self.rows and notify:
+            self.headerDataChanged.emit(Qt.Vertical, 0, len(self.rows) - 1)
+
+    def _remove_data(self, ranges):
+        """ranges (absteigend) in einem Durchlauf je Spalte aus den Daten und dem Suchindex entfernen."""
+        ranges = [(first, last) for first, last in reversed(ranges)]
+        self.editor.data.remove_ranges(ranges)
+        self.editor.search_index.remove_ranges(ranges)
+
+    def insert_rows(self, blocks):
+        """
+        Zeilen an ihren alten Positionen wieder einfügen (Rückgängig nach dem
+        Löschen). blocks sind (Position, Zeilen), aufsteigend nach Position.
+        Bei aktivem Filter erscheinen sie erst, wenn CSVEditor.filter_rows sie
+        geprüft hat, bei aktiver Sortierung am Ende der Ansicht.
+        """
+        self.version += 1
+        if self.rows is None and len(blocks) <= REMOVE_RESET_RANGES:
+            for first, rows in blocks:
+                self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+                self.editor.data[first:first] = rows
+                self.editor.search_index.insert_rows(first, rows)
+                self.endInsertRows()
+            return
+        if self.rows is None:
+            # viele verstreute Blöcke: alle in einem Durchlauf einfügen, die Ansicht neu aufbauen
+            self.beginResetModel()
+            self.editor.data.insert_blocks(blocks)
+            self.editor.search_index.insert_blocks(blocks)
+            self.endResetModel()
+            return
+        # Position jedes Blocks vor dem Einfügen und um wie viele Zeilen die
+        # Zeilen ab dort insgesamt nach hinten rücken
+        counts = list(accumulate(len(rows) for first, rows in blocks))
+        starts = [first - count + len(rows) for (first, rows), count in zip(blocks, counts)]
+
+        def shift(rows):
+            shifted = []
+            for row in rows:
+                position = bisect_right(starts, row)
+                shifted.append(row + counts[position - 1] if position else row)
+            return shifted
+
+        self.editor.data.insert_blocks(blocks)
+        self.editor.search_index.insert_blocks(blocks)
+        new_rows = [first + offset for first, rows in blocks for offset in range(len(rows))]
+        if self.order is None:
+            self.rows = self.matches = shift(self.rows)
+        else:
+            self.order = shift(self.order) + new_rows
+            self.rows = shift(self.rows)
+            if self.matches is not None:
+                self.matches = shift(self.matches)
+        if self.rows:
+            self.headerDataChanged.emit(Qt.Vertical, 0, len(self.rows) - 1)
+        if self.order is not None and self.matches is None:
+            self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(new_rows) - 1)
+            self.rows.extend(new_rows)
+            self.endInsertRows()
+
+    def header_changed(self):
+        """Spalten an die neue Kopfzeile anpassen, ohne die Zeilen neu aufzubauen."""
+        self.version += 1
+        columns = len(self.editor.header_data)
+        if columns > self.columns:
+            self.beginInsertColumns(QModelIndex(), self.columns, columns - 1)
+            self.columns = columns
+            self.endInsertColumns()
+        elif columns < self.columns:
+            self.beginRemoveColumns(QModelIndex(), columns, self.columns - 1)
+            self.columns = columns
+            self.endRemoveColumns()
+        if columns:
+            self.headerDataChanged.emit(Qt.Horizontal, 0, columns - 1)
 
-from PyQt5.QtCore import Qt, QTimer, QPoint
-from PyQt5.QtGui import QResizeEvent, QIntValidator, QClipboard, QIcon
 
 class CSVEditor(QMainWindow):
+    # Datei (oder None) in einem neuen Tab öffnen, lazy wie bei open_csv_lazy
+    tab_requested = pyqtSignal(object, bool)
+    # Speicherbedarf der Tabelle hat sich geändert (geladen, gespeichert, ausgelagert)
+    memory_changed = pyqtSignal()
+
     def __init__(self, file_path=None):
         super().__init__()
         self.setWindowTitle("X-Live EditCSV")
@@ -39,10 +672,17 @@ class CSVEditor(QMainWindow):
         # Aktionen für das Menü - Datei 
         open_action = QAction("Öffnen", self)
         open_action.triggered.connect(self.open_csv)
+        open_lazy_action = QAction("Große Datei öffnen (bei Bedarf lesen)", self)
+        open_lazy_action.triggered.connect(self.open_csv_lazy)
+        new_tab_action = QAction("Neuer Tab", self)
+        new_tab_action.setShortcut(QKeySequence.AddTab)
+        new_tab_action.triggered.connect(lambda: self.tab_requested.emit(None, False))
+        open_tab_action = QAction("In neuem Tab öffnen", self)
+        open_tab_action.triggered.connect(self.open_csv_tab)
         save_action = QAction("speichern", self)
         save_action.triggered.connect(self.save_csv)
         exit_action = QAction("Beenden", self)
-        exit_action.triggered.connect(self.close)
+        exit_action.triggered.connect(lambda: self.window().close())
         
 
         # Aktionen für das Menü - Tabelle
@@ -50,6 +690,17 @@ class CSVEditor(QMainWindow):
         header_action.triggered.connect(self.edit_header)
         clear_action = QAction("Tabelle leeren", self)
         clear_action.triggered.connect(self.clear_data)
+        self.trigram_action = QAction("Suchindex für große Tabellen", self)
+        self.trigram_action.setCheckable(True)
+        # Aufbau kostet bei großen Tabellen viele Sekunden und etwa doppelt so viel Speicher wie die Suchtexte
+        self.trigram_action.setChecked(False)
+        self.trigram_action.toggled.connect(self.toggle_search_index)
+        self.undo_action = QAction("Rückgängig", self)
+        self.undo_action.setShortcut(QKeySequence.Undo)
+        self.undo_action.triggered.connect(self.undo)
+        self.redo_action = QAction("Wiederholen", self)
+        self.redo_action.setShortcut(QKeySequence.Redo)
+        self.redo_action.triggered.connect(self.redo)
         
         # Aktionen für das Menü - Zeile
         add_action = QAction("hinzufügen", self)
@@ -65,11 +716,18 @@ class CSVEditor(QMainWindow):
         
         # Aktionen zu den Menüs hinzufügen
         file_menu.addAction(open_action)
+        file_menu.addAction(open_lazy_action)
+        file_menu.addAction(open_tab_action)
+        file_menu.addAction(new_tab_action)
         file_menu.addAction(save_action)
         file_menu.addSeparator()  # Trennlinie
         file_menu.addAction(exit_action)
+        tabble_menu.addAction(self.undo_action)
+        tabble_menu.addAction(self.redo_action)
+        tabble_menu.addSeparator()
         tabble_menu.addAction(header_action)
         tabble_menu.addAction(clear_action)
+        tabble_menu.addAction(self.trigram_action)
         row_menu.addAction(add_action)
         row_menu.addAction(edit_action)
         row_menu.addAction(remove_action)
@@ -82,18 +740,20 @@ class CSVEditor(QMainWindow):
         # Suchfeld
         self.search_field = QLineEdit()
         self.search_field.setPlaceholderText("darf enthalten...")
-        self.search_field.textChanged.connect(self.search_table)
+        self.search_field.textChanged.connect(self.schedule_search)
         # Tooltip für das Filter-Feld mit einem Beispiel
         self.search_field.setToolTip(
             "Gib ein oder mehrere Filterbegriffe ein.\n"
             "Verwende Leerzeichen, um mehrere Begriffe zu trennen (z.B. 'linux mint ubuntu').\n"
             "Verwende Anführungszeichen (\"), um einen zusammenhängenden Filterbegriff zu suchen (z.B. \"linux mint\").\n"
             "Aktiviere die Checkbox, um Begriffe auszuschließen.\n"
-            "Wenn das Filterfeld leer ist, wird nur der Ausschlussfilter angewendet."
+            "Wenn das Filterfeld leer ist, wird nur der Ausschlussfilter angewendet.\n"
+            "Spaltenfilter vergleichen Zahlen, Datumswerte (dd.mm.yy) oder Text einer Spalte\n"
+            "(z.B. 'Preis>100', 'Datum >= 01.01.24', '#3 != offen' für die 3. Spalte)."
         )
         self.search_field_ex = QLineEdit()
         self.search_field_ex.setPlaceholderText("darf nicht enthalten...")
-        self.search_field_ex.textChanged.connect(self.search_table)
+        self.search_field_ex.textChanged.connect(self.schedule_search)
         self.search_field_ex.hide()
         # Tooltip für das Filter-Feld mit einem Beispiel
         self.search_field_ex.setToolTip(
@@ -101,22 +761,27 @@ class CSVEditor(QMainWindow):
             "Verwende Leerzeichen, um mehrere Begriffe zu trennen (z.B. 'linux mint ubuntu').\n"
             "Verwende Anführungszeichen (\"), um einen zusammenhängenden Filterbegriff zu suchen (z.B. \"linux mint\").\n"
             "Aktiviere die Checkbox, um Begriffe auszuschließen.\n"
-            "Wenn das Filterfeld leer ist, wird nur der Ausschlussfilter angewendet."
+            "Wenn das Filterfeld leer ist, wird nur der Ausschlussfilter angewendet.\n"
+            "Spaltenfilter vergleichen Zahlen, Datumswerte (dd.mm.yy) oder Text einer Spalte\n"
+            "(z.B. 'Preis>100', 'Datum >= 01.01.24', '#3 != offen' für die 3. Spalte)."
         )
         self.search_revbox = QCheckBox("mehr filter")               
         self.search_revbox.stateChanged.connect(self.search_table_ex)
 
 
         # Tabelle
-        self.table = QTableWidget()
-        self.table.setColumnCount(len(self.header_data))
-        self.table.setHorizontalHeaderLabels(self.header_data)
+        self.data = self.new_store()
+        self.table = QTableView()
+        self.model = CSVTableModel(self)
+        self.table.setModel(self.model)
 
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
         # Einfaches Eintrag bearbeiten unterbinden
-        self.table.cellDoubleClicked.connect(self.edit_entry)
+        self.table.doubleClicked.connect(self.edit_entry)
         # komplette zeile auswähle
-        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        # Feste Zeilenhöhe, damit die Ansicht unabhängig von der Zeilenanzahl bleibt
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
         # Rechtsklick-Kontextmenü aktivieren
         self.table.setContextMenuPolicy(Qt.CustomContextMenu)
         self.table.customContextMenuRequested.connect(self.open_context_menu)
@@ -125,7 +790,12 @@ class CSVEditor(QMainWindow):
         header = self.table.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.Stretch)
         # Header-Klick umleiten
-        header.sectionClicked.connect(self.edit_header)
+        header.sectionClicked.connect(self.sort_by_column)
+        # Rechtsklick auf die Kopfzeile: Sortieren und Kopfzeile bearbeiten
+        header.setContextMenuPolicy(Qt.CustomContextMenu)
+        header.customContextMenuRequested.connect(self.open_header_menu)
+        self.sort_column = None
+        self.sort_descending = False
 
         # Buttons
         self.add_button = QPushButton("neue Zeile")
@@ -142,205 +812,859 @@ class CSVEditor(QMainWindow):
         
         self.layout.addLayout(line_top_layout)
         self.layout.addWidget(self.table)
-        self.data = []     
+        self.filter_active = False
+        self.search_index = csvsearch.SearchIndex()
+        self.filter_worker = None
+        self.index_worker = None
+        self.sort_worker = None
+        # Begriffe, zu denen model.matches gerade exakt passt (für das schrittweise Eingrenzen)
+        self.visible_terms = None
+        # Filter erst nach einer kurzen Tipp-Pause starten
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(150)
+        self.search_timer.timeout.connect(self.search_table)
+        # Spaltenbreiten gesammelt setzen statt bei jedem Resize-Ereignis
+        self.column_timer = QTimer(self)
+        self.column_timer.setSingleShot(True)
+        self.column_timer.setInterval(COLUMN_LAYOUT_DELAY)
+        self.column_timer.timeout.connect(self.table_resize)
+        # zuletzt gesetzte Breiten als (Viewport-Breite, tab_size), None = neu setzen
+        self.column_layout = None
+
+        # Statusleiste mit Ladefortschritt und Abbrechen-Knopf
+        self.loader = None
+        self.saver = None
+        self.load_failed = False
+        # Dateistand für das Speichern nur angehängter Zeilen (siehe appended_rows)
+        self.saved_state = None
+        self.clean_rows = 0
+        # Journal der ungespeicherten Änderungen, wird regelmäßig in die Datei übernommen
+        self.journal = None
+        # Stand eines ausgelagerten Tabs (siehe evict), sonst None
+        self.evicted = None
+        # Rückgängig/Wiederholen, gespeichert werden nur die Änderungen selbst
+        self.history = csvhistory.History()
+        self.update_undo_actions()
+        self.autosave_timer = QTimer(self)
+        self.autosave_timer.setInterval(AUTOSAVE_INTERVAL)
+        self.autosave_timer.timeout.connect(self.autosave)
+        self.autosave_timer.start()
+        self.cancel_load_button = QPushButton("Laden abbrechen")
+        self.cancel_load_button.clicked.connect(self.cancel_loading)
+        self.cancel_load_button.hide()
+        self.statusBar().addPermanentWidget(self.cancel_load_button)
+        if csvtrace.ENABLED:
+            # Messanzeige: letzte Dauern und Zähler, zweimal je Sekunde aktualisiert
+            self.trace_label = QLabel()
+            self.statusBar().addPermanentWidget(self.trace_label)
+            self.trace_timer = QTimer(self)
+            self.trace_timer.setInterval(500)
+            self.trace_timer.timeout.connect(self.update_trace_label)
+            self.trace_timer.start()
         self.background_color()  
-        QTimer.singleShot(50,self.table_resize)
+        self.schedule_column_widths()
         if file_path:
             print(file_path)
             self.load_csv(file_path)
 
         
+    def schedule_column_widths(self, force=False):
+        """
+        Spaltenbreiten im nächsten Bild setzen; mehrere Aufrufe bis dahin ergeben
+        einen Durchgang. force: auch bei unveränderter Breite (z.B. neue Spalten).
+        """
+        if force:
+            self.column_layout = None
+        if not self.column_timer.isActive():
+            self.column_timer.start()
+
     def table_resize(self):
         self.set_column_widths(self.tab_size)
 
     def set_column_widths(self, percentages):
-        header = self.table.horizontalHeader()
-        header.setSectionResizeMode(QHeaderView.Interactive)
         """Setzt die Spaltenbreite in Prozent der Gesamtbreite."""
         total_width = self.table.viewport().width()
-        for index, percentage in enumerate(percentages):
-            self.table.setColumnWidth(index, total_width * int(percentage) // 100)
+        layout = (total_width, tuple(percentages))
+        if layout == self.column_layout:
+            return  # z.B. nur die Fensterhöhe hat sich geändert
+        with csvtrace.span("set_column_widths", columns=len(percentages)):
+            header = self.table.horizontalHeader()
+            if self.column_layout is None:
+                header.setSectionResizeMode(QHeaderView.Interactive)
+            for index, percentage in enumerate(percentages):
+                width = total_width * int(percentage) // 100
+                # jedes setColumnWidth ordnet die Tabelle neu an, gleiche Breiten auslassen
+                if header.sectionSize(index) != width:
+                    self.table.setColumnWidth(index, width)
+            self.column_layout = layout
 
     def resizeEvent(self, event: QResizeEvent):
         """Passen die Spaltenbreite bei Größenänderung des Fensters an."""
-        self.set_column_widths(self.tab_size)
+        self.schedule_column_widths()
         super().resizeEvent(event)
 
+    def closeEvent(self, event):
+        """Laufende Hintergrund-Threads beenden, bevor das Fenster geschlossen wird."""
+        self.cancel_loading()
+        if self.saver is not None:
+            WORKERS.start_now(self.saver)  # wartendes Speichern nicht verwerfen
+            self.saver.wait()  # angefangenes Speichern nicht abbrechen
+        for worker in self.findChildren(QThread):
+            worker.requestInterruption()
+            worker.wait()
+        if self.journal is not None:
+            self.journal.close()
+        super().closeEvent(event)
+
 
     def open_csv(self):
         file_path, _ = QFileDialog.getOpenFileName(self, "CSV-Datei auswählen", "", "X-CSV-Dateien(*.xcsv);;CSV-Dateien (*.csv);;Alle Dateien (*)")
         self.load_csv(file_path)
 
-    def load_csv(self,file_path):
+    def open_csv_lazy(self):
+        file_path, _ = QFileDialog.getOpenFileName(self, "CSV-Datei auswählen", "", "X-CSV-Dateien(*.xcsv);;CSV-Dateien (*.csv);;Alle Dateien (*)")
+        self.load_csv(file_path, lazy=True)
+
+    def open_csv_tab(self):
+        file_path, _ = QFileDialog.getOpenFileName(self, "CSV-Datei auswählen", "", "X-CSV-Dateien(*.xcsv);;CSV-Dateien (*.csv);;Alle Dateien (*)")
+        if file_path:
+            self.tab_requested.emit(file_path, False)
+
+    def load_csv(self,file_path, lazy=False):
+        if self.saving():
+            return
         x = file_path.split("/")[-1]
         self.setWindowTitle(f"X-Live EditCSV - {x}")
         if file_path:
+            self.cancel_loading()
             try:
-                with open(file_path, newline='', encoding='utf-8') as csv_file:
-                    reader = csv.reader(csv_file)
-                    self.data = [row for row in reader if row]
-                    self.header_data = self.data[0]
-                    header_colums = len(self.header_data)+1
-                    self.tab_size_str = self.data[1]
-                    self.tab_size = []
-                    for data in self.tab_size_str:
-                        self.tab_size.append(int(data))
-                    self.data = self.data[2:]
-                    # IDs hinzufügen, falls keine vorhanden sind
-                    if not self.data[0][0].isdigit():
-                        self.data = [[str(i)] + row for i, row in enumerate(self.data, start=1)]
-                    for x, row in enumerate(self.data):
-                        while(len(self.data[x])) < header_colums:
-                            self.data[x].append("")
-                        self.data[x]=self.data[x][:header_colums]
-                    x = file_path.split("/")[-1]
-                    self.setWindowTitle(f"X-Live EditCSV - {x}")
-                    self.update_table()
+                # lazy: Datei nur speichergemappt indizieren, Zeilen erst beim Zugriff parsen
+                self.loader = CSVIndexer(file_path, self) if lazy else CSVLoader(file_path, self)
             except Exception as e:
                 QMessageBox.critical(self, "Fehler", f"Fehler beim Laden der Datei: {e}")
-        QTimer.singleShot(50,self.table_resize)
+                return
+            self.loader.header_loaded.connect(self.on_header_loaded)
+            if lazy:
+                self.loader.rows_indexed.connect(self.on_rows_indexed)
+            else:
+                self.loader.chunk_loaded.connect(self.on_chunk_loaded)
+            self.loader.progress.connect(self.on_load_progress)
+            self.loader.failed.connect(self.on_load_failed)
+            self.loader.finished.connect(self.on_load_finished)
+            self.load_failed = False
+            self.load_started = csvtrace.now()
+            self.history = csvhistory.History()  # ein ausgelagerter Tab hat seine noch in self.evicted
+            self.update_undo_actions()
+            self.cancel_load_button.show()
+            self.statusBar().showMessage(f"Lade {x} ...")
+            WORKERS.start(self.loader)
+        self.schedule_column_widths()
+
+    def cancel_loading(self):
+        """Laufenden Ladevorgang abbrechen, bereits geladene Zeilen werden verworfen."""
+        if self.loader is None:
+            return
+        loader = self.loader
+        self.loader = None  # verspätete Signale des alten Laders ignorieren
+        loader.requestInterruption()
+        loader.wait()
+        self.cancel_load_button.hide()
+        if self.sender() is self.cancel_load_button:
+            self.statusBar().showMessage("Laden abgebrochen", 5000)
+            self.evicted = None
+            self.clear_data()
+
+    def on_header_loaded(self, header_data, tab_size):
+        if self.sender() is not self.loader:
+            return
+        self.header_data = header_data
+        self.tab_size = tab_size
+        self.set_data(self.new_store())
+
+    def on_rows_indexed(self, rows):
+        if self.sender() is not self.loader:
+            rows.close()
+            return
+        self.set_data(rows)
+
+    def new_store(self):
+        """Leere, spaltenweise gespeicherte Zeilenliste für die aktuelle Kopfzeile."""
+        return csvstore.ColumnStore(len(self.header_data) + 1)
+
+    def set_data(self, rows):
+        """
+        Neue Zeilenliste übernehmen; eine speichergemappte Datei wird dabei geschlossen.
+        Die Tabelle gehört danach zu keiner Datei mehr, das Journal bleibt für ein
+        späteres Wiederherstellen liegen.
+        """
+        old_data = self.data
+        self.data = rows
+        self.saved_state = None
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+        self.update_table()
+        if isinstance(old_data, csvcore.LazyRows) and old_data is not rows:
+            old_data.close()
+
+    def on_chunk_loaded(self, rows):
+        if self.sender() is not self.loader:
+            return
+        first = len(self.data)
+        self.model.append_rows(rows)
+        self.filter_rows(first, len(self.data))
+        csvtrace.count("Zeilen geladen", len(rows))
+
+    def on_load_progress(self, bytes_read, rows_read):
+        if self.sender() is not self.loader:
+            return
+        total = max(self.loader.total_bytes, 1)
+        rows_text = f"{rows_read} Zeilen, " if rows_read else ""
+        self.statusBar().showMessage(
+            f"Lade ... {rows_text}{bytes_read / 1048576:.1f} von {total / 1048576:.1f} MB ({bytes_read * 100 // total}%)")
+
+    def on_load_failed(self, message):
+        if self.sender() is not self.loader:
+            return
+        self.load_failed = True
+        QMessageBox.critical(self, "Fehler", f"Fehler beim Laden der Datei: {message}")
+
+    def on_load_finished(self):
+        if self.sender() is not self.loader:
+            return
+        file_path = None if self.load_failed else self.loader.file_path
+        csvtrace.complete("load_csv", self.load_started, rows=len(self.data),
+                          bytes=self.loader.total_bytes, cells=len(self.data) * len(self.header_data),
+                          lazy=isinstance(self.data, csvcore.LazyRows))
+        self.loader = None
+        self.cancel_load_button.hide()
+        self.statusBar().showMessage(f"{len(self.data)} Zeilen geladen", 5000)
+        if file_path is not None:
+            self.mark_saved(file_path)
+            self.open_journal(file_path)
+        if self.evicted is not None:
+            self.finish_restore(file_path)
+        self.schedule_column_widths()
+        self.build_search_index()
+        self.memory_changed.emit()
+
+    def build_search_index(self, trigrams=False):
+        """
+        Suchindex im Hintergrund (neu) aufbauen: die Suchtexte und mit trigrams
+        auch den Trigramm-Index, falls eingeschaltet (siehe start_search).
+        """
+        # Bei speichergemappten Dateien würde der Index alle Zeilen einlesen
+        if isinstance(self.data, csvcore.LazyRows):
+            return
+        # ein bereits angeforderter Trigramm-Index wird beim Neustart mit aufgebaut,
+        # ein verworfener erst wieder bei der nächsten passenden Suche
+        trigrams = (trigrams or (self.index_worker is not None and self.index_worker.trigrams)) \
+            and self.trigram_action.isChecked()
+        if self.index_worker is not None:
+            self.index_worker.requestInterruption()
+        self.index_worker = IndexWorker(self, trigrams)
+        self.index_worker.finished.connect(self.on_index_built)
+        WORKERS.start(self.index_worker)
+
+    def on_index_built(self):
+        worker = self.sender()
+        if worker is self.index_worker:
+            self.index_worker = None
+        worker.deleteLater()
+
+    def toggle_search_index(self, checked):
+        if checked:
+            self.build_search_index()
+        else:
+            if self.index_worker is not None:
+                self.index_worker.requestInterruption()
+                self.index_worker = None
+            self.search_index.trigrams = None
 
     def save_csv(self):
+        if self.saving():
+            return
         file_path, _ = QFileDialog.getSaveFileName(self, "Datei speichern", "", "X-CSV-Dateien (*.xcsv);;CSV-Dateien (*.csv)")
+        if not file_path:
+            return
         if not "." in file_path:
             file_path=file_path +".xcsv"
-        if file_path:
-            try:
-                with open(file_path, mode='w', newline='', encoding='utf-8') as csv_file:
-                    writer = csv.writer(csv_file)
-                    writer.writerow(self.header_data) 
-                    writer.writerow(self.tab_size) 
-                    for row in self.data:
-                        writer.writerow(row[1:])  # ID entfernen
-                    QMessageBox.information(self, "Erfolg", "Datei wurde erfolgreich gespeichert!")
-                    x = file_path.split("/")[-1]
-                    self.setWindowTitle(f"X-Live EditCSV - {x}")
-            except Exception as e:
-                QMessageBox.critical(self, "Fehler", f"Fehler beim Speichern der Datei: {e}")
+        self.start_save(file_path)
+
+    def start_save(self, file_path, autosave=False):
+        # Geschrieben wird in eine Hilfsdatei, die erst am Ende umbenannt wird - so
+        # kann auch eine speichergemappte Quelldatei (LazyRows) ersetzt werden.
+        # Kamen seit dem letzten Speichern nur Zeilen hinzu, werden nur diese angehängt.
+        self.save_started = csvtrace.now()
+        self.saver = CSVSaver(self, file_path, self.appended_rows(file_path), autosave)
+        self.saver.progress.connect(self.on_save_progress)
+        self.saver.saved.connect(self.on_saved)
+        self.saver.failed.connect(self.on_save_failed)
+        self.saver.finished.connect(self.on_save_finished)
+        self.statusBar().showMessage(f"Speichere {os.path.basename(file_path)} ...")
+        WORKERS.start(self.saver)
+
+    def saving(self):
+        """True, solange gespeichert wird; die Daten dürfen dann nicht verändert werden."""
+        if self.saver is None:
+            return False
+        self.statusBar().showMessage("Bitte warten, die Datei wird gespeichert ...", 3000)
+        return True
+
+    def on_save_progress(self, rows_written, total):
+        self.statusBar().showMessage(
+            f"Speichere ... {rows_written} von {total} Zeilen ({rows_written * 100 // max(total, 1)}%)")
+
+    def on_saved(self, file_path):
+        self.mark_saved(file_path)
+        # Gespeicherte Änderungen werden im Journal nicht mehr gebraucht
+        if self.journal is not None:
+            self.journal.discard()
+        self.journal = self.new_journal(file_path)
+        x = file_path.split("/")[-1]
+        self.setWindowTitle(f"X-Live EditCSV - {x}")
+        if self.sender().autosave:
+            self.statusBar().showMessage(f"{x} automatisch gespeichert", 5000)
+            return
+        self.statusBar().showMessage(f"{x} gespeichert", 5000)
+        QMessageBox.information(self, "Erfolg", "Datei wurde erfolgreich gespeichert!")
+
+    def on_save_failed(self, message):
+        self.statusBar().clearMessage()
+        QMessageBox.critical(self, "Fehler", f"Fehler beim Speichern der Datei: {message}")
+
+    def autosave(self):
+        """Journal regelmäßig in die Datei übernehmen, solange niemand gerade bearbeitet."""
+        if self.journal is None or not self.journal.count:
+            return
+        if self.saver is not None or self.loader is not None or QApplication.activeModalWidget() is not None:
+            return
+        self.start_save(self.journal.file_path, autosave=True)
+
+    def new_journal(self, file_path):
+        try:
+            return csvjournal.Journal(file_path)
+        except OSError as e:
+            print(f"Journal für {file_path} nicht möglich: {e}")
+            return None
+
+    def open_journal(self, file_path):
+        """Journal zur geladenen Datei anlegen und nicht gespeicherte Änderungen anbieten."""
+        journal = self.new_journal(file_path)
+        if journal is None:
+            return
+        operations = journal.pending()
+        if operations and QMessageBox.question(
+                self, "Änderungen wiederherstellen",
+                f"Für diese Datei gibt es {len(operations)} nicht gespeicherte Änderungen.\n"
+                "Sollen sie wiederhergestellt werden?",
+                QMessageBox.Yes | QMessageBox.No) == QMessageBox.Yes:
+            for operation in operations:
+                self.apply_operation(operation)
+            journal.resume(len(operations))
+            self.update_table()
+        else:
+            journal.discard()
+        self.journal = journal
+
+    def reattach_journal(self, journal):
+        """
+        Nach dem Rückgängigmachen des Leerens wieder zur Datei gehören und deren
+        Journal weiterführen, sofern die Datei seitdem nicht geändert wurde.
+        """
+        self.setWindowTitle("X-Live EditCSV")
+        if journal is None:
+            return
+        try:
+            if csvcache.fingerprint(journal.file_path) != journal.fingerprint:
+                return
+            if journal.count:
+                journal.resume(journal.count)
+        except OSError as e:
+            print(f"Journal für {journal.file_path} nicht möglich: {e}")
+            return
+        self.journal = journal
+        x = journal.file_path.split("/")[-1]
+        self.setWindowTitle(f"X-Live EditCSV - {x}")
+
+    def apply_operation(self, operation):
+        """Eine Änderung aus dem Journal auf die Daten anwenden."""
+        op = operation['op']
+        if op == csvjournal.ADD:
+            self.append_rows([operation['row']])
+        elif op == csvjournal.EDIT:
+            self.replace_row(operation['index'], operation['row'])
+        elif op == csvjournal.DELETE:
+            self.remove_rows(operation['rows'])
+        elif op == csvjournal.INSERT:
+            self.insert_rows([(first, rows) for first, rows in operation['blocks']])
+        elif op == csvjournal.HEADER:
+            self.set_header(operation['header_data'], operation['tab_size'], operation.get('clear_cells', True))
+
+    def record(self, op, **values):
+        """Änderung ins Journal schreiben (falls die Tabelle zu einer Datei gehört)."""
+        if self.journal is None:
+            return
+        try:
+            self.journal.record(op, **values)
+        except OSError as e:
+            print(f"Journal konnte nicht geschrieben werden: {e}")
+
+    def mark_saved(self, file_path):
+        """Merken, welchem Dateistand die Daten jetzt entsprechen."""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            self.saved_state = None
+            return
+        self.saved_state = {
+            'path': os.path.realpath(file_path),
+            'mtime': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'header_data': list(self.header_data),
+            'tab_size': list(self.tab_size),
+            'rows': len(self.data),
+        }
+        self.clean_rows = len(self.data)
+
+    def mark_dirty(self, row):
+        """Zeilen ab row weichen von der gespeicherten Datei ab."""
+        self.clean_rows = min(self.clean_rows, row)
+
+    def appended_rows(self, file_path):
+        """
+        Erste neue Zeile, wenn die Datei seit dem Laden/Speichern unverändert ist
+        und nur Zeilen angehängt wurden; sonst None (ganze Datei neu schreiben).
+        """
+        state = self.saved_state
+        if state is None or self.clean_rows < state['rows']:
+            return None
+        if state['header_data'] != self.header_data or state['tab_size'] != self.tab_size:
+            return None
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        if os.path.realpath(file_path) != state['path'] or stat.st_mtime_ns != state['mtime'] \
+                or stat.st_size != state['size']:
+            return None
+        return state['rows']
+
+    def on_save_finished(self):
+        saver = self.saver
+        self.saver = None
+        if saver is not None:
+            csvtrace.complete("save_csv", self.save_started, rows=len(saver.data) - (saver.first_row or 0),
+                              append=saver.first_row is not None, autosave=saver.autosave)
+            saver.deleteLater()
+        self.memory_changed.emit()
+
+    def update_trace_label(self):
+        cells = csvtrace.counters.get("Zellen angezeigt", 0)
+        self.trace_label.setText(f"{csvtrace.summary(TRACE_LABELS)} | {cells} Zellen")
+
+    def memory_size(self):
+        """Geschätzter Speicherbedarf von Tabelle und Suchindex in Bytes."""
+        if not isinstance(self.data, csvstore.ColumnStore):
+            return 0  # speichergemappte Dateien liegen nicht im Speicher
+        return self.data.nbytes() + self.search_index.nbytes()
+
+    def can_evict(self):
+        """
+        Auslagern ist möglich, wenn die Tabelle genau der Datei entspricht; mit
+        ungespeicherten Änderungen muss erst (automatisch) gespeichert werden.
+        """
+        return (isinstance(self.data, csvstore.ColumnStore) and self.evicted is None
+                and self.journal is not None and not self.journal.count
+                and self.loader is None and self.saver is None)
+
+    def evict(self):
+        """
+        Zeilen und Suchindex eines inaktiven Tabs freigeben. Beim nächsten
+        Aktivieren lädt restore die Datei neu (meist aus dem Spaltenabbild im
+        Cache); Historie, Sortierung und Filter bleiben erhalten.
+        """
+        self.evicted = {
+            'path': self.journal.file_path,
+            'fingerprint': self.journal.fingerprint,
+            'history': self.history,
+            'sort': (self.sort_column, self.sort_descending),
+        }
+        if self.index_worker is not None:
+            self.index_worker.requestInterruption()
+            self.index_worker = None
+        self.cancel_sort()
+        self.search_index = csvsearch.SearchIndex()
+        self.set_data(self.new_store())
+        self.statusBar().showMessage("Tabelle ausgelagert, sie wird beim Aktivieren neu geladen")
+        self.memory_changed.emit()
+
+    def restore(self):
+        """Ausgelagerte Tabelle neu laden (beim Aktivieren des Tabs)."""
+        if self.evicted is not None and self.loader is None:
+            self.load_csv(self.evicted['path'])
+
+    def finish_restore(self, file_path):
+        evicted = self.evicted
+        self.evicted = None
+        # Historie und Sortierung passen nur, wenn die Datei unverändert ist
+        if file_path is None or csvcache.fingerprint(file_path) != evicted['fingerprint']:
+            return
+        self.history = evicted['history']
+        self.update_undo_actions()
+        column, descending = evicted['sort']
+        if column is not None:
+            self.sort_table(column, descending)
 
     def update_table(self):
-        self.table.setColumnCount(len(self.header_data))
-        self.table.setHorizontalHeaderLabels(self.header_data)
-        self.table.setRowCount(0)
+        with csvtrace.span("update_table", rows=len(self.data)):
+            # Das Modell liest die Zellen selbst aus self.data, es muss nur neu angemeldet werden
+            self.model.reload()
+            self.cancel_sort()
+            self.sort_column = None
+            self.table.horizontalHeader().setSortIndicatorShown(False)
+            self.schedule_column_widths(force=True)
+            self.search_table()
+
+    def pad_row(self, row):
+        """Zeile auf die Spaltenanzahl der Kopfzeile bringen (ID + Spalten)."""
         header_colums = len(self.header_data)+1
-                    
-        for x, row in enumerate(self.data):
-            while(len(self.data[x])) < header_colums:
-                self.data[x].append("")
-            self.data[x]=self.data[x][:header_colums]
-                    
-        for row_data in self.data:
-            row_number = self.table.rowCount()
-            self.table.insertRow(row_number)
-            for column, cell_data in enumerate(row_data[1:]):  # ID ignorieren
-                self.table.setItem(row_number, column, QTableWidgetItem(cell_data))
+        if len(row) == header_colums:
+            return row
+        if csvtrace.ENABLED:
+            csvtrace.count("Zeilen aufgefüllt")
+        return (row + [""] * header_colums)[:header_colums]
 
-        self.set_column_widths(self.tab_size)
-        self.search_table()
+    def selected_rows(self):
+        """Liefert die Indizes der markierten Zeilen in self.data."""
+        return sorted(set(self.model.data_row(index.row()) for index in self.table.selectionModel().selectedIndexes()))
 
     def add_entry(self):
+        if self.saving():
+            return
 
-        # Current date in dd.mm.yy format
-        current_date = datetime.now().strftime("%d.%m.%y")
-        header_colums = len(self.header_data)
-        x = 0
-        header = [str(len(self.data) + 1)]
-        while x < header_colums:
-            header.append("")
-            x = x + 1
-        new_row = header
-        self.data.append(new_row)
-        row = len(self.data)-1
-        
-        edit_dialog = EditDialog(self, self.data[row][1:],self.header_data,"Eintrag erstellen")  # ID ignorieren
+        new_row = self.pad_row([str(len(self.data) + 1)])
+        
+        edit_dialog = EditDialog(self, new_row[1:],self.header_data,"Eintrag erstellen")  # ID ignorieren
         if edit_dialog.exec_():
-            self.data[row][1:] = edit_dialog.get_data()  # ID bleibt unverändert
-            self.update_table()
-        else:
-            self.data = self.data[:-1]
-            self.update_table()
+            new_row[1:] = edit_dialog.get_data()  # ID bleibt unverändert
+            self.push_change(csvhistory.added(len(self.data), [new_row]))
+            self.append_rows([new_row])
 
     def edit_entry(self):
-        selected_items = self.table.selectedItems()
-        if not selected_items:
+        if self.saving():
+            return
+        selected_rows = self.selected_rows()
+        if not selected_rows:
             QMessageBox.warning(self, "Hinweis", "Bitte wähle eine Zeile zum Bearbeiten aus.")
             return
 
-        row = selected_items[0].row()
-        edit_dialog = EditDialog(self, self.data[row][1:],self.header_data,"Eintrag bearbeiten")  # ID ignorieren
+        row = selected_rows[0]
+        row_data = self.pad_row(self.data[row])
+        edit_dialog = EditDialog(self, row_data[1:],self.header_data,"Eintrag bearbeiten")  # ID ignorieren
         if edit_dialog.exec_():
-            self.data[row][1:] = edit_dialog.get_data()  # ID bleibt unverändert
-            self.update_table()
+            new_row = row_data[:1] + edit_dialog.get_data()  # ID bleibt unverändert
+            self.push_change(csvhistory.edited(row, row_data, new_row))
+            self.replace_row(row, new_row)
             
     def edit_header(self):
+        if self.saving():
+            return
         edit_dialog = EditHeaderDialog(self,self.header_data,self.tab_size)  # ID ignorieren
         if edit_dialog.exec_():
-            self.header_data,self.tab_size = edit_dialog.get_data()  # ID bleibt unverändert
-            self.update_table()
+            header_data, tab_size = edit_dialog.get_data()
+            self.push_change(csvhistory.header_changed((self.header_data, self.tab_size), (header_data, tab_size)))
+            self.set_header(header_data, tab_size)
 
     def delete_entry(self):
-        selected_items = self.table.selectedItems()
-        if not selected_items:
+        if self.saving():
+            return
+        selected_rows = self.selected_rows()
+        if not selected_rows:
             QMessageBox.warning(self, "Hinweis", "Bitte wähle eine Zeile zum Löschen aus.")
             return
-            
-        #rows = list(set(item.row() for item in selected_items))
-        rows = sorted(set(item.row() for item in selected_items), reverse=True)  # Von groß nach klein sortiert
 
-        x = 0
-        for row in rows:
-            del self.data[row]
-        
-        self.update_table()
-        
-        
-    def search_table(self):
-        # Hol die Suchbegriffe und teile sie in einzelne Wörter
-        search_text = self.search_field.text().lower().strip()
-        search_terms = []
-
-        # Wenn die Eingabe Anführungszeichen enthält, behandle diese als zusammenhängende Begriffe
-        if '"' in search_text:
-            import re
-            # Finde Wörter in Anführungszeichen und normale Wörter
-            search_terms = re.findall(r'"(.*?)"|(\S+)', search_text)
-            search_terms = [term[0] or term[1] for term in search_terms]  # Kombiniere Treffer
+        # Für Rückgängig nur die gelöschten Zeilen merken, zusammenhängende als ein Block
+        blocks = []
+        for row in selected_rows:
+            if blocks and blocks[-1][0] + blocks[-1][1] == row:
+                blocks[-1][1] += 1
+            else:
+                blocks.append([row, 1])
+        self.push_change(csvhistory.deleted([(first, self.data[first:first + count]) for first, count in blocks]))
+        self.remove_rows(selected_rows)
+
+    # Änderungen an den Daten: gemeinsam genutzt von den Dialogen, Rückgängig/Wiederholen
+    # und dem Wiedereinspielen des Journals
+
+    def append_rows(self, rows):
+        for row_data in rows:
+            self.record(csvjournal.ADD, row=row_data)
+        first = len(self.data)
+        self.model.append_rows(rows)
+        self.filter_rows(first, len(self.data))
+
+    def replace_row(self, row, row_data):
+        self.record(csvjournal.EDIT, index=row, row=row_data)
+        self.data[row] = row_data
+        self.mark_dirty(row)
+        self.model.row_changed(row)
+        self.filter_row(row)
+
+    def remove_rows(self, rows):
+        rows = sorted(rows)
+        self.record(csvjournal.DELETE, rows=rows)
+        # Ausgeblendete Zeilen bleiben beim Entfernen ausgeblendet, kein neuer Filterlauf nötig
+        self.model.remove_rows(rows)
+        self.mark_dirty(rows[0])
+        self.build_search_index()
+
+    def insert_rows(self, blocks):
+        """Zeilen blockweise an ihren alten Positionen einfügen, nur diese werden gefiltert."""
+        self.record(csvjournal.INSERT, blocks=blocks)
+        self.model.insert_rows(blocks)
+        self.mark_dirty(blocks[0][0])
+        if len(blocks) > REMOVE_RESET_RANGES:
+            # viele verstreute Blöcke: einmal im Hintergrund neu filtern statt die Ansicht je Block umzubauen
+            if self.filter_active and self.model.matches is not None:
+                self.visible_terms = None
+                self.search_table()
         else:
-            search_terms = search_text.split() if search_text else []  # Normale Trennung bei Leerzeichen
+            for first, rows in blocks:
+                self.filter_rows(first, first + len(rows))
+        self.build_search_index()
 
-        # Hol die Ausschlussbegriffe und teile sie in einzelne Wörter
-        exclude_text = self.search_field_ex.text().lower().strip()
-        exclude_terms = []
-
-        # Wenn die Ausschlussbegriffe Anführungszeichen enthalten, behandle diese ebenfalls als zusammenhängende Begriffe
-        if '"' in exclude_text:
-            exclude_terms = re.findall(r'"(.*?)"|(\S+)', exclude_text)
-            exclude_terms = [term[0] or term[1] for term in exclude_terms]  # Kombiniere Treffer
-        else:
-            exclude_terms = exclude_text.split() if exclude_text else []  # Normale Trennung bei Leerzeichen
+    def set_header(self, header_data, tab_size, clear_cells=True):
+        """
+        Kopfzeile übernehmen. Zellen hinter der letzten Spalte bleiben erhalten, bis
+        wieder Spalten hinzukommen: mit clear_cells sind diese dann leer, ohne
+        (Rückgängig nach dem Entfernen von Spalten) erscheinen die alten Werte wieder.
+        """
+        self.record(csvjournal.HEADER, header_data=header_data, tab_size=tab_size, clear_cells=clear_cells)
+        width = len(self.header_data) + 1
+        self.header_data, self.tab_size = header_data, tab_size
+        if clear_cells and len(header_data) + 1 > width:
+            self.data.truncate(width)
+            self.search_index.invalidate()
+        # Zeilen werden erst beim Bearbeiten/Speichern aufgefüllt, hier nur die Spalten anpassen
+        self.model.header_changed()
+        if self.sort_column is not None and self.sort_column >= len(self.header_data):
+            self.sort_table(None)
+        self.schedule_column_widths(force=True)
+        if self.filter_active:
+            self.search_table()
+        self.build_search_index()
+
+    def push_change(self, change):
+        self.history.push(change)
+        self.update_undo_actions()
+
+    def update_undo_actions(self):
+        self.undo_action.setEnabled(self.history.can_undo())
+        self.redo_action.setEnabled(self.history.can_redo())
+
+    def undo(self):
+        if self.saving():
+            return
+        change = self.history.undo()
+        if change is not None:
+            self.apply_change(change, undo=True)
+        self.update_undo_actions()
 
-        for row in range(self.table.rowCount()):
-            # Wenn die Suchleiste leer ist, keine Suche durchführen, aber den Ausschluss-Filter weiterhin berücksichtigen
-            if not search_terms:
-                match = True  # Alle Zeilen anzeigen, weil keine Suche aktiv ist
+    def redo(self):
+        if self.saving():
+            return
+        change = self.history.redo()
+        if change is not None:
+            self.apply_change(change, undo=False)
+        self.update_undo_actions()
+
+    def apply_change(self, change, undo):
+        """Schritt der Historie rückgängig machen (undo) oder wiederholen."""
+        if change.kind == csvhistory.ADD:
+            if undo:
+                self.remove_rows(list(range(change.first, change.first + len(change.rows))))
             else:
-                # Überprüfe, ob irgendein Suchbegriff in einer der Zellen vorhanden ist
-                match = any(
-                    any(term in self.table.item(row, col).text().lower() for term in search_terms)
-                    for col in range(self.table.columnCount())
-                )
-
-            # Wenn die Ausschluss-Checkbox aktiviert ist, überprüfe, ob irgendein Ausschlussbegriff vorhanden ist
-            if self.search_revbox.isChecked() and exclude_terms:
-                exclude_match = any(
-                    any(term in self.table.item(row, col).text().lower() for term in exclude_terms)
-                    for col in range(self.table.columnCount())
-                )
+                self.append_rows(change.rows)
+        elif change.kind == csvhistory.EDIT:
+            self.replace_row(change.row, csvhistory.apply_cells(self.data[change.row], change.cells, 1 if not undo else 0))
+        elif change.kind == csvhistory.DELETE:
+            if undo:
+                self.insert_rows(change.blocks)
             else:
-                exclude_match = False  # Keine Ausschlussprüfung, wenn die Checkbox nicht aktiviert ist
+                self.remove_rows([first + offset for first, rows in change.blocks for offset in range(len(rows))])
+        elif change.kind == csvhistory.HEADER:
+            self.set_header(*(change.old if undo else change.new), clear_cells=not undo)
+        elif change.kind == csvhistory.CLEAR:
+            if undo:
+                self.header_data, self.tab_size = change.header
+                self.set_data(change.data)
+                self.reattach_journal(change.journal)
+            else:
+                change.journal = self.journal
+                self.set_data(self.new_store())
+                self.setWindowTitle("X-Live EditCSV")
+        
+    def filter_terms(self):
+        """Liefert die Such- und Ausschlussbegriffe aus den Filterfeldern."""
+        search_terms = csvsearch.parse_query(self.search_field.text(), self.header_data)
+        exclude_terms = csvsearch.parse_query(self.search_field_ex.text(), self.header_data)
+        # Keine Ausschlussprüfung, wenn die Checkbox nicht aktiviert ist
+        if not self.search_revbox.isChecked():
+            exclude_terms = []
+        return search_terms, exclude_terms
+
+    def schedule_search(self):
+        # jede weitere Eingabe verschiebt den Filterlauf erneut
+        self.search_timer.start()
 
-            # Zeile ausblenden, wenn sie im Ausschlussfilter ist oder kein Suchbegriff gefunden wurde
-            self.table.setRowHidden(row, not match or exclude_match)
+    def search_table(self):
+        with csvtrace.span("search_table", rows=len(self.data)):
+            self.start_search()
+
+    def start_search(self):
+        search_terms, exclude_terms = self.filter_terms()
+        # Ohne aktiven Filter und ohne ausgeblendete Zeilen gibt es nichts zu tun
+        if not search_terms and not exclude_terms and not self.filter_active:
+            return
+        self.filter_active = bool(search_terms or exclude_terms)
+        # Eine noch laufende ältere Suche abbrechen, ihr Ergebnis wird ignoriert
+        if self.filter_worker is not None:
+            self.filter_worker.requestInterruption()
+            self.filter_worker = None
+        if not self.filter_active:
+            self.model.set_visible_rows(None)
+            self.visible_terms = None
+            return
+        # Grenzt die neue Eingabe das bisherige Ergebnis nur weiter ein (z.B. "lin" -> "linux"),
+        # werden nur die bisher sichtbaren Zeilen erneut geprüft
+        candidates = None
+        terms = (search_terms, exclude_terms)
+        if self.model.matches is not None and self.visible_terms is not None \
+                and csvsearch.narrows(self.visible_terms, terms):
+            candidates = list(self.model.matches)
+        # Trigramm-Index erst aufbauen, wenn eine Suche auf einer großen Tabelle davon profitiert;
+        # diese Suche läuft noch ohne ihn
+        if self.search_index.trigrams is None and self.trigram_action.isChecked() \
+                and not (self.index_worker is not None and self.index_worker.trigrams) \
+                and csvsearch.worth_trigrams(len(self.data), search_terms, exclude_terms):
+            self.build_search_index(trigrams=True)
+        worker = FilterWorker(self, search_terms, exclude_terms, candidates)
+        worker.filtered.connect(self.on_filtered)
+        worker.finished.connect(worker.deleteLater)
+        self.filter_worker = worker
+        WORKERS.start(worker)
+
+    def on_filtered(self, rows, version):
+        worker = self.sender()
+        if worker is not self.filter_worker:
+            return
+        self.filter_worker = None
+        if rows is not None and csvtrace.ENABLED:
+            checked = len(worker.candidates) if worker.candidates is not None else len(worker.data)
+            csvtrace.count("Zeilen gefiltert", checked)
+            csvtrace.complete("Filter", worker.created, rows=checked, matches=len(rows))
+        if version != self.model.version:
+            # Daten wurden während der Suche verändert
+            self.search_table()
+        elif rows is not None:
+            self.model.set_visible_rows(rows)
+            self.visible_terms = (worker.search_terms, worker.exclude_terms)
+            unparsed = self.search_index.unparsed_cells(worker.search_terms + worker.exclude_terms)
+            if unparsed:
+                self.statusBar().showMessage("Beim Vergleich übergangen (kein passender Wert): " + ", ".join(
+                    f"{self.header_data[column]} {count} Zellen" for column, count in unparsed.items()), 8000)
+
+    def filter_row(self, row):
+        """Filter nur auf eine neue oder geänderte Zeile anwenden."""
+        self.filter_rows(row, row + 1)
+
+    def filter_rows(self, first, last):
+        """Aktiven Filter auf die Zeilen first bis last (ausschließlich) anwenden."""
+        if self.filter_active and self.model.matches is not None:
+            search_terms, exclude_terms = self.filter_terms()
+            if (search_terms, exclude_terms) != self.visible_terms:
+                self.visible_terms = None  # model.matches passt nicht mehr zu einem einzigen Filter
+            if not self.search_index.is_current(self.data, len(self.header_data)):
+                # Suchtexte fehlen noch: nicht hier aufbauen, sondern ganz im Hintergrund filtern
+                self.search_table()
+                return
+            # Gesucht wird im vorberechneten Suchtext, nicht in den Zellen der Tabelle
+            matched = self.search_index.match(search_terms, exclude_terms, first, last)
+            self.model.update_visible_rows(first, last, matched)
+
+    def sort_by_column(self, column):
+        """Klick auf eine Spalte: aufsteigend, absteigend, wieder Dateireihenfolge."""
+        if column != self.sort_column:
+            self.sort_table(column, False)
+        elif not self.sort_descending:
+            self.sort_table(column, True)
+        else:
+            self.sort_table(None)
+
+    def sort_table(self, column, descending=False):
+        """
+        Ansicht nach einer Spalte sortieren (Zahlen, Datum dd.mm.yy oder Text).
+        self.data bleibt unverändert, das Modell erhält nur eine Reihenfolge.
+        """
+        header = self.table.horizontalHeader()
+        self.cancel_sort()
+        if column is None or column >= len(self.header_data):
+            self.sort_column = None
+            header.setSortIndicatorShown(False)
+            self.model.set_order(None)
+            return
+        # Anzeige sofort umstellen, die Reihenfolge wird im Hintergrund berechnet (on_sorted)
+        self.sort_column = column
+        self.sort_descending = descending
+        header.setSortIndicatorShown(True)
+        header.setSortIndicator(column, Qt.DescendingOrder if descending else Qt.AscendingOrder)
+        self.statusBar().showMessage("Sortiere ...")
+        self.sort_worker = SortWorker(self, column, descending)
+        self.sort_worker.sorted.connect(self.on_sorted)
+        self.sort_worker.finished.connect(self.sort_worker.deleteLater)
+        WORKERS.start(self.sort_worker)
+
+    def cancel_sort(self):
+        if self.sort_worker is not None:
+            self.sort_worker.requestInterruption()
+            self.sort_worker = None
+
+    def on_sorted(self, order, generation):
+        worker = self.sender()
+        if worker is not self.sort_worker:
+            return
+        self.sort_worker = None
+        self.statusBar().clearMessage()
+        if order is None or generation != self.search_index.generation:
+            # Daten wurden während des Sortierens verändert
+            self.sort_table(worker.column, worker.descending)
+            return
+        self.model.set_order(order)
+
+    def open_header_menu(self, position: QPoint):
+        header = self.table.horizontalHeader()
+        column = header.logicalIndexAt(position)
+        menu = QMenu(self)
+        action_asc = menu.addAction("Aufsteigend sortieren")
+        action_desc = menu.addAction("Absteigend sortieren")
+        action_none = menu.addAction("Sortierung aufheben")
+        menu.addSeparator()
+        action_header = menu.addAction("Kopfzeile bearbeiten")
+        if column < 0:
+            action_asc.setEnabled(False)
+            action_desc.setEnabled(False)
+        action_none.setEnabled(self.sort_column is not None)
+        action = menu.exec_(header.mapToGlobal(position))
+        if action == action_asc:
+            self.sort_table(column, False)
+        elif action == action_desc:
+            self.sort_table(column, True)
+        elif action == action_none:
+            self.sort_table(None)
+        elif action == action_header:
+            self.edit_header()
 
     def search_table_ex(self):
         print("test")
@@ -351,17 +1675,24 @@ class CSVEditor(QMainWindow):
         self.search_table()
             
     def clear_data(self):
-        self.data = []
-        self.update_table()
-        QTimer.singleShot(50,self.table_resize)
+        if self.saving():
+            return
+        if isinstance(self.data, csvcore.LazyRows):
+            # die speichergemappte Datei wird beim Leeren geschlossen, das ist nicht rückgängig zu machen
+            self.history.clear()
+            self.update_undo_actions()
+        else:
+            self.push_change(csvhistory.cleared(self.data, (self.header_data, self.tab_size), self.journal))
+        # die leere Tabelle gehört zu keiner Datei mehr, damit kein Autospeichern die Datei leert
+        self.set_data(self.new_store())
         self.setWindowTitle("X-Live EditCSV")
+        self.schedule_column_widths()
 
     def print_data(self):
-        selected_items = self.table.selectedItems()
-        if not selected_items:
+        rows = self.selected_rows()
+        if not rows:
             QMessageBox.warning(self, "Hinweis", "Bitte wähle eine Zeile zum Bearbeiten aus.")
             return
-        rows = list(set(item.row() for item in selected_items))
         #rows = [item.row() for item in selected_items]
         data = [self.data[row][1:] for row in rows]
         text = []
@@ -380,9 +1711,6 @@ class CSVEditor(QMainWindow):
         if not index.isValid():
             return  # Kein gültiger Eintrag unter dem Rechtsklick
 
-        row = index.row()
-        name = self.table.item(row, 0).text()  # Daten aus der ersten Spalte holen
-
         # Kontextmenü erstellen
         menu = QMenu(self)
 
@@ -445,156 +1773,75 @@ class CSVEditor(QMainWindow):
         msg_box.exec_()
 
     def get_version_info(self):
-        try:
-            result = subprocess.run(['apt', 'show', 'x-live-editcsv'], capture_output=True, text=True)
-            for line in result.stdout.splitlines():
-                if line.startswith('Version:'):
-                    return line.split(':', 1)[1].strip()
-        except Exception as e:
-            print(f"Fehler beim Abrufen der Version: {e}")
-        return "Unbekannt"
+        return VERSION
 
     # Farbprofil abrufen und anwenden
-    def get_current_theme(self):
-        try:
-            # Versuche, das Theme mit xfconf-query abzurufen
-            result = subprocess.run(['xfconf-query', '-c', 'xsettings', '-p', '/Net/ThemeName'], capture_output=True, text=True)
-            theme_name = result.stdout.strip()
-            if theme_name:
-                return theme_name
-        except FileNotFoundError:
-            print("xfconf-query nicht gefunden. Versuche gsettings.")
-        except Exception as e:
-            print(f"Error getting theme with xfconf-query: {e}")
-        try:
-            # Fallback auf gsettings, falls xfconf-query nicht vorhanden ist
-            result = subprocess.run(['gsettings', 'get', 'org.gnome.desktop.interface', 'gtk-theme'], capture_output=True, text=True)
-            theme_name = result.stdout.strip().strip("'")
-            if theme_name:
-                print("gsettings",theme_name)
-                return theme_name
-        except Exception as e:
-            print(f"Error getting theme with gsettings: {e}")
-        return None
-
-    def extract_color_from_css(self,css_file_path, color_name):
-        try:
-            with open(css_file_path, 'r', encoding='utf-8') as file:
-                content = file.read()
-                #print(content)
-                # Muster zum Finden der Farbe
-                pattern = r'{}[\s:]+([#\w]+)'.format(re.escape(color_name))
-                match = re.search(pattern, content)
-                if match:
-                    return match.group(1)
-                return None
-        except IOError as e:
-            print(f"Error reading file: {e}")
-            return None
-            
-            
     def background_color(self):
-        theme_name = self.get_current_theme()
-        #print("bg_color",theme_name)
-        if theme_name:
-            # Pfad zur GTK-CSS-Datei des aktuellen Themes
-            css_file_path = f'/usr/share/themes/{theme_name}/gtk-3.0/gtk.css'
-            if os.path.exists(css_file_path):
-                bcolor = self.extract_color_from_css(css_file_path, ' background-color')
-                color = self.extract_color_from_css(css_file_path, ' color')
-                if bcolor:
-                    if bcolor.startswith("rgba") == False:
-                        self.setStyleSheet("""
-                                    QPushButton {
-                                        color: """ + color + """;  /* Farbe */
-                                        background-color: """ + bcolor + """;    /* Hintergrundfarbe  */
-
-                                    }
-                                    QPushButton::hover {
-                                        color: """ + bcolor + """;  /* Farbe */
-                                        background-color: """ + color + """;    /* Hintergrundfarbe  */
-
-                                    }
-
-                                    QMenu {
-                                        color: """ + bcolor + """;  /* Farbe */
-                                        background-color: """ + color + """;    /* Hintergrundfarbe  */
-                                        border: 3px solid """ + bcolor + """; /* Rahmen */
-                                        border-radius: 3px;
-                                    }
-                                    QMenu::item {
-                                        padding: 2px 8px;        /* Innenabstand */
-                                        margin: 0px;             /* Abstand zwischen Items */
-                                    }
-                                    QMenu::item:disabled {
-                                        color: #20""" + color.replace('#','') + """;  /* Farbe */
-                                        background-color: """ + bcolor + """;    /* Hintergrundfarbe  */
-                                    }
-                                    QMenu::item:selected {       /* Hover-Effekt */
-                                        color: """ + bcolor + """;  /* Farbe */
-                                        background-color: """ + color + """;    /* Hintergrundfarbe  */
-                                    }
-                                    QMenu::separator {
-                                        height: 2px;
-                                        background: """ + color + """;
-                                        margin: 2px 2px;
-                                    }
-                                    QWidget {
-                                        color: """ + color + """;  /* Farbe */
-                                        background-color: """ + bcolor + """;    /* Hintergrundfarbe  */
-
-                                    }
-                                    QTextEdit {
-                                        color: """ + bcolor + """;  /* Farbe */
-                                        border-color: """ + color + """; /* Rahmenfarbe */
-                                        background-color: """ + color + """;    /* Hintergrundfarbe  */
-                                        border-radius: 5px; /* abgerundete Ecken */
-
-                                    }
-                                """)
-                    else:
-                        self.setStyleSheet("""
-
-                                    QMenu {
-                                        border: 3px; /* Rahmen */
-                                        border-radius: 3px;
-                                    }
-                                    QMenu::item {
-                                        padding: 2px 8px;        /* Innenabstand */
-                                        margin: 0px;             /* Abstand zwischen Items */
-                                    }
-                                    }
-                                    QMenu::separator {
-                                        height: 2px;
-                                        margin: 2px 2px;
-                                    }
-                                    QTextEdit {
-                                        border-radius: 5px; /* abgerundete Ecken */
-                                    }
-                                """)
-            else:
-                print(f"CSS file not found: {css_file_path}")
-                self.setStyleSheet("""
-
-                            QMenu {
-                                border: 3px; /* Rahmen */
-                                border-radius: 3px;
-                            }
-                            QMenu::item {
-                                padding: 2px 8px;        /* Innenabstand */
-                                margin: 0px;             /* Abstand zwischen Items */
-                            }
-                            }
-                            QMenu::separator {
-                                height: 2px;
-                                margin: 2px 2px;
-                            }
-                            QTextEdit {
-                                border-radius: 5px; /* abgerundete Ecken */
-                            }
-                        """)
+        """
+        Zuletzt benutzte Theme-Farben sofort übernehmen und das aktuelle Theme im
+        Hintergrund ermitteln (xfconf-query/gsettings und gtk.css sind langsam).
+        """
+        self.theme_colors = ()
+        self.apply_theme(*csvtheme.cached_colors())
+        self.theme_loader = ThemeLoader(self)
+        self.theme_loader.resolved.connect(self.apply_theme)
+        self.theme_loader.finished.connect(self.theme_loader.deleteLater)
+        WORKERS.start(self.theme_loader)
+
+    def apply_theme(self, bcolor, color):
+        if (bcolor, color) == self.theme_colors:
+            return
+        self.theme_colors = (bcolor, color)
+        if bcolor and color and bcolor.startswith("rgba") == False:
+            self.setStyleSheet("""
+                        QPushButton {
+                            color: """ + color + """;  /* Farbe */
+                            background-color: """ + bcolor + """;    /* Hintergrundfarbe  */
+
+                        }
+                        QPushButton::hover {
+                            color: """ + bcolor + """;  /* Farbe */
+                            background-color: """ + color + """;    /* Hintergrundfarbe  */
+
+                        }
+
+                        QMenu {
+                            color: """ + bcolor + """;  /* Farbe */
+                            background-color: """ + color + """;    /* Hintergrundfarbe  */
+                            border: 3px solid """ + bcolor + """; /* Rahmen */
+                            border-radius: 3px;
+                        }
+                        QMenu::item {
+                            padding: 2px 8px;        /* Innenabstand */
+                            margin: 0px;             /* Abstand zwischen Items */
+                        }
+                        QMenu::item:disabled {
+                            color: #20""" + color.replace('#','') + """;  /* Farbe */
+                            background-color: """ + bcolor + """;    /* Hintergrundfarbe  */
+                        }
+                        QMenu::item:selected {       /* Hover-Effekt */
+                            color: """ + bcolor + """;  /* Farbe */
+                            background-color: """ + color + """;    /* Hintergrundfarbe  */
+                        }
+                        QMenu::separator {
+                            height: 2px;
+                            background: """ + color + """;
+                            margin: 2px 2px;
+                        }
+                        QWidget {
+                            color: """ + color + """;  /* Farbe */
+                            background-color: """ + bcolor + """;    /* Hintergrundfarbe  */
+
+                        }
+                        QTextEdit {
+                            color: """ + bcolor + """;  /* Farbe */
+                            border-color: """ + color + """; /* Rahmenfarbe */
+                            background-color: """ + color + """;    /* Hintergrundfarbe  */
+                            border-radius: 5px; /* abgerundete Ecken */
+
+                        }
+                    """)
         else:
-            print("Unable to determine the current theme.")
             self.setStyleSheet("""
 
                         QMenu {
@@ -615,6 +1862,7 @@ class CSVEditor(QMainWindow):
                         }
                     """)
 
+
 class EditDialog(QDialog):
     def __init__(self, parent, row_data, header_data,text):
         super().__init__(parent)
@@ -817,10 +2065,261 @@ class PrintDialog(QDialog):
             clipboard.setText(self.fulltext)
             QMessageBox.information(self, "Erfolg", "Daten in Zischenablage kopiert!")
 
+class DocumentWindow(QMainWindow):
+    """
+    Hauptfenster mit einem Tab je geöffneter Datei. Jeder Tab ist ein eigener
+    CSVEditor; die Hintergrund-Threads aller Tabs teilen sich WORKERS.
+    Übersteigt der Speicherbedarf aller Tabellen DOCUMENT_BUDGET, werden die
+    am längsten nicht benutzten Tabs ausgelagert (siehe CSVEditor.evict) und
+    erst beim Aktivieren neu geladen.
+    """
+    def __init__(self, budget=DOCUMENT_BUDGET):
+        super().__init__()
+        self.budget = budget
+        self.setWindowTitle("X-Live EditCSV")
+        self.setWindowIcon(QIcon("/usr/share/pixmaps/x-live-editcsv.png"))
+        self.resize(1000, 600)
+        self.tabs = QTabWidget()
+        self.tabs.setDocumentMode(True)
+        self.tabs.setTabsClosable(True)
+        self.tabs.setMovable(True)
+        self.tabs.tabCloseRequested.connect(self.close_tab)
+        self.tabs.currentChanged.connect(self.on_current_changed)
+        self.setCentralWidget(self.tabs)
+        # Tabs in der Reihenfolge ihrer letzten Benutzung, zuletzt benutzter am Ende
+        self.recent = []
+
+    def open_document(self, file_path=None, lazy=False):
+        """Datei (oder eine leere Tabelle) in einem neuen Tab öffnen."""
+        editor = CSVEditor()
+        editor.setWindowFlags(Qt.Widget)
+        editor.tab_requested.connect(self.open_document)
+        editor.memory_changed.connect(self.enforce_budget)
+        editor.windowTitleChanged.connect(lambda title, editor=editor: self.on_title_changed(editor, title))
+        self.tabs.addTab(editor, "Neu")
+        self.tabs.setCurrentWidget(editor)
+        if file_path:
+            editor.load_csv(file_path, lazy=lazy)
+        return editor
+
+    def editors(self):
+        return [self.tabs.widget(index) for index in range(self.tabs.count())]
+
+    def on_title_changed(self, editor, title):
+        index = self.tabs.indexOf(editor)
+        if index < 0:
+            return
+        name = title.split(" - ", 1)[1] if " - " in title else "Neu"
+        self.tabs.setTabText(index, name)
+        if editor is self.tabs.currentWidget():
+            self.setWindowTitle(title)
+
+    def on_current_changed(self, index):
+        editor = self.tabs.widget(index)
+        if editor is None:
+            return
+        if editor in self.recent:
+            self.recent.remove(editor)
+        self.recent.append(editor)
+        self.setWindowTitle(editor.windowTitle())
+        editor.restore()
+        self.enforce_budget()
+
+    def enforce_budget(self):
+        """Inaktive Tabs auslagern, bis der Speicherbedarf wieder unter dem Budget liegt."""
+        current = self.tabs.currentWidget()
+        total = sum(editor.memory_size() for editor in self.editors())
+        for editor in list(self.recent):
+            if total <= self.budget:
+                break
+            if editor is current:
+                continue
+            # Tabs mit ungespeicherten Änderungen folgen nach dem nächsten automatischen Speichern
+            if editor.can_evict():
+                size = editor.memory_size()
+                editor.evict()
+                total -= size
+
+    def close_tab(self, index):
+        editor = self.tabs.widget(index)
+        if not editor.close():
+            return
+        self.tabs.removeTab(index)
+        if editor in self.recent:
+            self.recent.remove(editor)
+        editor.deleteLater()
+        if not self.tabs.count():
+            self.close()
+
+    def closeEvent(self, event):
+        for editor in self.editors():
+            if not editor.close():
+                event.ignore()
+                return
+        super().closeEvent(event)
+
+
+class SingleInstance(QObject):
+    """
+    Nur ein Programm je Benutzer: weitere Aufrufe übergeben ihre Datei über
+    einen lokalen Socket an die laufende Instanz und beenden sich sofort, die
+    Datei wird dort in einem neuen Tab geöffnet.
+    """
+    SOCKET_NAME = "x-live-editcsv.socket"
+
+    def __init__(self):
+        super().__init__()
+        self.windows = []
+        self.server = QLocalServer(self)
+        # nur dieser Benutzer darf sich verbinden
+        self.server.setSocketOptions(QLocalServer.UserAccessOption)
+        self.server.newConnection.connect(self.on_new_connection)
+
+    @classmethod
+    def server_path(cls):
+        """
+        Pfad des Sockets in $XDG_RUNTIME_DIR, sonst in einem eigenen Verzeichnis
+        (nur für diesen Benutzer) im Temp-Verzeichnis. Ein vorhandenes fremdes
+        oder für andere zugängliches Verzeichnis wird nicht benutzt: None.
+        """
+        runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+        if runtime_dir and os.path.isdir(runtime_dir):
+            return os.path.join(runtime_dir, cls.SOCKET_NAME)
+        directory = os.path.join(tempfile.gettempdir(), f"x-live-editcsv-runtime-{os.getuid()}")
+        try:
+            os.mkdir(directory, 0o700)
+        except FileExistsError:
+            pass
+        except OSError:
+            return None
+        info = os.lstat(directory)
+        if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+            print(f"Verzeichnis {directory} gehört nicht (nur) diesem Benutzer, keine Einzelinstanz")
+            return None
+        return os.path.join(directory, cls.SOCKET_NAME)
+
+    @classmethod
+    def send(cls, file_path):
+        """Datei (oder leer für ein neues Fenster) an eine laufende Instanz übergeben; False, wenn keine läuft."""
+        server_path = cls.server_path()
+        if server_path is None:
+            return False
+        socket = QLocalSocket()
+        socket.connectToServer(server_path)
+        if not socket.waitForConnected(500):
+            return False
+        message = os.path.abspath(file_path) if file_path else ""
+        socket.write(message.encode('utf-8') + b"\n")
+        socket.waitForBytesWritten(1000)
+        socket.disconnectFromServer()
+        return True
+
+    def listen(self):
+        """
+        Als laufende Instanz erreichbar werden; False, wenn bereits eine andere
+        antwortet. Ohne sicheren Socket-Pfad läuft das Programm für sich allein.
+        """
+        server_path = self.server_path()
+        if server_path is None:
+            return True
+        # erst nachsehen: mit UserAccessOption ersetzt listen() einen vorhandenen Socket
+        socket = QLocalSocket()
+        socket.connectToServer(server_path)
+        if socket.waitForConnected(500):
+            socket.disconnectFromServer()
+            return False
+        # Socket einer abgestürzten Instanz entfernen
+        QLocalServer.removeServer(server_path)
+        return self.server.listen(server_path)
+
+    def on_new_connection(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            socket.readyRead.connect(lambda socket=socket: self.on_ready_read(socket))
+            socket.disconnected.connect(socket.deleteLater)
+
+    def on_ready_read(self, socket):
+        while socket.canReadLine():
+            file_path = bytes(socket.readLine()).decode('utf-8').strip()
+            self.open_window(file_path or None)
+
+    def open_window(self, file_path):
+        if self.windows:
+            window = self.windows[-1]
+        else:
+            window = DocumentWindow()
+            window.setAttribute(Qt.WA_DeleteOnClose)
+            self.windows.append(window)
+            window.destroyed.connect(lambda _=None, window=window: self.windows.remove(window))
+        window.open_document(file_path)
+        window.show()
+        window.raise_()
+        window.activateWindow()
+
+
+class StartupProfile(QObject):
+    """Misst die Startzeit bis zur ersten Darstellung des Fensters (--profile-startup)."""
+    def __init__(self):
+        super().__init__()
+        self.marks = [("Importe", time.perf_counter())]
+
+    def mark(self, name):
+        self.marks.append((name, time.perf_counter()))
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint:
+            obj.removeEventFilter(self)
+            self.mark("erste Darstellung")
+            self.report()
+        return False
+
+    def report(self):
+        last = STARTUP
+        for name, moment in self.marks:
+            print(f"{name:<20} {(moment - last) * 1000:8.1f} ms   (gesamt {(moment - STARTUP) * 1000:.1f} ms)",
+                  file=sys.stderr)
+            last = moment
+
+
 if __name__ == "__main__":
+    profile = None
+    if "--profile-startup" in sys.argv:
+        sys.argv.remove("--profile-startup")
+        profile = StartupProfile()
+    single = "--new-instance" not in sys.argv
+    if not single:
+        sys.argv.remove("--new-instance")
+    # Zeitmessung mit Anzeige in der Statusleiste, Trace wird beim Beenden geschrieben
+    trace_path = os.environ.get(csvtrace.ENV_VARIABLE)
+    if "--trace" in sys.argv[:-1]:
+        position = sys.argv.index("--trace")
+        trace_path = sys.argv[position + 1]
+        del sys.argv[position:position + 2]
+    if trace_path:
+        csvtrace.enable()
+        single = False  # gemessen wird dieser Prozess, nicht eine schon laufende Instanz
     app = QApplication(sys.argv)
+    if profile:
+        profile.mark("QApplication")
     file_path = sys.argv[1] if len(sys.argv) > 1 else None
-    window = CSVEditor(file_path=file_path)
+    if single:
+        # Läuft schon ein Editor, öffnet er die Datei; dieser Prozess endet sofort
+        instance = SingleInstance()
+        if not instance.listen() and SingleInstance.send(file_path):
+            sys.exit(0)
+    window = DocumentWindow()
+    window.open_document(file_path)
+    if single:
+        instance.windows.append(window)
+    if profile:
+        profile.mark("Fenster aufgebaut")
+        window.installEventFilter(profile)
     window.show()
-    sys.exit(app.exec_())
+    result = app.exec_()
+    if trace_path:
+        try:
+            csvtrace.write(trace_path)
+        except OSError as e:
+            print(f"Trace konnte nicht geschrieben werden: {e}", file=sys.stderr)
+    sys.exit(result)
 